@@ -1,5 +1,20 @@
 from django.contrib import admin
+from vendorManagement.pagination import EstimatedCountPaginator
+
 from .models import HistoricalPerformance
 # Register your models here.
 
-admin.site.register(HistoricalPerformance)
+
+@admin.register(HistoricalPerformance)
+class HistoricalPerformanceAdmin(admin.ModelAdmin):
+    """
+    Historical performance admin built for large tables (see
+    `purchaseApi.admin.PurchaseOrderAdmin`).
+    """
+    list_display = ('vendor', 'date', 'on_time_delivery_rate', 'quality_rating_avg',
+                    'average_response_time', 'fulfillment_rate')
+    list_select_related = ('vendor',)
+    list_filter = ('date',)
+    raw_id_fields = ('vendor',)
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class HistoryapiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'historyApi'
+
+    def ready(self):
+        from django.core.signals import request_finished
+        from .snapshots import flush_snapshots
+
+        request_finished.connect(
+            flush_snapshots, dispatch_uid='historyApi.flush_snapshots')
@@ -0,0 +1,14 @@
+from vendorManagement.filters import parse_int
+
+
+def filter_historical_performance(queryset, params):
+    """
+    Apply the historical performance list filters from the query parameters.
+
+    Supported parameters:
+    - vendor: Vendor id.
+    """
+    vendor = parse_int(params, 'vendor')
+    if vendor is not None:
+        queryset = queryset.filter(vendor_id=vendor)
+    return queryset
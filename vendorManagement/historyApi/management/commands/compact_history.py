@@ -0,0 +1,82 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from historyApi.models import HistoricalPerformance
+from historyApi.snapshots import (METRIC_FIELDS, bucket_start, metrics_changed,
+                                  snapshot_settings)
+from vendorApi.models import Vendor
+from vendorManagement.responsecache import invalidate_history
+
+
+class Command(BaseCommand):
+    help = (
+        "Compact the historical performance table: drop snapshots whose "
+        "metrics did not change beyond the epsilon and, with --bucket-seconds, "
+        "keep only the latest snapshot of each vendor per time bucket."
+    )
+
+    def add_arguments(self, parser):
+        config = snapshot_settings()
+        parser.add_argument(
+            '--epsilon', type=float, default=config['EPSILON'],
+            help='Minimum metric change for a snapshot to be kept.')
+        parser.add_argument(
+            '--bucket-seconds', type=int, default=0,
+            help='Keep at most one snapshot per vendor per bucket of this many seconds.')
+        parser.add_argument(
+            '--vendor', type=int, action='append', dest='vendors',
+            help='Only compact the given vendor id (may be repeated).')
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of rows deleted per DELETE statement.')
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Report what would be deleted without deleting.')
+
+    def handle(self, *args, **options):
+        vendor_ids = Vendor.objects.order_by('pk').values_list('pk', flat=True)
+        if options['vendors']:
+            vendor_ids = vendor_ids.filter(pk__in=options['vendors'])
+
+        total_deleted = 0
+        for vendor_id in vendor_ids.iterator():
+            redundant = self.redundant_snapshots(vendor_id, options)
+            total_deleted += len(redundant)
+            if options['dry_run'] or not redundant:
+                continue
+            batch_size = options['batch_size']
+            with transaction.atomic():
+                for start in range(0, len(redundant), batch_size):
+                    HistoricalPerformance.objects.filter(
+                        pk__in=redundant[start:start + batch_size]).delete()
+                invalidate_history([vendor_id])
+
+        action = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} {total_deleted} redundant snapshot(s).'))
+
+    def redundant_snapshots(self, vendor_id, options):
+        """
+        Primary keys of the snapshots of a vendor that compaction removes.
+        """
+        config = {'BUCKET_SECONDS': options['bucket_seconds']}
+        snapshots = (HistoricalPerformance.objects
+                     .filter(vendor_id=vendor_id)
+                     .order_by('date', 'pk')
+                     .values('pk', 'date', *METRIC_FIELDS)
+                     .iterator(chunk_size=2000))
+
+        redundant = []
+        kept = None
+        for snapshot in snapshots:
+            if kept is not None:
+                same_bucket = options['bucket_seconds'] and (
+                    bucket_start(kept['date'], config) == bucket_start(snapshot['date'], config))
+                if same_bucket:
+                    # The later snapshot of a bucket wins.
+                    redundant.append(kept['pk'])
+                elif not metrics_changed(kept, snapshot, options['epsilon']):
+                    redundant.append(snapshot['pk'])
+                    continue
+            kept = snapshot
+        return redundant
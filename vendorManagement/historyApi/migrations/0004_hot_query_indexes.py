@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:26
+
+from django.db import migrations, models
+
+from vendorManagement.migrationops import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run in a transaction (PostgreSQL).
+    atomic = False
+
+    dependencies = [
+        ('historyApi', '0003_alter_historicalperformance_average_response_time_and_more'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='historicalperformance',
+            index=models.Index(fields=['vendor', 'date'], name='history_vendor_date_idx'),
+        ),
+    ]
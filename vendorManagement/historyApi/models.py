@@ -10,5 +10,11 @@ class HistoricalPerformance(models.Model):
     average_response_time = models.FloatField(default=0.0)
     fulfillment_rate = models.FloatField(default=0.0)
 
+    class Meta:
+        indexes = [
+            # Latest snapshot of a vendor and per-vendor time ranges.
+            models.Index(fields=['vendor', 'date'], name='history_vendor_date_idx'),
+        ]
+
     def __str__(self):
         return f"{self.vendor.name} - {self.date.strftime('%Y-%m-%d')}"
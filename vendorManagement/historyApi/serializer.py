@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from vendorManagement.fastserializer import FastListSerializer
 from .models import HistoricalPerformance
 
 
@@ -8,3 +9,8 @@ class HistoricalPerformanceSerializer(serializers.ModelSerializer):
     class Meta:
         model = HistoricalPerformance
         fields = '__all__'
+
+
+# Read-only list serialization from `values_list()` rows, same output as
+# `HistoricalPerformanceSerializer(many=True)`.
+historical_performance_list_serializer = FastListSerializer(HistoricalPerformanceSerializer)
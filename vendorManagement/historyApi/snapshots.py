@@ -0,0 +1,201 @@
+import threading
+from abc import ABC, abstractmethod
+
+from django.conf import settings
+from django.utils import timezone
+from vendorApi.metrics import METRIC_FIELDS
+from vendorManagement.responsecache import invalidate_history
+
+from .models import HistoricalPerformance
+
+
+DEFAULTS = {
+    'POLICY': 'on_change',
+    'EPSILON': 1e-6,
+    'BUCKET_SECONDS': 3600,
+    'BATCH_SIZE': 500,
+}
+
+
+def snapshot_settings():
+    """
+    Return the `HISTORY_SNAPSHOTS` settings merged with the defaults.
+    """
+    return {**DEFAULTS, **getattr(settings, 'HISTORY_SNAPSHOTS', {})}
+
+
+def metrics_of(obj):
+    return {field: getattr(obj, field) for field in METRIC_FIELDS}
+
+
+def metrics_changed(old, new, epsilon):
+    """
+    Whether any metric differs by more than `epsilon` between two dicts.
+    """
+    return any(abs(old[field] - new[field]) > epsilon for field in METRIC_FIELDS)
+
+
+def bucket_start(moment, config):
+    """
+    Start of the `BUCKET_SECONDS` window containing `moment`.
+    """
+    seconds = config['BUCKET_SECONDS']
+    epoch = int(moment.timestamp())
+    return epoch - epoch % seconds
+
+
+def latest_snapshot(vendor_id):
+    return (HistoricalPerformance.objects
+            .filter(vendor_id=vendor_id)
+            .order_by('-date', '-pk')
+            .first())
+
+
+class SnapshotPolicy(ABC):
+    """
+    Decides whether and how a vendor's current metrics are written to the
+    history table.
+    """
+
+    def __init__(self, config):
+        self.config = config
+
+    @abstractmethod
+    def record(self, vendor):
+        """
+        Record the metrics of `vendor`. Returns the written snapshot, or None
+        when nothing was written.
+        """
+
+    def flush(self):
+        """
+        Write any pending snapshots.
+        """
+
+
+class AlwaysPolicy(SnapshotPolicy):
+    """
+    Insert a snapshot on every call.
+    """
+
+    def record(self, vendor):
+        return HistoricalPerformance.objects.create(vendor=vendor, **metrics_of(vendor))
+
+
+class OnChangePolicy(SnapshotPolicy):
+    """
+    Insert a snapshot only when a metric moved by more than `EPSILON` since
+    the vendor's latest snapshot.
+    """
+
+    def record(self, vendor):
+        metrics = metrics_of(vendor)
+        latest = latest_snapshot(vendor.pk)
+        if latest is not None and not metrics_changed(
+                metrics_of(latest), metrics, self.config['EPSILON']):
+            return None
+        return HistoricalPerformance.objects.create(vendor=vendor, **metrics)
+
+
+class BucketPolicy(SnapshotPolicy):
+    """
+    Keep at most one snapshot per vendor per `BUCKET_SECONDS` window. A change
+    inside the window overwrites the window's snapshot with the latest values.
+    """
+
+    def record(self, vendor):
+        metrics = metrics_of(vendor)
+        latest = latest_snapshot(vendor.pk)
+        now = timezone.now()
+        if latest is None or bucket_start(latest.date, self.config) != bucket_start(now, self.config):
+            return HistoricalPerformance.objects.create(vendor=vendor, **metrics)
+        if not metrics_changed(metrics_of(latest), metrics, self.config['EPSILON']):
+            return None
+        HistoricalPerformance.objects.filter(pk=latest.pk).update(date=now, **metrics)
+        invalidate_history([vendor.pk])
+        for field, value in metrics.items():
+            setattr(latest, field, value)
+        latest.date = now
+        return latest
+
+
+class BatchPolicy(SnapshotPolicy):
+    """
+    Buffer snapshots in memory and write them with `bulk_create` once
+    `BATCH_SIZE` are pending, or when `flush()` is called (at the end of
+    every request). Snapshots are dated when they are written, and snapshots
+    still in the buffer are lost if the process dies.
+    """
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.lock = threading.Lock()
+        self.pending = []
+
+    def record(self, vendor):
+        snapshot = HistoricalPerformance(vendor=vendor, **metrics_of(vendor))
+        with self.lock:
+            self.pending.append(snapshot)
+            full = len(self.pending) >= self.config['BATCH_SIZE']
+        if full:
+            self.flush()
+        return snapshot
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, []
+        if pending:
+            HistoricalPerformance.objects.bulk_create(
+                pending, batch_size=self.config['BATCH_SIZE'])
+            invalidate_history({snapshot.vendor_id for snapshot in pending})
+
+
+POLICIES = {
+    'always': AlwaysPolicy,
+    'on_change': OnChangePolicy,
+    'bucket': BucketPolicy,
+    'batch': BatchPolicy,
+}
+
+_policy = None
+_policy_config = None
+_policy_lock = threading.Lock()
+
+
+def get_policy():
+    """
+    Return the snapshot policy configured in `HISTORY_SNAPSHOTS['POLICY']`.
+
+    The policy instance is rebuilt when the settings change, flushing the
+    pending snapshots of the previous one.
+    """
+    global _policy, _policy_config
+    config = snapshot_settings()
+    with _policy_lock:
+        if _policy is not None and _policy_config == config:
+            return _policy
+        previous = _policy
+        try:
+            policy_class = POLICIES[config['POLICY']]
+        except KeyError:
+            raise ValueError(
+                f"Unknown HISTORY_SNAPSHOTS['POLICY']: {config['POLICY']!r}")
+        _policy, _policy_config = policy_class(config), config
+    if previous is not None:
+        previous.flush()
+    return _policy
+
+
+def record_snapshot(vendor):
+    """
+    Record the current metrics of `vendor` according to the configured policy.
+    """
+    return get_policy().record(vendor)
+
+
+def flush_snapshots(**kwargs):
+    """
+    Write snapshots buffered by the policy. Connected to `request_finished`.
+    """
+    if _policy is not None:
+        _policy.flush()
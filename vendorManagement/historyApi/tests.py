@@ -0,0 +1,226 @@
+from io import StringIO
+import json
+from django.core.cache import cache
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from vendorApi.models import Vendor
+from .models import HistoricalPerformance
+from .serializer import HistoricalPerformanceSerializer
+from .snapshots import flush_snapshots
+from vendorManagement.testing import QueryCountTestCase
+
+
+class SnapshotPolicyTest(TestCase):
+
+    def setUp(self):
+        self.vendor = Vendor.objects.create(name='Test Vendor', vendor_code='HIST001')
+
+    def snapshot_count(self):
+        return HistoricalPerformance.objects.filter(vendor=self.vendor).count()
+
+    @override_settings(HISTORY_SNAPSHOTS={'POLICY': 'always'})
+    def test_always_policy(self):
+        count = self.snapshot_count()
+        self.vendor.name = 'Renamed Vendor'
+        self.vendor.save()
+        self.assertEqual(self.snapshot_count(), count + 1)
+
+    @override_settings(HISTORY_SNAPSHOTS={'POLICY': 'on_change', 'EPSILON': 0.01})
+    def test_on_change_policy(self):
+        self.vendor.save()
+        count = self.snapshot_count()
+
+        self.vendor.name = 'Renamed Vendor'
+        self.vendor.save()
+        self.vendor.quality_rating_avg += 0.001
+        self.vendor.save()
+        self.assertEqual(self.snapshot_count(), count)
+
+        self.vendor.quality_rating_avg = 4.0
+        self.vendor.save()
+        self.assertEqual(self.snapshot_count(), count + 1)
+
+    @override_settings(HISTORY_SNAPSHOTS={'POLICY': 'bucket', 'BUCKET_SECONDS': 86400})
+    def test_bucket_policy(self):
+        HistoricalPerformance.objects.filter(vendor=self.vendor).delete()
+        self.vendor.save()
+        self.vendor.quality_rating_avg = 3.0
+        self.vendor.save()
+        self.vendor.quality_rating_avg = 4.0
+        self.vendor.save()
+
+        snapshots = HistoricalPerformance.objects.filter(vendor=self.vendor)
+        self.assertEqual(snapshots.count(), 1)
+        self.assertEqual(snapshots.get().quality_rating_avg, 4.0)
+
+    @override_settings(HISTORY_SNAPSHOTS={'POLICY': 'batch', 'BATCH_SIZE': 3})
+    def test_batch_policy(self):
+        count = self.snapshot_count()
+        self.vendor.save()
+        self.vendor.save()
+        self.assertEqual(self.snapshot_count(), count)
+
+        self.vendor.save()
+        self.assertEqual(self.snapshot_count(), count + 3)
+
+        self.vendor.save()
+        flush_snapshots()
+        self.assertEqual(self.snapshot_count(), count + 4)
+
+
+class CompactHistoryCommandTest(TestCase):
+
+    def setUp(self):
+        self.vendor = Vendor.objects.create(name='Test Vendor', vendor_code='HIST002')
+        HistoricalPerformance.objects.all().delete()
+        for rating in (1.0, 1.0, 1.0, 2.0, 2.0, 3.0):
+            HistoricalPerformance.objects.create(
+                vendor=self.vendor, quality_rating_avg=rating)
+
+    def test_compact_history(self):
+        out = StringIO()
+        call_command('compact_history', '--dry-run', stdout=out)
+        self.assertIn('Would delete 3', out.getvalue())
+        self.assertEqual(HistoricalPerformance.objects.count(), 6)
+
+        call_command('compact_history', stdout=StringIO())
+        ratings = list(HistoricalPerformance.objects.order_by('date', 'pk')
+                       .values_list('quality_rating_avg', flat=True))
+        self.assertEqual(ratings, [1.0, 2.0, 3.0])
+
+    def test_compact_history_bucket(self):
+        call_command('compact_history', '--bucket-seconds', '86400', stdout=StringIO())
+        snapshot = HistoricalPerformance.objects.get()
+        self.assertEqual(snapshot.quality_rating_avg, 3.0)
+        self.assertLessEqual(snapshot.date, timezone.now())
+
+
+    @override_settings(RESPONSE_CACHE={'TIMEOUT': 60})
+    def test_compact_history_invalidates_responses(self):
+        cache.clear()
+        client = APIClient()
+        user = User.objects.create_user(username='testuser', password='testpassword')
+        client.force_authenticate(user)
+        url = reverse('index')
+        self.assertEqual(len(client.get(url, {'vendor': self.vendor.id}).data['results']), 6)
+
+        call_command('compact_history', stdout=StringIO())
+        self.assertEqual(len(client.get(url, {'vendor': self.vendor.id}).data['results']), 3)
+
+
+class HistoryViewsTest(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser', password='testpassword')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.vendor = Vendor.objects.create(name='Test Vendor', vendor_code='HIST003')
+        self.other_vendor = Vendor.objects.create(name='Other Vendor', vendor_code='HIST004')
+
+    def test_index(self):
+        response = self.client.get(reverse('index'), {'vendor': self.vendor.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [row['vendor'] for row in response.data['results']], [self.vendor.id])
+        self.assertEqual(response.data['results'], HistoricalPerformanceSerializer(
+            HistoricalPerformance.objects.filter(vendor=self.vendor), many=True).data)
+
+    def test_index_async(self):
+        expected = self.client.get(reverse('index'), {'vendor': self.vendor.id})
+        response = self.client.get(reverse('index_async'), {'vendor': self.vendor.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['results'], expected.json()['results'])
+        response = self.client.get(reverse('index_async'), {'vendor': 'abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_admin_changelist_queries_do_not_grow_with_rows(self):
+        self.client.force_login(User.objects.create_superuser(
+            username='admin', password='adminpassword'))
+        url = reverse('admin:historyApi_historicalperformance_changelist')
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(url)
+        HistoricalPerformance.objects.bulk_create([
+            HistoricalPerformance(vendor=vendor)
+            for vendor in (self.vendor, self.other_vendor) for _ in range(5)])
+        Vendor.objects.bulk_create([
+            Vendor(name=f'Admin Vendor {i}', vendor_code=f'ADMINV{i}') for i in range(10)])
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(url)
+        self.assertContains(response, 'Other Vendor')
+        self.assertNotContains(response, 'Admin Vendor')
+        self.assertEqual(len(many), len(few))
+
+        response = self.client.get(url, {'vendor__id__exact': self.other_vendor.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.context['cl'].result_count,
+                         HistoricalPerformance.objects.filter(vendor=self.other_vendor).count())
+
+    def test_export(self):
+        response = self.client.get(
+            reverse('historical_performance_export'), {'vendor': self.vendor.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = [json.loads(line) for line in
+                b''.join(response.streaming_content).decode().splitlines()]
+        expected = HistoricalPerformanceSerializer(
+            HistoricalPerformance.objects.filter(vendor=self.vendor), many=True).data
+        self.assertEqual(rows, expected)
+
+    def create_snapshot(self, date, rating):
+        snapshot = HistoricalPerformance.objects.create(
+            vendor=self.vendor, quality_rating_avg=rating)
+        HistoricalPerformance.objects.filter(pk=snapshot.pk).update(date=date)
+
+    def test_vendor_history(self):
+        HistoricalPerformance.objects.filter(vendor=self.vendor).delete()
+        day = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0) \
+            - timezone.timedelta(days=3)
+        for hours, rating in ((1, 2.0), (5, 4.0), (9, 3.0), (25, 5.0)):
+            self.create_snapshot(day + timezone.timedelta(hours=hours), rating)
+        self.create_snapshot(day - timezone.timedelta(days=30), 1.0)
+
+        url = reverse('vendor_history', args=[self.vendor.id])
+        # Token, vendor check, bucket aggregation and last values.
+        with self.assertNumQueries(4):
+            response = self.client.get(url, {
+                'from': (day - timezone.timedelta(days=1)).date().isoformat(),
+                'bucket': 'day'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        points = response.data['points']
+        self.assertEqual([point['count'] for point in points], [3, 1])
+        self.assertEqual(points[0]['quality_rating_avg'],
+                         {'avg': 3.0, 'min': 2.0, 'max': 4.0, 'last': 3.0})
+        self.assertEqual(points[1]['quality_rating_avg']['last'], 5.0)
+
+    def test_vendor_history_invalid(self):
+        url = reverse('vendor_history', args=[self.vendor.id])
+        self.assertEqual(self.client.get(url, {'bucket': 'minute'}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(url, {'from': 'yesterday'}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(url, {'from': '2000-01-01', 'bucket': 'hour'}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(reverse('vendor_history', args=[0])).status_code,
+                         status.HTTP_404_NOT_FOUND)
+
+
+class HistoryQueryCountTest(QueryCountTestCase):
+
+    def test_reads(self):
+        for size in self.sizes():
+            self.assertQueries(1, 'get', reverse('index'))
+            self.assertQueries(1, 'get', reverse('index'), {'vendor': self.vendor.id})
+            self.assertQueries(1, 'get', reverse('historical_performance_export'))
+            # Vendor existence, bucket aggregates, latest snapshot per bucket.
+            self.assertQueries(3, 'get', reverse('vendor_history', args=[self.vendor.id]),
+                               {'bucket': 'week'})
@@ -0,0 +1,75 @@
+from datetime import timedelta
+
+from django.db.models import Avg, Count, Max, Min
+from django.db.models.functions import Trunc
+from vendorApi.metrics import METRIC_FIELDS
+
+from .models import HistoricalPerformance
+
+
+BUCKETS = {
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+    'week': timedelta(weeks=1),
+}
+
+# Upper bound on the number of buckets in one response.
+MAX_POINTS = 2000
+# Dates per `IN (...)` lookup when fetching the last snapshot of each bucket.
+LOOKUP_BATCH_SIZE = 500
+
+
+def vendor_timeseries(vendor_id, start, end, bucket):
+    """
+    Downsample the history of a vendor to one point per `bucket`.
+
+    The grouping runs in the database over the `(vendor, date)` index: each
+    point carries the number of snapshots in the bucket and, for every
+    metric, its average, minimum, maximum and last value. The last values are
+    read with a second indexed lookup of the latest snapshot of each bucket.
+
+    Parameters:
+    - vendor_id: Vendor whose history is read.
+    - start, end: Half-open range `[start, end)` of snapshot dates.
+    - bucket: One of `BUCKETS`.
+
+    Returns:
+    - List of points ordered by bucket.
+    """
+    snapshots = HistoricalPerformance.objects.filter(
+        vendor_id=vendor_id, date__gte=start, date__lt=end)
+
+    aggregates = {'count': Count('pk'), 'last_date': Max('date')}
+    for field in METRIC_FIELDS:
+        aggregates[f'{field}__avg'] = Avg(field)
+        aggregates[f'{field}__min'] = Min(field)
+        aggregates[f'{field}__max'] = Max(field)
+    rows = list(
+        snapshots
+        .annotate(bucket=Trunc('date', bucket))
+        .order_by()
+        .values('bucket')
+        .annotate(**aggregates)
+        .order_by('bucket'))
+
+    last_dates = [row['last_date'] for row in rows]
+    last_values = {}
+    for index in range(0, len(last_dates), LOOKUP_BATCH_SIZE):
+        for snapshot in (snapshots
+                         .filter(date__in=last_dates[index:index + LOOKUP_BATCH_SIZE])
+                         .order_by('date', 'pk')
+                         .values('date', *METRIC_FIELDS)):
+            last_values[snapshot['date']] = snapshot
+
+    points = []
+    for row in rows:
+        point = {'bucket': row['bucket'], 'count': row['count']}
+        for field in METRIC_FIELDS:
+            point[field] = {
+                'avg': row[f'{field}__avg'],
+                'min': row[f'{field}__min'],
+                'max': row[f'{field}__max'],
+                'last': last_values[row['last_date']][field],
+            }
+        points.append(point)
+    return points
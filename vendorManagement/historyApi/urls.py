@@ -4,4 +4,9 @@ from . import views
 
 urlpatterns = [
     path('historical_performance/', views.index, name='index'),
+    path('historical_performance/export/', views.export,
+         name='historical_performance_export'),
+    path('vendors/<int:vendor_id>/history/', views.vendor_history,
+         name='vendor_history'),
+    path('async/historical_performance/', views.index_async, name='index_async'),
 ]
@@ -1,17 +1,132 @@
+from datetime import timedelta
+
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from django.utils import timezone
+from vendorApi.models import Vendor
+from vendorManagement.asyncviews import async_api_view
+from vendorManagement.export import export_response
+from vendorManagement.filters import parse_datetime, parse_int
+from vendorManagement.pagination import KeysetPagination
+from vendorManagement.replicas import read_from_replica
+from vendorManagement.responsecache import HISTORY, cache_response, list_scope
+from .filters import filter_historical_performance
 from .models import HistoricalPerformance
-from .serializer import HistoricalPerformanceSerializer
-from rest_framework.authentication import TokenAuthentication
+from .serializer import historical_performance_list_serializer
+from .timeseries import BUCKETS, MAX_POINTS, vendor_timeseries
+from vendorManagement.authentication import APIAuthentication
 from rest_framework.permissions import IsAuthenticated
 
 
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([APIAuthentication])
 @permission_classes([IsAuthenticated])
+@cache_response(lambda request: [
+    list_scope(HISTORY, parse_int(request.query_params, 'vendor'))])
+@read_from_replica
 def index(request):
-    historical_performances = HistoricalPerformance.objects.all()
-    serializer = HistoricalPerformanceSerializer(
-        historical_performances, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    """
+    Checks if the user is authenticated and returns a page of historical performance records.
+
+    Accepts the filters of `filter_historical_performance` as query parameters.
+    Records are ordered by id and paginated with `KeysetPagination`: the
+    response holds the records in `results` and a `next` link to the following page.
+    Records are read as `values_list()` rows and serialized with
+    `historical_performance_list_serializer`.
+    Responses are cached per vendor filter and support `If-None-Match`.
+    Reads from the replica when one is configured.
+    """
+    queryset = filter_historical_performance(
+        HistoricalPerformance.objects.all(), request.query_params)
+    paginator = KeysetPagination()
+    historical_performances = paginator.paginate_queryset(
+        historical_performance_list_serializer.rows(queryset), request)
+    return paginator.get_paginated_response(
+        historical_performance_list_serializer.to_representation(historical_performances))
+
+
+EXPORT_FIELDS = {
+    'id': 'id',
+    'date': 'date',
+    'on_time_delivery_rate': 'on_time_delivery_rate',
+    'quality_rating_avg': 'quality_rating_avg',
+    'average_response_time': 'average_response_time',
+    'fulfillment_rate': 'fulfillment_rate',
+    'vendor': 'vendor_id',
+}
+
+
+@api_view(['GET'])
+@authentication_classes([APIAuthentication])
+@permission_classes([IsAuthenticated])
+@read_from_replica
+def export(request):
+    """
+    Checks if the user is authenticated and streams all matching historical performance records.
+
+    Accepts the same filters as the list. Rows are streamed as NDJSON
+    (default) or CSV with `?output=csv`, optionally gzip-compressed with
+    `?gzip=true`, without loading the whole result in memory.
+    """
+    queryset = filter_historical_performance(
+        HistoricalPerformance.objects.order_by('pk'), request.query_params)
+    return export_response(request, queryset, EXPORT_FIELDS, 'historical_performance')
+
+
+@api_view(['GET'])
+@authentication_classes([APIAuthentication])
+@permission_classes([IsAuthenticated])
+@read_from_replica
+def vendor_history(request, vendor_id):
+    """
+    Checks if the user is authenticated and returns the downsampled performance history of a vendor.
+
+    Query parameters:
+    - from, to: ISO 8601 range of snapshot dates (default: the last 365 days).
+    - bucket: `hour`, `day` (default) or `week`.
+
+    Returns one point per bucket with the snapshot count and the
+    average, minimum, maximum and last value of each metric.
+    Returns a 404 NOT FOUND response if the vendor does not exist.
+    """
+    if not Vendor.objects.filter(pk=vendor_id).exists():
+        return Response(status=status.HTTP_404_NOT_FOUND)
+
+    bucket = request.query_params.get('bucket', 'day')
+    if bucket not in BUCKETS:
+        return Response({'bucket': [f'Must be one of: {", ".join(BUCKETS)}.']},
+                        status=status.HTTP_400_BAD_REQUEST)
+    end = parse_datetime(request.query_params, 'to') or timezone.now()
+    start = parse_datetime(request.query_params, 'from') or end - timedelta(days=365)
+    if start >= end:
+        return Response({'from': ['Must be before "to".']},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if (end - start) / BUCKETS[bucket] > MAX_POINTS:
+        return Response({'bucket': [f'The range spans more than {MAX_POINTS} buckets, use a larger bucket.']},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    data = {
+        'vendor': vendor_id,
+        'bucket': bucket,
+        'from': start,
+        'to': end,
+        'points': vendor_timeseries(vendor_id, start, end, bucket),
+    }
+    return Response(data, status=status.HTTP_200_OK)
+
+
+@async_api_view
+@read_from_replica
+async def index_async(request):
+    """
+    Async version of `index` for ASGI deployments (see
+    `vendorManagement.asyncviews`). Not cached.
+    """
+    queryset = filter_historical_performance(
+        HistoricalPerformance.objects.all(), request.query_params)
+    paginator = KeysetPagination()
+    historical_performances = await paginator.apaginate_queryset(
+        historical_performance_list_serializer.rows(queryset), request)
+    return paginator.get_paginated_response(
+        historical_performance_list_serializer.to_representation(historical_performances))
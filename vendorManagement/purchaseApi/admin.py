@@ -1,5 +1,24 @@
 from django.contrib import admin
+from vendorManagement.pagination import EstimatedCountPaginator
+
 from .models import PurchaseOrder
 # Register your models here.
 
-admin.site.register(PurchaseOrder)
+
+@admin.register(PurchaseOrder)
+class PurchaseOrderAdmin(admin.ModelAdmin):
+    """
+    Purchase order admin built for large tables: the vendor is joined in the
+    changelist query, the vendor is edited by id instead of a select of all
+    vendors, and neither the total nor (unfiltered, on PostgreSQL) the
+    result count scans the table. There is no vendor filter in the sidebar,
+    which would list every vendor; filter with `?vendor__id__exact=<id>`.
+    """
+    list_display = ('po_number', 'vendor', 'status', 'order_date', 'delivery_date',
+                    'quality_rating', 'acknowledgment_date')
+    list_select_related = ('vendor',)
+    list_filter = ('status', 'order_date', 'delivery_date')
+    search_fields = ('=po_number',)
+    raw_id_fields = ('vendor',)
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
@@ -0,0 +1,70 @@
+from django.db import connections
+
+from vendorManagement.filters import (
+    parse_bool, parse_datetime, parse_float, parse_int, parse_list)
+
+from .lineitems import purchase_orders_with_sku
+
+
+# Highest code point, the upper bound of a prefix range.
+MAX_CHAR = '\U0010ffff'
+
+
+def filter_purchase_orders(queryset, params):
+    """
+    Apply the purchase order list filters from the query parameters.
+
+    Supported parameters:
+    - vendor: Vendor id.
+    - status: One or more statuses, comma-separated or repeated.
+    - order_date_from, order_date_to: ISO 8601 range `[from, to)` of order dates.
+    - delivery_date_from, delivery_date_to: ISO 8601 range `[from, to)` of
+      delivery dates.
+    - acknowledged: `true` for acknowledged POs, `false` for the others.
+    - min_quality_rating, max_quality_rating: Inclusive range of quality
+      ratings; POs without a rating are left out.
+    - po_number: Prefix of the PO number (case-sensitive).
+    - sku: POs with a line item of this SKU (see `purchaseApi.lineitems`).
+
+    Each filter is backed by an index. Invalid values raise
+    a 400 error.
+    """
+    vendor = parse_int(params, 'vendor')
+    if vendor is not None:
+        queryset = queryset.filter(vendor_id=vendor)
+
+    statuses = parse_list(params, 'status')
+    if statuses is not None:
+        queryset = queryset.filter(status__in=statuses)
+
+    for field in ('order_date', 'delivery_date'):
+        start = parse_datetime(params, f'{field}_from')
+        if start is not None:
+            queryset = queryset.filter(**{f'{field}__gte': start})
+        end = parse_datetime(params, f'{field}_to')
+        if end is not None:
+            queryset = queryset.filter(**{f'{field}__lt': end})
+
+    acknowledged = parse_bool(params, 'acknowledged')
+    if acknowledged is not None:
+        queryset = queryset.filter(acknowledgment_date__isnull=not acknowledged)
+
+    min_rating = parse_float(params, 'min_quality_rating')
+    if min_rating is not None:
+        queryset = queryset.filter(quality_rating__gte=min_rating)
+    max_rating = parse_float(params, 'max_quality_rating')
+    if max_rating is not None:
+        queryset = queryset.filter(quality_rating__lte=max_rating)
+
+    prefix = params.get('po_number')
+    if prefix:
+        queryset = queryset.filter(po_number__startswith=prefix)
+        if connections[queryset.db].vendor == 'sqlite':
+            # SQLite cannot use an index for Django's `LIKE ... ESCAPE`; the
+            # same rows as a range on the (binary collated) unique index can.
+            queryset = queryset.filter(po_number__gte=prefix, po_number__lt=prefix + MAX_CHAR)
+
+    sku = params.get('sku')
+    if sku:
+        queryset = queryset.filter(pk__in=purchase_orders_with_sku(sku))
+    return queryset
@@ -0,0 +1,149 @@
+from django.db.models import Count, Exists, F, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from .models import PurchaseOrder, PurchaseOrderItem
+
+
+# Rows per INSERT and per `IN (...)` delete.
+BATCH_SIZE = 1000
+
+SKU_MAX_LENGTH = PurchaseOrderItem._meta.get_field('sku').max_length
+DESCRIPTION_MAX_LENGTH = PurchaseOrderItem._meta.get_field('description').max_length
+
+
+def to_int(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            return None
+    return None
+
+
+def to_float(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def item_row(purchase_order, position, item):
+    return PurchaseOrderItem(
+        purchase_order_id=purchase_order.pk,
+        position=position,
+        sku=str(item.get('sku') or '')[:SKU_MAX_LENGTH],
+        description=str(item.get('item_name') or item.get('description') or '')[
+            :DESCRIPTION_MAX_LENGTH],
+        quantity=to_int(item.get('quantity')),
+        unit_price=to_float(item.get('unit_price')),
+    )
+
+
+def line_items(purchase_order):
+    """
+    Unsaved `PurchaseOrderItem` rows of a purchase order's `items`.
+
+    `items` is free-form JSON in two shapes:
+    - a list of item objects (`sku`, `item_name`, `quantity`, `unit_price`):
+      one row per object; entries that are not objects are skipped (their
+      position is kept free);
+    - an object of names, as in the API examples (`{"item1": "Item A"}`):
+      one row per key, in key order, with the value as description (an
+      object value is read as an item object).
+    Values that cannot be read as a number are stored as null.
+    """
+    items = purchase_order.items
+    if isinstance(items, dict):
+        items = [value if isinstance(value, dict) else {'description': value}
+                 for value in items.values()]
+    if not isinstance(items, list):
+        return []
+    return [item_row(purchase_order, position, item)
+            for position, item in enumerate(items) if isinstance(item, dict)]
+
+
+def sync_line_items(purchase_orders, replace=True):
+    """
+    Write the line item rows of saved purchase orders from their `items`.
+
+    With `replace`, the existing rows of the purchase orders are deleted
+    first; new purchase orders (e.g. right after `bulk_create`) have none.
+    Returns the number of rows inserted.
+    """
+    purchase_orders = list(purchase_orders)
+    if replace:
+        for start in range(0, len(purchase_orders), BATCH_SIZE):
+            PurchaseOrderItem.objects.filter(purchase_order_id__in=[
+                purchase_order.pk for purchase_order in purchase_orders[start:start + BATCH_SIZE]
+            ]).delete()
+    rows = [row for purchase_order in purchase_orders for row in line_items(purchase_order)]
+    PurchaseOrderItem.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+    return len(rows)
+
+
+def purchase_orders_with_sku(sku):
+    """
+    Ids of the purchase orders holding `sku`, as a subquery on the SKU index.
+    """
+    return PurchaseOrderItem.objects.filter(sku=sku).values('purchase_order_id')
+
+
+def sku_spend(purchase_orders=None):
+    """
+    Ordered quantity and spend (quantity x unit price) per SKU, highest
+    spend first, in a single aggregate query.
+
+    `purchase_orders` restricts the aggregate to the line items of a
+    filtered purchase order queryset. Items without a SKU are left out and
+    items without a quantity or price count as 0.
+    """
+    items = PurchaseOrderItem.objects.exclude(sku='')
+    if purchase_orders is not None and purchase_orders.query.where:
+        items = items.filter(purchase_order__in=purchase_orders.values('pk'))
+    return (items.values('sku')
+            .annotate(
+                purchase_orders=Count('purchase_order', distinct=True),
+                # Before `quantity`, which shadows the field once annotated.
+                spend=Coalesce(Sum(F('quantity') * F('unit_price'), output_field=FloatField()), 0.0),
+                quantity=Coalesce(Sum('quantity'), 0))
+            .values('sku', 'purchase_orders', 'quantity', 'spend')
+            .order_by('-spend', 'sku'))
+
+
+def quantity_mismatches(purchase_orders=None):
+    """
+    Purchase orders whose `quantity` differs from the total quantity of
+    their line items, annotated with `items_quantity`. Purchase orders
+    without line items are left out (see `missing_line_items`).
+    """
+    if purchase_orders is None:
+        purchase_orders = PurchaseOrder.objects.all()
+    totals = (PurchaseOrderItem.objects.filter(purchase_order=OuterRef('pk'))
+              .values('purchase_order').annotate(total=Sum('quantity')).values('total'))
+    return (purchase_orders
+            .annotate(items_quantity=Subquery(totals))
+            .filter(items_quantity__isnull=False)
+            .exclude(quantity=F('items_quantity')))
+
+
+def missing_line_items(purchase_orders=None):
+    """
+    Purchase orders without any line item row: `items` is empty or holds no
+    item, or the rows were never written (run `backfill_line_items`).
+    """
+    if purchase_orders is None:
+        purchase_orders = PurchaseOrder.objects.all()
+    return purchase_orders.filter(
+        ~Exists(PurchaseOrderItem.objects.filter(purchase_order=OuterRef('pk'))))
@@ -0,0 +1,72 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from purchaseApi.lineitems import missing_line_items, quantity_mismatches, sync_line_items
+from purchaseApi.models import PurchaseOrder
+
+
+class Command(BaseCommand):
+    help = (
+        "Rewrite the PurchaseOrderItem rows of existing purchase orders from "
+        "their `items` JSON, in batches by id. --check only reports purchase "
+        "orders whose quantity differs from their line items total and "
+        "purchase orders without line items."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--vendor', type=int, action='append', dest='vendors',
+            help='Only process the purchase orders of the given vendor id (may be repeated).')
+        parser.add_argument(
+            '--missing', action='store_true',
+            help='Only backfill purchase orders without line items (e.g. to resume).')
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Purchase orders per transaction.')
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Only run the consistency checks, do not write.')
+
+    def handle(self, *args, **options):
+        purchase_orders = PurchaseOrder.objects.all()
+        if options['vendors']:
+            purchase_orders = purchase_orders.filter(vendor_id__in=options['vendors'])
+
+        if options['check']:
+            self.check_consistency(purchase_orders)
+            return
+
+        if options['missing']:
+            purchase_orders = missing_line_items(purchase_orders)
+        processed = inserted = 0
+        last_pk = 0
+        while True:
+            # `values_list` rows: `line_items` only needs the id and items,
+            # and model instances would load the metric state of each row.
+            rows = list(purchase_orders.filter(pk__gt=last_pk).order_by('pk')
+                        .values_list('pk', 'items')[:options['batch_size']])
+            if not rows:
+                break
+            with transaction.atomic():
+                inserted += sync_line_items(
+                    [PurchaseOrder(pk=pk, items=items) for pk, items in rows],
+                    replace=not options['missing'])
+            processed += len(rows)
+            last_pk = rows[-1][0]
+            self.stdout.write(f'Backfilled {processed} purchase order(s)', ending='\r')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Backfilled {processed} purchase order(s) with {inserted} line item(s).'))
+
+    def check_consistency(self, purchase_orders):
+        mismatches = quantity_mismatches(purchase_orders).order_by('pk')
+        for pk, po_number, quantity, items_quantity in mismatches.values_list(
+                'pk', 'po_number', 'quantity', 'items_quantity')[:20]:
+            self.stdout.write(
+                f'PO {po_number} (#{pk}): quantity {quantity}, line items total {items_quantity}')
+        mismatched = mismatches.count()
+        missing = missing_line_items(purchase_orders).count()
+        style = self.style.SUCCESS if not mismatched and not missing else self.style.WARNING
+        self.stdout.write(style(
+            f'{mismatched} purchase order(s) whose quantity differs from their line items, '
+            f'{missing} without line items.'))
@@ -0,0 +1,201 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from wsgiref.util import setup_testing_defaults
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db.backends.signals import connection_created
+from django.urls import reverse
+
+from vendorApi.models import Vendor
+
+from .benchmark_endpoints import authorization_header, percentile
+
+
+# Endpoint -> (sync view name, async view name, takes the vendor id).
+ENDPOINTS = {
+    'vendors': ('vendors', 'vendors_async', False),
+    'vendor_detail': ('vendor_detail', 'vendor_detail_async', True),
+    'vendor_performance': ('vendor_performance', 'vendor_performance_async', True),
+    'vendor_leaderboard': ('vendor_leaderboard', 'vendor_leaderboard_async', False),
+    'purchase_orders': ('purchase_orders', 'purchase_orders_async', False),
+    'historical_performance': ('index', 'index_async', False),
+}
+
+
+def wsgi_request(application, path, host, authorization):
+    """
+    Send a GET request to a WSGI application, returning the status code.
+    """
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'HTTP_HOST': host,
+        'HTTP_AUTHORIZATION': authorization,
+        'wsgi.input': BytesIO(),
+    }
+    setup_testing_defaults(environ)
+    status_codes = []
+
+    def start_response(status, headers, exc_info=None):
+        status_codes.append(int(status.split()[0]))
+
+    body = application(environ, start_response)
+    try:
+        for _ in body:
+            pass
+    finally:
+        body.close()
+    return status_codes[0]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the throughput of the sync views under WSGI with the async "
+        "views under ASGI when many slow reads are in flight. Both Django "
+        "handlers run in process: WSGI with --workers threads (like a "
+        "threaded WSGI server), ASGI in one event loop. --concurrency clients "
+        "each send requests back to back, and --db-latency adds a delay to "
+        "every query to stand in for a remote database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoint', choices=ENDPOINTS, default='vendors')
+        parser.add_argument('--requests', type=int, default=400,
+                            help='Requests per run.')
+        parser.add_argument('--concurrency', type=int, default=50,
+                            help='Number of concurrent clients.')
+        parser.add_argument('--workers', type=int, default=8,
+                            help='WSGI worker threads.')
+        parser.add_argument('--db-latency', type=float, default=20.0,
+                            help='Milliseconds added to every query.')
+        parser.add_argument('--host', default='localhost',
+                            help='Host header of the requests (must be in ALLOWED_HOSTS).')
+
+    def handle(self, *args, **options):
+        sync_name, async_name, takes_vendor = ENDPOINTS[options['endpoint']]
+        view_args = []
+        if takes_vendor:
+            vendor_id = Vendor.objects.order_by('pk').values_list('pk', flat=True).first()
+            if vendor_id is None:
+                raise CommandError('No vendors to benchmark, use generate_data.')
+            view_args = [vendor_id]
+        self.host = options['host']
+        self.authorization = authorization_header()
+        sync_path = reverse(sync_name, args=view_args)
+        async_path = reverse(async_name, args=view_args)
+
+        latency = options['db_latency'] / 1000
+
+        def slow_query(execute, sql, params, many, context):
+            time.sleep(latency)
+            return execute(sql, params, many, context)
+
+        def add_latency(sender, connection, **kwargs):
+            # Wrappers stay on the connection object across reconnects.
+            if slow_query not in connection.execute_wrappers:
+                connection.execute_wrappers.append(slow_query)
+
+        connection_created.connect(add_latency, dispatch_uid='benchmark_concurrency')
+        try:
+            runs = {
+                f'WSGI, sync view, {options["workers"]} threads': lambda: self.run_wsgi(
+                    sync_path, options['requests'], options['concurrency'], options['workers']),
+                'ASGI, sync view': lambda: asyncio.run(self.run_asgi(
+                    sync_path, options['requests'], options['concurrency'])),
+                'ASGI, async view': lambda: asyncio.run(self.run_asgi(
+                    async_path, options['requests'], options['concurrency'])),
+            }
+            self.stdout.write(
+                f'{options["endpoint"]}: {options["requests"]} requests, '
+                f'{options["concurrency"]} clients, {options["db_latency"]:g} ms per query')
+            for name, run in runs.items():
+                self.report(name, *run())
+        finally:
+            connection_created.disconnect(dispatch_uid='benchmark_concurrency')
+
+    def run_wsgi(self, path, requests, concurrency, workers):
+        application = WSGIHandler()
+        # Only `workers` requests are served at a time, the others wait.
+        server = threading.BoundedSemaphore(workers)
+        remaining = iter(range(requests))
+        lock = threading.Lock()
+        latencies, statuses = [], []
+
+        def client():
+            while True:
+                with lock:
+                    if next(remaining, None) is None:
+                        return
+                began = time.perf_counter()
+                with server:
+                    status_code = wsgi_request(application, path, self.host, self.authorization)
+                with lock:
+                    latencies.append(time.perf_counter() - began)
+                    statuses.append(status_code)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for future in [executor.submit(client) for _ in range(concurrency)]:
+                future.result()
+        return time.perf_counter() - start, latencies, statuses
+
+    async def run_asgi(self, path, requests, concurrency):
+        application = ASGIHandler()
+        remaining = iter(range(requests))
+        latencies, statuses = [], []
+
+        async def client():
+            while next(remaining, None) is not None:
+                began = time.perf_counter()
+                statuses.append(await self.asgi_request(application, path))
+                latencies.append(time.perf_counter() - began)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        return time.perf_counter() - start, latencies, statuses
+
+    async def asgi_request(self, application, path):
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': b'',
+            'root_path': '',
+            'headers': [
+                (b'host', self.host.encode()),
+                (b'authorization', self.authorization.encode()),
+            ],
+            'client': ('127.0.0.1', 0),
+            'server': (self.host, 80),
+        }
+        status_codes = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status_codes.append(message['status'])
+
+        await application(scope, receive, send)
+        return status_codes[0]
+
+    def report(self, name, elapsed, latencies, statuses):
+        errors = [status_code for status_code in statuses if status_code >= 400]
+        if errors:
+            raise CommandError(f'{name}: {len(errors)} requests failed (status {errors[0]}).')
+        latencies.sort()
+        self.stdout.write(
+            f'{name:32} {len(latencies) / elapsed:8.1f} req/s  '
+            f'p50 {percentile(latencies, 0.5) * 1000:8.2f} ms  '
+            f'p95 {percentile(latencies, 0.95) * 1000:8.2f} ms  '
+            f'p99 {percentile(latencies, 0.99) * 1000:8.2f} ms')
@@ -0,0 +1,119 @@
+import threading
+import time
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+from django.urls import reverse
+
+from .benchmark_concurrency import wsgi_request
+from .benchmark_endpoints import authorization_header, percentile
+
+
+# Endpoint -> view name.
+ENDPOINTS = {
+    'vendors': 'vendors',
+    'vendor_leaderboard': 'vendor_leaderboard',
+    'purchase_orders': 'purchase_orders',
+    'historical_performance': 'index',
+}
+
+# Run name -> (CONN_MAX_AGE, CONN_HEALTH_CHECKS).
+RUNS = {
+    'new connection per request': (0, False),
+    'persistent (CONN_MAX_AGE=60)': (60, False),
+    'persistent + health checks': (60, True),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare requests/sec of the WSGI handler with a new database "
+        "connection per request (CONN_MAX_AGE=0) and with persistent "
+        "connections, with and without health checks, using --threads worker "
+        "threads like a threaded WSGI server. Runs against the configured "
+        "database: a local PostgreSQL (or PgBouncer) shows the real connection "
+        "cost; with SQLite, --connect-latency stands in for it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoint', choices=ENDPOINTS, default='vendors')
+        parser.add_argument('--requests', type=int, default=1000,
+                            help='Requests per run.')
+        parser.add_argument('--threads', type=int, default=8,
+                            help='Worker threads, each sending requests back to back.')
+        parser.add_argument('--connect-latency', type=float, default=0.0,
+                            help='Milliseconds added to every new connection.')
+        parser.add_argument('--host', default='localhost',
+                            help='Host header of the requests (must be in ALLOWED_HOSTS).')
+
+    def handle(self, *args, **options):
+        self.host = options['host']
+        self.authorization = authorization_header()
+        path = reverse(ENDPOINTS[options['endpoint']])
+        database = connections.settings[DEFAULT_DB_ALIAS]
+        configured = (database['CONN_MAX_AGE'], database['CONN_HEALTH_CHECKS'])
+        latency = options['connect_latency'] / 1000
+        lock = threading.Lock()
+        self.connections_opened = 0
+
+        def connected(sender, connection, **kwargs):
+            with lock:
+                self.connections_opened += 1
+            time.sleep(latency)
+
+        connection_created.connect(connected, dispatch_uid='benchmark_connections')
+        self.stdout.write(
+            f'{options["endpoint"]} on {database["ENGINE"]}: {options["requests"]} requests, '
+            f'{options["threads"]} threads, {options["connect_latency"]:g} ms added per connection')
+        try:
+            for name, (max_age, health_checks) in RUNS.items():
+                # Read by the connections the worker threads open.
+                database['CONN_MAX_AGE'] = max_age
+                database['CONN_HEALTH_CHECKS'] = health_checks
+                self.connections_opened = 0
+                self.report(name, *self.run(path, options['requests'], options['threads']))
+        finally:
+            database['CONN_MAX_AGE'], database['CONN_HEALTH_CHECKS'] = configured
+            connection_created.disconnect(dispatch_uid='benchmark_connections')
+
+    def run(self, path, requests, threads):
+        application = WSGIHandler()
+        remaining = iter(range(requests))
+        lock = threading.Lock()
+        latencies, statuses = [], []
+
+        def worker():
+            try:
+                while True:
+                    with lock:
+                        if next(remaining, None) is None:
+                            return
+                    began = time.perf_counter()
+                    status_code = wsgi_request(application, path, self.host, self.authorization)
+                    with lock:
+                        latencies.append(time.perf_counter() - began)
+                        statuses.append(status_code)
+            finally:
+                # Persistent connections belong to this thread.
+                connections.close_all()
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return time.perf_counter() - start, latencies, statuses
+
+    def report(self, name, elapsed, latencies, statuses):
+        errors = [status_code for status_code in statuses if status_code >= 400]
+        if errors:
+            raise CommandError(f'{name}: {len(errors)} requests failed (status {errors[0]}).')
+        latencies.sort()
+        self.stdout.write(
+            f'{name:30} {len(latencies) / elapsed:8.1f} req/s  '
+            f'p50 {percentile(latencies, 0.5) * 1000:8.2f} ms  '
+            f'p95 {percentile(latencies, 0.95) * 1000:8.2f} ms  '
+            f'{self.connections_opened:5d} connections')
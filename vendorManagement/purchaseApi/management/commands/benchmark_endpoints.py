@@ -0,0 +1,252 @@
+import json
+import statistics
+import time
+from contextlib import ExitStack
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Count
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from purchaseApi.models import PurchaseOrder
+from vendorApi.models import Vendor
+from vendorManagement.authentication import JWT, authentication_mode, issue_jwt
+
+
+BENCH_USER = 'benchmark'
+BENCH_PREFIX = 'EPBENCH'
+
+
+def authorization_header():
+    """
+    `Authorization` header of the benchmark user, for the current
+    `API_AUTHENTICATION` mode.
+    """
+    user, _ = User.objects.get_or_create(username=BENCH_USER, defaults={'is_staff': True})
+    if authentication_mode() == JWT:
+        return 'Bearer ' + issue_jwt(user)['access']
+    token, _ = Token.objects.get_or_create(user=user)
+    return 'Token ' + token.key
+
+
+def percentile(sorted_values, quantile):
+    index = min(len(sorted_values) - 1, int(round(quantile * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class QueryCounter:
+    """
+    Database execute wrapper counting the queries it sees.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive every API endpoint with APIClient against the current database "
+        "and report throughput, latency percentiles and queries per request, "
+        "plus the timing of Vendor.update_performance_metrics. Generate data "
+        "first with `generate_data`. --output saves the results as JSON and "
+        "--baseline compares against a previous run, failing when an endpoint "
+        "got slower than --threshold or issues more queries."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50,
+                            help='Timed requests per endpoint.')
+        parser.add_argument('--warmup', type=int, default=3,
+                            help='Untimed requests per endpoint before measuring.')
+        parser.add_argument('--host', default='localhost',
+                            help='Host header of the requests (must be in ALLOWED_HOSTS).')
+        parser.add_argument('--endpoint', action='append', dest='endpoints',
+                            help='Only run the named endpoint (may be repeated).')
+        parser.add_argument('--output', help='Write the results to this JSON file.')
+        parser.add_argument('--baseline', help='Compare with the results in this JSON file.')
+        parser.add_argument('--threshold', type=float, default=20.0,
+                            help='Allowed p50 latency increase over the baseline, in percent.')
+
+    def handle(self, *args, **options):
+        vendor_id = (PurchaseOrder.objects.values('vendor_id')
+                     .annotate(n=Count('pk')).order_by('-n')
+                     .values_list('vendor_id', flat=True).first())
+        if vendor_id is None:
+            raise CommandError('No purchase orders to benchmark, use generate_data.')
+
+        client = self.client(options['host'])
+        results = {}
+        try:
+            endpoints = self.endpoints(client, vendor_id)
+            if options['endpoints']:
+                unknown = set(options['endpoints']) - set(endpoints)
+                if unknown:
+                    raise CommandError(f'Unknown endpoint(s): {", ".join(sorted(unknown))}. '
+                                       f'Available: {", ".join(endpoints)}.')
+                endpoints = {name: endpoints[name] for name in options['endpoints']}
+            for name, request in endpoints.items():
+                results[name] = self.measure(
+                    lambda: request(client), options['warmup'], options['requests'], name)
+                self.report(name, results[name])
+            if not options['endpoints']:
+                vendor = Vendor.objects.get(pk=vendor_id)
+                name = 'update_performance_metrics'
+                results[name] = self.measure(
+                    lambda: vendor.update_performance_metrics(record_history=False),
+                    options['warmup'], options['requests'], name)
+                self.report(name, results[name])
+        finally:
+            self.cleanup()
+
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump({
+                    'created_at': timezone.now().isoformat(),
+                    'purchase_orders': PurchaseOrder.objects.count(),
+                    'vendor_purchase_orders': PurchaseOrder.objects.filter(vendor_id=vendor_id).count(),
+                    'results': results,
+                }, file, indent=2)
+        if options['baseline']:
+            self.compare(results, options['baseline'], options['threshold'])
+
+    def client(self, host):
+        client = APIClient(HTTP_HOST=host)
+        client.credentials(HTTP_AUTHORIZATION=authorization_header())
+        return client
+
+    def endpoints(self, client, vendor_id):
+        """
+        Name -> callable issuing one request with the client. Writes only touch
+        purchase orders created by the benchmark, which `cleanup` deletes.
+        """
+        po_id = PurchaseOrder.objects.filter(vendor_id=vendor_id).order_by('pk').values_list(
+            'pk', flat=True).first()
+        counter = iter(range(10 ** 9))
+        now = timezone.now()
+
+        def new_order():
+            return {
+                'po_number': f'{BENCH_PREFIX}-{next(counter)}', 'vendor': vendor_id,
+                'order_date': now.isoformat(), 'delivery_date': (now + timedelta(days=7)).isoformat(),
+                'items': [{'sku': 'SKU-00001', 'item_name': 'Benchmark', 'quantity': 1,
+                           'unit_price': 1.0}],
+                'quantity': 1, 'status': 'pending', 'issue_date': now.isoformat(),
+            }
+
+        def get(url, **params):
+            return lambda client: client.get(url, params)
+
+        def stream(url, **params):
+            def request(client):
+                response = client.get(url, params)
+                b''.join(response.streaming_content)
+                return response
+            return request
+
+        def create(client):
+            return client.post(reverse('purchase_order_create'), new_order(), format='json')
+
+        def create_and_delete(client):
+            response = create(client)
+            return client.delete(reverse('purchase_order_detail', args=[response.data['id']]))
+
+        def bulk_create(client):
+            return client.post(reverse('purchase_order_bulk_create'),
+                               [new_order() for _ in range(100)], format='json')
+
+        # Purchase orders acknowledged by the acknowledge endpoints.
+        response = bulk_create(client)
+        self.check_response(response, 'purchase_order_bulk_create')
+        ids = response.data['ids']
+
+        return {
+            'vendors': get(reverse('vendors')),
+            'vendor_detail': get(reverse('vendor_detail', args=[vendor_id])),
+            'vendor_performance': get(reverse('vendor_performance', args=[vendor_id])),
+            'vendor_leaderboard': get(reverse('vendor_leaderboard'), min_orders=10, page_size=10),
+            'purchase_orders': get(reverse('purchase_orders')),
+            'purchase_orders_by_vendor': get(reverse('purchase_orders'), vendor=vendor_id),
+            'purchase_order_detail': get(reverse('purchase_order_detail', args=[po_id])),
+            'purchase_orders_export': stream(reverse('purchase_orders_export'), vendor=vendor_id),
+            'historical_performance': get(reverse('index'), vendor=vendor_id),
+            'historical_performance_export': stream(
+                reverse('historical_performance_export'), vendor=vendor_id),
+            'vendor_history': get(reverse('vendor_history', args=[vendor_id]), bucket='week'),
+            'purchase_order_create': create,
+            'purchase_order_create_delete': create_and_delete,
+            'acknowledge_purchase_order': lambda client: client.post(
+                reverse('acknowledge_purchase_order', args=[ids[0]])),
+            'acknowledge_purchase_orders': lambda client: client.post(
+                reverse('acknowledge_purchase_orders'), {'ids': ids}, format='json'),
+            'purchase_order_bulk_create': bulk_create,
+        }
+
+    def measure(self, run, warmup, repeat, name):
+        for _ in range(warmup):
+            self.check_response(run(), name)
+        latencies, queries = [], []
+        start = time.perf_counter()
+        for _ in range(repeat):
+            counter = QueryCounter()
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(counter))
+                began = time.perf_counter()
+                self.check_response(run(), name)
+                latencies.append(time.perf_counter() - began)
+            queries.append(counter.count)
+        elapsed = time.perf_counter() - start
+        latencies.sort()
+        return {
+            'requests': repeat,
+            'throughput': repeat / elapsed,
+            'p50_ms': percentile(latencies, 0.5) * 1000,
+            'p95_ms': percentile(latencies, 0.95) * 1000,
+            'p99_ms': percentile(latencies, 0.99) * 1000,
+            'mean_ms': statistics.mean(latencies) * 1000,
+            'queries': max(queries),
+        }
+
+    def check_response(self, response, name):
+        status_code = getattr(response, 'status_code', 200)
+        if status_code >= 400:
+            raise CommandError(f'{name}: unexpected status {status_code}: {getattr(response, "data", "")}')
+
+    def report(self, name, result):
+        self.stdout.write(
+            f'{name:32} {result["throughput"]:8.1f} req/s  '
+            f'p50 {result["p50_ms"]:8.2f} ms  p95 {result["p95_ms"]:8.2f} ms  '
+            f'p99 {result["p99_ms"]:8.2f} ms  {result["queries"]:3d} queries')
+
+    def compare(self, results, path, threshold):
+        with open(path) as file:
+            baseline = json.load(file)['results']
+        regressions = []
+        self.stdout.write(self.style.MIGRATE_HEADING(f'Compared with {path}'))
+        for name, result in results.items():
+            previous = baseline.get(name)
+            if previous is None:
+                continue
+            change = (result['p50_ms'] - previous['p50_ms']) / previous['p50_ms'] * 100
+            line = (f'{name:32} p50 {previous["p50_ms"]:8.2f} -> {result["p50_ms"]:8.2f} ms '
+                    f'({change:+.0f}%)  queries {previous["queries"]} -> {result["queries"]}')
+            if change > threshold or result['queries'] > previous['queries']:
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+        if regressions:
+            raise CommandError(f'Regressions: {", ".join(regressions)}')
+
+    def cleanup(self):
+        for purchase_order in PurchaseOrder.objects.filter(po_number__startswith=BENCH_PREFIX):
+            purchase_order.delete()
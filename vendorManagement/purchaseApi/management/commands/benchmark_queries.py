@@ -0,0 +1,200 @@
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, F
+from django.http import QueryDict
+from django.utils import timezone
+from django.utils.http import urlencode
+
+from historyApi.models import HistoricalPerformance
+from purchaseApi.filters import filter_purchase_orders
+from purchaseApi.lineitems import quantity_mismatches, sku_spend
+from purchaseApi.models import PurchaseOrder, PurchaseOrderItem
+from purchaseApi.synthetic import SyntheticData
+from vendorApi.leaderboard import leaderboard_ordering, leaderboard_queryset
+from vendorApi.metrics import aggregate_counters
+from vendorApi.models import Vendor
+from vendorManagement.pagination import KeysetPagination
+
+
+SEED_PREFIX = 'BENCH'
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the hot query shapes (vendor metrics, status and "
+        "acknowledgment filters, latest history snapshot, PO list filters, "
+        "line item aggregates). Prints the query plan and median timing of "
+        "each, with and without the indexes declared on PurchaseOrder, "
+        "PurchaseOrderItem, HistoricalPerformance and Vendor. "
+        "Run it against a scratch database: --compare drops and recreates indexes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed-vendors', type=int, default=0,
+            help='Create this many benchmark vendors before measuring.')
+        parser.add_argument(
+            '--orders-per-vendor', type=int, default=1000,
+            help='Purchase orders created per seeded vendor.')
+        parser.add_argument(
+            '--history-per-vendor', type=int, default=100,
+            help='Historical performance rows created per seeded vendor.')
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Number of timed runs per query.')
+        parser.add_argument(
+            '--compare', action='store_true',
+            help='Also measure with the indexes dropped, then recreate them.')
+        parser.add_argument(
+            '--without', action='append', metavar='INDEX',
+            help='With --compare, only drop the named index (may be repeated).')
+
+    def handle(self, *args, **options):
+        if options['seed_vendors']:
+            self.seed(options)
+
+        vendor_id = (PurchaseOrder.objects.values('vendor_id')
+                     .annotate(n=Count('pk')).order_by('-n')
+                     .values_list('vendor_id', flat=True).first())
+        if vendor_id is None:
+            raise CommandError('No purchase orders to benchmark, use --seed-vendors.')
+        self.stdout.write(
+            f'{PurchaseOrder.objects.count()} purchase orders, '
+            f'{HistoricalPerformance.objects.count()} history rows, '
+            f'largest vendor #{vendor_id}.\n')
+
+        queries = self.queries(vendor_id)
+        if options['compare']:
+            with self.indexes_dropped(options['without']):
+                self.stdout.write(self.style.MIGRATE_HEADING(
+                    f'Without {", ".join(options["without"])}' if options['without']
+                    else 'Without indexes'))
+                self.measure(queries, options['repeat'])
+        self.stdout.write(self.style.MIGRATE_HEADING('With indexes'))
+        self.measure(queries, options['repeat'])
+
+    def queries(self, vendor_id):
+        """
+        Name -> (queryset to explain, callable to time).
+        """
+        orders = PurchaseOrder.objects.filter(vendor_id=vendor_id)
+        now = timezone.now()
+        completed = orders.filter(status='completed')
+        acknowledged = orders.filter(acknowledgment_date__isnull=False)
+        latest = (HistoricalPerformance.objects.filter(vendor_id=vendor_id)
+                  .order_by('-date', '-pk')[:1])
+        pending = PurchaseOrder.objects.filter(status='pending')
+        recently_acknowledged = PurchaseOrder.objects.filter(
+            acknowledgment_date__gte=now - timedelta(days=1))
+        top_vendors = leaderboard_queryset('on_time_delivery_rate', min_orders=10).order_by(
+            *leaderboard_ordering('on_time_delivery_rate'))[:10]
+        sample = orders.order_by('pk').values('po_number', 'order_date', 'delivery_date').first()
+        minute = timedelta(minutes=1)
+
+        def first_page(**params):
+            # Query of the first page of the filtered PO list.
+            queryset = filter_purchase_orders(PurchaseOrder.objects.all(), QueryDict(urlencode(params)))
+            return queryset.order_by('pk')[:KeysetPagination().page_size + 1]
+
+        filtered = {
+            'status': first_page(status='pending'),
+            'vendor and status': first_page(vendor=vendor_id, status='completed'),
+            'order date range': first_page(
+                order_date_from=(now - timedelta(days=2)).isoformat(), order_date_to=now.isoformat()),
+            'delivery date range': first_page(
+                delivery_date_from=now.isoformat(),
+                delivery_date_to=(now + timedelta(days=1)).isoformat()),
+            # Few matching rows: without an index, the page scans the table.
+            'order date (1 minute)': first_page(
+                order_date_from=sample['order_date'].isoformat(),
+                order_date_to=(sample['order_date'] + minute).isoformat()),
+            'delivery date (1 minute)': first_page(
+                delivery_date_from=sample['delivery_date'].isoformat(),
+                delivery_date_to=(sample['delivery_date'] + minute).isoformat()),
+            'not acknowledged': first_page(acknowledged='false'),
+            'quality rating range': first_page(min_quality_rating=4.9, max_quality_rating=4.95),
+            'quality rating (narrow)': first_page(min_quality_rating=4.987, max_quality_rating=4.9875),
+            'po_number prefix': first_page(po_number=sample['po_number'].rsplit('-', 1)[0] + '-'),
+            'sku': first_page(sku='SKU-00002'),
+        }
+        spend = sku_spend(orders)[:100]
+        mismatches = quantity_mismatches(orders)
+        return {
+            'vendor metrics (single aggregate)': (
+                orders, lambda: aggregate_counters(orders)),
+            'completed count': (completed, completed.count),
+            'on-time count': (
+                completed.filter(delivery_date__lte=F('completion_date')),
+                completed.filter(delivery_date__lte=F('completion_date')).count),
+            'acknowledged count': (acknowledged, acknowledged.count),
+            'latest history snapshot': (latest, lambda: list(latest.all())),
+            'pending orders (all vendors)': (pending, pending.count),
+            'acknowledged in the last day': (
+                recently_acknowledged, recently_acknowledged.count),
+            'leaderboard top 10 (on-time rate, 10+ orders)': (
+                top_vendors, lambda: list(top_vendors.all())),
+            **{f'PO list filtered by {name} (first page)': (page, lambda page=page: list(page.all()))
+               for name, page in filtered.items()},
+            'spend per SKU (one vendor)': (spend, lambda: list(spend.all())),
+            'quantity mismatches (one vendor)': (mismatches, mismatches.count),
+        }
+
+    def measure(self, queries, repeat):
+        for name, (queryset, run) in queries.items():
+            run()  # Warm the cache.
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                run()
+                timings.append((time.perf_counter() - start) * 1000)
+            self.stdout.write(self.style.SUCCESS(
+                f'{name}: {statistics.median(timings):.2f} ms (median of {repeat})'))
+            self.stdout.write(queryset.explain())
+            self.stdout.write('')
+
+    def indexes_dropped(self, names=None):
+        command = self
+
+        class IndexesDropped:
+            def __enter__(self):
+                command.toggle_indexes(drop=True, names=names)
+
+            def __exit__(self, *exc_info):
+                command.toggle_indexes(drop=False, names=names)
+
+        return IndexesDropped()
+
+    def toggle_indexes(self, drop, names=None):
+        models = (PurchaseOrder, PurchaseOrderItem, HistoricalPerformance, Vendor)
+        if names:
+            unknown = set(names) - {index.name for model in models for index in model._meta.indexes}
+            if unknown:
+                raise CommandError(f'Unknown index: {", ".join(sorted(unknown))}.')
+        with connection.schema_editor() as schema_editor:
+            for model in models:
+                for index in model._meta.indexes:
+                    if names and index.name not in names:
+                        continue
+                    if drop:
+                        schema_editor.remove_index(model, index)
+                    else:
+                        schema_editor.add_index(model, index)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+    def seed(self, options):
+        """
+        Bulk insert benchmark vendors with purchase orders and history rows.
+        """
+        def progress(done, total):
+            self.stdout.write(f'Seeded vendor {done}/{total}', ending='\r')
+
+        SyntheticData(SEED_PREFIX).generate(
+            options['seed_vendors'], options['orders_per_vendor'],
+            options['history_per_vendor'], progress=progress)
+        self.stdout.write('')
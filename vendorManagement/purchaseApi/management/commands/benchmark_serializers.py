@@ -0,0 +1,72 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from historyApi.models import HistoricalPerformance
+from historyApi.serializer import (HistoricalPerformanceSerializer,
+                                   historical_performance_list_serializer)
+from purchaseApi.models import PurchaseOrder
+from purchaseApi.serializer import PurchaseOrderSerializer, purchase_order_list_serializer
+from vendorApi.models import Vendor
+from vendorApi.serializer import VendorSerializer, vendor_list_serializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark list serialization: the ModelSerializers against the "
+        "values_list() based fast serializers used by the list endpoints. "
+        "Prints rows/sec for both (query and rendering included) and checks "
+        "that they render identical JSON. Seed data with "
+        "`benchmark_queries --seed-vendors`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows', type=int, default=10000,
+            help='Number of rows serialized per run.')
+        parser.add_argument(
+            '--repeat', type=int, default=3,
+            help='Number of timed runs; the best one is reported.')
+
+    def handle(self, *args, **options):
+        cases = {
+            'vendors': (Vendor, VendorSerializer, vendor_list_serializer),
+            'purchase orders': (PurchaseOrder, PurchaseOrderSerializer,
+                                purchase_order_list_serializer),
+            'historical performance': (HistoricalPerformance, HistoricalPerformanceSerializer,
+                                       historical_performance_list_serializer),
+        }
+        if not PurchaseOrder.objects.exists():
+            raise CommandError('No purchase orders to benchmark, use benchmark_queries --seed-vendors.')
+
+        renderer = JSONRenderer()
+        for name, (model, serializer_class, fast) in cases.items():
+            queryset = model.objects.order_by('pk')[:options['rows']]
+            model_data = serializer_class(queryset, many=True).data
+            fast_data = fast.to_representation(fast.rows(queryset))
+            if renderer.render(model_data) != renderer.render(fast_data):
+                raise CommandError(f'{name}: fast serializer output differs from {serializer_class.__name__}.')
+
+            count = len(fast_data)
+            model_time = self.best_time(
+                lambda: renderer.render(serializer_class(queryset.all(), many=True).data),
+                options['repeat'])
+            fast_time = self.best_time(
+                lambda: renderer.render(fast.to_representation(fast.rows(queryset.all()))),
+                options['repeat'])
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{name} ({count} rows)'))
+            self.stdout.write(f'  {serializer_class.__name__}: {self.rate(count, model_time)}')
+            self.stdout.write(f'  fast serializer: {self.rate(count, fast_time)} '
+                              f'({model_time / fast_time:.1f}x)')
+
+    def best_time(self, run, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    def rate(self, count, seconds):
+        return f'{count / seconds:,.0f} rows/sec'
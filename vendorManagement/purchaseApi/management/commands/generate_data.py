@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from purchaseApi.synthetic import DEFAULTS, SyntheticData
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic vendors with realistic purchase orders (line item "
+        "`items` JSON, acknowledgment, completion and rating distributions) "
+        "and historical performance rows. Runs are deterministic for a given "
+        "--seed and add vendors after the existing ones with the same --prefix."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vendors', type=int, default=10,
+                            help='Number of vendors to create.')
+        parser.add_argument('--orders-per-vendor', type=int, default=1000,
+                            help='Purchase orders created per vendor.')
+        parser.add_argument('--history-per-vendor', type=int, default=100,
+                            help='Historical performance rows created per vendor.')
+        parser.add_argument('--prefix', default='SYN',
+                            help='Prefix of the generated vendor codes and PO numbers.')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Random seed.')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Rows per INSERT.')
+        for name, default in DEFAULTS.items():
+            parser.add_argument(f'--{name.replace("_", "-")}', type=type(default), default=default,
+                                dest=name, help=f'Distribution parameter (default {default}).')
+
+    def handle(self, *args, **options):
+        generator = SyntheticData(
+            options['prefix'], seed=options['seed'], batch_size=options['batch_size'],
+            **{name: options[name] for name in DEFAULTS})
+
+        def progress(done, total):
+            self.stdout.write(f'Generated vendor {done}/{total}', ending='\r')
+
+        vendors = generator.generate(
+            options['vendors'], options['orders_per_vendor'], options['history_per_vendor'],
+            progress=progress)
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {len(vendors)} vendor(s) with {options["orders_per_vendor"]} purchase '
+            f'order(s) and {options["history_per_vendor"]} history row(s) each.'))
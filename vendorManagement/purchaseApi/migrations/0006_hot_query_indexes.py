@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:26
+
+from django.db import migrations, models
+
+from vendorManagement.migrationops import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run in a transaction (PostgreSQL).
+    atomic = False
+
+    dependencies = [
+        ('purchaseApi', '0005_alter_purchaseorder_acknowledgment_date'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='purchaseorder',
+            index=models.Index(fields=['vendor', 'status'], name='po_vendor_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='purchaseorder',
+            index=models.Index(condition=models.Q(('status', 'completed')), fields=['vendor', 'delivery_date'], name='po_vendor_completed_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='purchaseorder',
+            index=models.Index(condition=models.Q(('acknowledgment_date__isnull', False)), fields=['vendor', 'acknowledgment_date'], name='po_vendor_ack_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='purchaseorder',
+            index=models.Index(fields=['status'], name='po_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='purchaseorder',
+            index=models.Index(fields=['acknowledgment_date'], name='po_ack_date_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:02
+
+from django.db import migrations, models
+
+from vendorManagement.migrationops import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run in a transaction (PostgreSQL).
+    atomic = False
+
+    dependencies = [
+        ('purchaseApi', '0006_hot_query_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='purchaseorder',
+            index=models.Index(fields=['order_date'], name='po_order_date_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='purchaseorder',
+            index=models.Index(fields=['delivery_date'], name='po_delivery_date_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='purchaseorder',
+            index=models.Index(condition=models.Q(('quality_rating__isnull', False)), fields=['quality_rating'], name='po_quality_rating_idx'),
+        ),
+    ]
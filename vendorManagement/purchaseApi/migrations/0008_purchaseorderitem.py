@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('purchaseApi', '0007_list_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PurchaseOrderItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('sku', models.CharField(blank=True, max_length=100)),
+                ('description', models.CharField(blank=True, max_length=255)),
+                ('quantity', models.IntegerField(blank=True, null=True)),
+                ('unit_price', models.FloatField(blank=True, null=True)),
+                ('purchase_order', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='line_items', to='purchaseApi.purchaseorder')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['sku', 'purchase_order'], name='po_item_sku_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='purchaseorderitem',
+            constraint=models.UniqueConstraint(fields=('purchase_order', 'position'), name='po_item_position_unique'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendorApi', '0006_vendor_rank_indexes'),
+        ('purchaseApi', '0008_purchaseorderitem'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='purchaseorder',
+            name='vendor',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='vendorApi.vendor'),
+        ),
+    ]
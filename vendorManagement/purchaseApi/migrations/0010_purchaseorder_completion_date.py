@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:04
+
+from django.db import migrations, models
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+
+# Completion times were not recorded before this migration: completed orders
+# are dated now, which keeps their on-time status as of the migration, and
+# each vendor's on-time count is recounted against them.
+def backfill_completion_dates(apps, schema_editor):
+    Vendor = apps.get_model('vendorApi', 'Vendor')
+    PurchaseOrder = apps.get_model('purchaseApi', 'PurchaseOrder')
+    PurchaseOrder.objects.filter(status='completed').update(completion_date=timezone.now())
+    on_time = Q(status='completed') & Q(delivery_date__lte=F('completion_date'))
+    for vendor_id, completed_po_count in Vendor.objects.values_list(
+            'pk', 'completed_po_count').iterator():
+        on_time_po_count = PurchaseOrder.objects.filter(
+            on_time, vendor_id=vendor_id).aggregate(count=Count('pk'))['count']
+        Vendor.objects.filter(pk=vendor_id).update(
+            on_time_po_count=on_time_po_count,
+            on_time_delivery_rate=(on_time_po_count / completed_po_count * 100
+                                   if completed_po_count else 0.0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendorApi', '0006_vendor_rank_indexes'),
+        ('purchaseApi', '0009_purchaseorder_vendor_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='completion_date',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_completion_dates, migrations.RunPython.noop),
+    ]
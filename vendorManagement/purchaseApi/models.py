@@ -1,6 +1,11 @@
-from django.db import models
+import copy
+from datetime import datetime
+
+from django.db import models, transaction
 from django.utils import timezone
+from vendorApi.metrics import COMPLETED, PURCHASE_ORDER_FIELDS, apply_purchase_order_change
 from vendorApi.models import Vendor
+from vendorManagement.responsecache import invalidate_purchase_orders
 
 
 class PurchaseOrder(models.Model):
@@ -18,16 +23,27 @@ class PurchaseOrder(models.Model):
     - quality_rating: Optional field for providing a quality rating for the purchase order.
     - issue_date: Date and time when the purchase order was issued.
     - acknowledgment_date: Date and time when the purchase order was acknowledged.
+    - completion_date: Date and time when the purchase order was completed,
+      null unless its status is `completed`. Its on-time delivery is judged
+      against it (see `vendorApi.metrics.purchase_order_counters`).
 
     Methods:
     - __str__: String representation of the purchase order.
 
     Custom Save Method:
-    - Overrides the default save method to automatically set the acknowledgment_date if not provided.
+    - Overrides the default save method to automatically set the acknowledgment_date if not provided,
+      and the completion_date when the purchase order becomes completed.
+    - Saving or deleting a purchase order applies the change to the vendor's
+      counters and performance metrics in O(1) (see `vendorApi.metrics`).
+    - Deleting a purchase order invalidates its cached responses (saves do
+      so through `post_save`, see `vendorManagement.responsecache`).
+    - Saving a purchase order whose `items` changed rewrites its
+      `PurchaseOrderItem` rows (see `purchaseApi.lineitems`).
 
     """
     po_number = models.CharField(max_length=50, unique=True)
-    vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE)
+    # Lookups by vendor use `po_vendor_status_idx`, which starts with vendor.
+    vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE, db_index=False)
     order_date = models.DateTimeField()
     delivery_date = models.DateTimeField()
     items = models.JSONField()
@@ -36,11 +52,156 @@ class PurchaseOrder(models.Model):
     quality_rating = models.FloatField(null=True, blank=True)
     issue_date = models.DateTimeField()
     acknowledgment_date = models.DateTimeField(null=True, blank=True)
+    completion_date = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        # Access paths of the vendor metric queries (see `vendorApi.metrics`)
+        # and of the list filters (see `purchaseApi.filters`).
+        indexes = [
+            models.Index(fields=['vendor', 'status'], name='po_vendor_status_idx'),
+            models.Index(fields=['vendor', 'delivery_date'], name='po_vendor_completed_idx',
+                         condition=models.Q(status='completed')),
+            models.Index(fields=['vendor', 'acknowledgment_date'], name='po_vendor_ack_idx',
+                         condition=models.Q(acknowledgment_date__isnull=False)),
+            models.Index(fields=['status'], name='po_status_idx'),
+            models.Index(fields=['acknowledgment_date'], name='po_ack_date_idx'),
+            models.Index(fields=['order_date'], name='po_order_date_idx'),
+            models.Index(fields=['delivery_date'], name='po_delivery_date_idx'),
+            models.Index(fields=['quality_rating'], name='po_quality_rating_idx',
+                         condition=models.Q(quality_rating__isnull=False)),
+            # `po_number` prefix searches use the unique index: on PostgreSQL
+            # Django adds a `varchar_pattern_ops` copy of it for `LIKE
+            # 'prefix%'`, on SQLite `filter_purchase_orders` adds a range.
+        ]
 
     def __str__(self):
         return f"PO #{self.po_number} - {self.vendor.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Deferred fields would cost a query each, e.g. in a delete cascade.
+        if all(name in field_names for name in PURCHASE_ORDER_FIELDS):
+            instance._metric_state = instance.metric_state()
+        if 'items' in field_names:
+            instance._stored_items = copy.deepcopy(instance.items)
+        return instance
+
+    def metric_state(self):
+        """
+        Current values of the fields the vendor counters depend on, normalized
+        to Python types (see `vendorApi.metrics.PURCHASE_ORDER_FIELDS`).
+        """
+        state = {}
+        for name in PURCHASE_ORDER_FIELDS:
+            value = self._meta.get_field(name).to_python(getattr(self, name))
+            if isinstance(value, datetime) and timezone.is_naive(value):
+                value = timezone.make_aware(value)
+            state[name] = value
+        return state
+
+    def _stored_metric_state(self):
+        """
+        State of the purchase order as last loaded from or written to the database.
+        """
+        if self._state.adding:
+            return None
+        if hasattr(self, '_metric_state'):
+            return self._metric_state
+        return PurchaseOrder.objects.filter(pk=self.pk).values(
+            *PURCHASE_ORDER_FIELDS).first()
+
+    def set_completion_date(self, now=None):
+        """
+        Set `completion_date` when the purchase order becomes completed and
+        clear it when it leaves that status. It is not moved while the order
+        stays completed.
+        """
+        if self.status != COMPLETED:
+            self.completion_date = None
+        elif self.completion_date is None:
+            self.completion_date = now or timezone.now()
+
+    def items_changed(self, update_fields=None):
+        """
+        Whether `items` differs from the value last loaded or saved.
+        """
+        if update_fields is not None and 'items' not in update_fields:
+            return False
+        if self._state.adding or not hasattr(self, '_stored_items'):
+            return True
+        return self.items != self._stored_items
+
     def save(self, *args, **kwargs):
+        from .lineitems import sync_line_items
+
         if self.acknowledgment_date is None:
             self.acknowledgment_date = timezone.now()
-        super().save(*args, **kwargs)
+        self.set_completion_date()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'status' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'completion_date'}
+        adding = self._state.adding
+        items_changed = self.items_changed(kwargs.get('update_fields'))
+        with transaction.atomic():
+            old_state = self._stored_metric_state()
+            super().save(*args, **kwargs)
+            new_state = self.metric_state()
+            apply_purchase_order_change(old_state, new_state)
+            if items_changed:
+                sync_line_items([self], replace=not adding)
+        self._metric_state = new_state
+        self._stored_items = copy.deepcopy(self.items)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            old_state = self._stored_metric_state()
+            pk = self.pk
+            result = super().delete(*args, **kwargs)
+            apply_purchase_order_change(old_state, None)
+            vendor_ids = {self.vendor_id}
+            if old_state is not None:
+                vendor_ids.add(old_state['vendor_id'])
+            invalidate_purchase_orders([pk], vendor_ids)
+        return result
+
+
+class PurchaseOrderItem(models.Model):
+    """
+    Line item of a purchase order, one row per entry of `PurchaseOrder.items`.
+
+    A normalized, indexed copy of the `items` JSON for SKU search and spend
+    aggregation in SQL; `items` stays the source of truth. Rows are rewritten
+    when a purchase order is saved with new items and inserted by bulk
+    ingestion. Writes that bypass both (`QuerySet.update()`, raw SQL) leave
+    them stale until `backfill_line_items` runs.
+
+    Attributes:
+    - purchase_order: Purchase order holding the item.
+    - position: Index of the item in `items` (of the key when `items` is an object).
+    - sku: Stock keeping unit, empty when the item has none.
+    - description: `item_name` (or `description`) of the item, or the value
+      of an `items` object entry.
+    - quantity: Ordered quantity, null when missing or not a number.
+    - unit_price: Price of one unit, null when missing or not a number.
+    """
+    purchase_order = models.ForeignKey(
+        PurchaseOrder, on_delete=models.CASCADE, related_name='line_items', db_index=False)
+    position = models.PositiveIntegerField()
+    sku = models.CharField(max_length=100, blank=True)
+    description = models.CharField(max_length=255, blank=True)
+    quantity = models.IntegerField(null=True, blank=True)
+    unit_price = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            # Also the index of the purchase order's rows.
+            models.UniqueConstraint(fields=['purchase_order', 'position'],
+                                    name='po_item_position_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['sku', 'purchase_order'], name='po_item_sku_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.sku or self.description} x {self.quantity} ({self.purchase_order_id})"
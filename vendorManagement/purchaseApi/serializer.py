@@ -1,9 +1,138 @@
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
+from vendorApi.metrics import apply_purchase_order_changes
+from vendorApi.models import Vendor
+from vendorManagement.fastserializer import FastListSerializer
+from vendorManagement.instrumentation import TimedSerializerMixin
+from vendorManagement.responsecache import invalidate_purchase_orders
+from .lineitems import sync_line_items
 from .models import PurchaseOrder
 
 
-class PurchaseOrderSerializer(serializers.ModelSerializer):
+class PurchaseOrderSerializer(TimedSerializerMixin, serializers.ModelSerializer):
 
     class Meta:
         model = PurchaseOrder
         fields = '__all__'
+
+
+# Read-only list serialization from `values_list()` rows, same output as
+# `PurchaseOrderSerializer(many=True)`.
+purchase_order_list_serializer = FastListSerializer(PurchaseOrderSerializer)
+
+
+class PurchaseOrderAcknowledgeSerializer(serializers.Serializer):
+    """
+    Payload of the bulk acknowledge endpoint: the ids of the POs to acknowledge.
+    """
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, max_length=10000)
+
+
+class PurchaseOrderBulkListSerializer(serializers.ListSerializer):
+    """
+    Validates and inserts many purchase orders at once.
+
+    Rows are validated independently: invalid rows are collected in
+    `row_errors` (keyed by their index in the payload) and the valid ones are
+    inserted. Checks that would cost a query per row (vendor existence,
+    po_number uniqueness) run once for the whole payload.
+    """
+    # Rows per INSERT and per `IN (...)` lookup.
+    batch_size = 500
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            raise serializers.ValidationError(
+                {'non_field_errors': ['Expected a list of purchase orders.']})
+        max_rows = getattr(settings, 'PURCHASE_ORDER_BULK_MAX_ROWS', 10000)
+        if len(data) > max_rows:
+            raise serializers.ValidationError(
+                {'non_field_errors': [f'At most {max_rows} purchase orders per request.']})
+
+        self.row_errors = {}
+        rows = {}
+        for index, item in enumerate(data):
+            try:
+                rows[index] = self.child.run_validation(item)
+            except serializers.ValidationError as exc:
+                self.row_errors[index] = exc.detail
+
+        self.check_vendors(rows)
+        self.check_po_numbers(rows)
+        self.row_indexes = list(rows)
+        return list(rows.values())
+
+    def reject(self, rows, index, field, message):
+        self.row_errors[index] = {field: [message]}
+        del rows[index]
+
+    def check_vendors(self, rows):
+        vendor_ids = {attrs['vendor_id'] for attrs in rows.values()}
+        existing = set()
+        for chunk in chunked(list(vendor_ids), self.batch_size):
+            existing.update(Vendor.objects.filter(
+                pk__in=chunk).values_list('pk', flat=True))
+        for index, attrs in list(rows.items()):
+            if attrs['vendor_id'] not in existing:
+                self.reject(rows, index, 'vendor',
+                            f'Invalid pk "{attrs["vendor_id"]}" - object does not exist.')
+
+    def check_po_numbers(self, rows):
+        seen = set()
+        for index, attrs in list(rows.items()):
+            if attrs['po_number'] in seen:
+                self.reject(rows, index, 'po_number',
+                            'Duplicate po_number in this request.')
+            seen.add(attrs['po_number'])
+
+        existing = set()
+        for chunk in chunked(list(seen), self.batch_size):
+            existing.update(PurchaseOrder.objects.filter(
+                po_number__in=chunk).values_list('po_number', flat=True))
+        for index, attrs in list(rows.items()):
+            if attrs['po_number'] in existing:
+                self.reject(rows, index, 'po_number',
+                            'purchase order with this po number already exists.')
+
+    def create(self, validated_data):
+        now = timezone.now()
+        purchase_orders = []
+        for attrs in validated_data:
+            purchase_order = PurchaseOrder(**attrs)
+            if purchase_order.acknowledgment_date is None:
+                purchase_order.acknowledgment_date = now
+            purchase_order.set_completion_date(now)
+            purchase_orders.append(purchase_order)
+
+        with transaction.atomic():
+            PurchaseOrder.objects.bulk_create(
+                purchase_orders, batch_size=self.batch_size)
+            sync_line_items(purchase_orders, replace=False)
+            apply_purchase_order_changes(
+                (None, po.metric_state()) for po in purchase_orders)
+            invalidate_purchase_orders(
+                [po.pk for po in purchase_orders],
+                {po.vendor_id for po in purchase_orders})
+        return purchase_orders
+
+
+class PurchaseOrderBulkSerializer(serializers.ModelSerializer):
+    """
+    Purchase order serializer used by the bulk ingestion endpoint. Vendor and
+    po_number checks are done by `PurchaseOrderBulkListSerializer` in bulk.
+    """
+    vendor = serializers.IntegerField(source='vendor_id')
+
+    class Meta:
+        model = PurchaseOrder
+        fields = '__all__'
+        extra_kwargs = {'po_number': {'validators': []}}
+        list_serializer_class = PurchaseOrderBulkListSerializer
+
+
+def chunked(values, size):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
@@ -0,0 +1,153 @@
+import random
+from datetime import timedelta
+
+from django.utils import timezone
+
+from historyApi.models import HistoricalPerformance
+from vendorApi.models import Vendor
+
+from .lineitems import sync_line_items
+from .models import PurchaseOrder
+
+
+PRODUCTS = (
+    ('Steel bolts M8', 0.12), ('Copper wire 2.5mm', 1.8), ('Hydraulic pump', 420.0),
+    ('Safety gloves', 3.5), ('Pallet wrap', 22.0), ('Bearing 6204', 4.2),
+    ('Circuit breaker 16A', 9.9), ('LED panel 60x60', 31.0), ('PVC pipe 40mm', 5.6),
+    ('Industrial adhesive', 14.5), ('Drill bit set', 27.0), ('Cable ties', 0.04),
+)
+
+DEFAULTS = {
+    'completed_ratio': 0.7,
+    'canceled_ratio': 0.05,
+    'acknowledged_ratio': 0.85,
+    'on_time_ratio': 0.8,
+    'rated_ratio': 0.9,
+    'max_items': 5,
+}
+
+
+class SyntheticData:
+    """
+    Deterministic generator of vendors with realistic purchase orders and
+    historical performance rows, inserted with `bulk_create`.
+
+    Purchase orders are issued over the last year. `items` holds 1 to
+    `max_items` line items (`sku`, `item_name`, `quantity`, `unit_price`),
+    also written as `PurchaseOrderItem` rows, and `quantity` is their total.
+    Response times are log-normal (median about six hours, long tail over
+    days), completed orders are rated around a per-vendor mean, and each
+    vendor's counters and metrics are rebuilt once after its orders are
+    inserted.
+    """
+
+    def __init__(self, prefix, seed=0, batch_size=1000, **distribution):
+        self.prefix = prefix
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.config = {**DEFAULTS, **distribution}
+        self.now = timezone.now()
+
+    def existing_vendors(self):
+        return Vendor.objects.filter(vendor_code__startswith=self.prefix)
+
+    def generate(self, vendors, orders_per_vendor, history_per_vendor, progress=None):
+        """
+        Create `vendors` new vendors, numbered after the existing ones with
+        the same prefix. Returns the created vendors.
+        """
+        start = self.existing_vendors().count()
+        created = []
+        for number in range(start, start + vendors):
+            vendor = Vendor.objects.create(
+                name=f'Synthetic vendor {number}', contact_details=f'+1-555-{number:07d}',
+                address=f'{number} Industrial Way', vendor_code=f'{self.prefix}{number}')
+            self.create_orders(vendor, number, orders_per_vendor)
+            self.create_history(vendor, history_per_vendor)
+            vendor.update_performance_metrics(record_history=False)
+            created.append(vendor)
+            if progress is not None:
+                progress(number + 1 - start, vendors)
+        return created
+
+    def items(self):
+        items = []
+        for _ in range(self.rng.randint(1, self.config['max_items'])):
+            index = self.rng.randrange(len(PRODUCTS))
+            name, price = PRODUCTS[index]
+            items.append({
+                'sku': f'SKU-{index:05d}',
+                'item_name': name,
+                'quantity': self.rng.randint(1, 50),
+                'unit_price': round(price * self.rng.uniform(0.9, 1.1), 2),
+            })
+        return items
+
+    def status(self):
+        roll = self.rng.random()
+        if roll < self.config['completed_ratio']:
+            return 'completed'
+        if roll < self.config['completed_ratio'] + self.config['canceled_ratio']:
+            return 'canceled'
+        return 'pending'
+
+    def order(self, vendor, po_number, quality_mean):
+        config = self.config
+        issue_date = self.now - timedelta(minutes=self.rng.randint(60, 365 * 24 * 60))
+        status = self.status()
+        if status == 'completed' and self.rng.random() < config['on_time_ratio']:
+            delivery_date = issue_date + timedelta(days=self.rng.randint(1, 14))
+            delivery_date = min(delivery_date, self.now - timedelta(minutes=1))
+        else:
+            delivery_date = issue_date + timedelta(days=self.rng.randint(1, 30))
+            if status == 'completed':
+                # Late: still due after now.
+                delivery_date = max(delivery_date, self.now + timedelta(days=self.rng.randint(1, 7)))
+        acknowledgment_date = None
+        if status == 'completed' or self.rng.random() < config['acknowledged_ratio']:
+            hours = min(self.rng.lognormvariate(1.8, 1.0), 24 * 14)
+            acknowledgment_date = issue_date + timedelta(hours=hours)
+        quality_rating = None
+        if status == 'completed' and self.rng.random() < config['rated_ratio']:
+            quality_rating = round(min(5.0, max(1.0, self.rng.gauss(quality_mean, 0.6))), 1)
+        items = self.items()
+        return PurchaseOrder(
+            vendor=vendor, po_number=po_number,
+            order_date=issue_date - timedelta(hours=self.rng.randint(0, 48)),
+            issue_date=issue_date, delivery_date=delivery_date,
+            items=items, quantity=sum(item['quantity'] for item in items),
+            status=status, quality_rating=quality_rating,
+            acknowledgment_date=acknowledgment_date,
+            completion_date=self.now if status == 'completed' else None)
+
+    def create_orders(self, vendor, number, count):
+        quality_mean = self.rng.uniform(2.5, 4.8)
+        batch = []
+        for index in range(count):
+            batch.append(self.order(vendor, f'{self.prefix}{number}-{index}', quality_mean))
+            if len(batch) >= self.batch_size:
+                self.insert_orders(batch)
+                batch = []
+        if batch:
+            self.insert_orders(batch)
+
+    def insert_orders(self, purchase_orders):
+        PurchaseOrder.objects.bulk_create(purchase_orders)
+        sync_line_items(purchase_orders, replace=False)
+
+    def create_history(self, vendor, count):
+        snapshots = [
+            HistoricalPerformance(
+                vendor=vendor,
+                on_time_delivery_rate=self.rng.uniform(60, 100),
+                quality_rating_avg=self.rng.uniform(2.5, 5),
+                average_response_time=self.rng.uniform(3600, 86400),
+                fulfillment_rate=self.rng.uniform(50, 100))
+            for _ in range(count)
+        ]
+        HistoricalPerformance.objects.bulk_create(snapshots, batch_size=self.batch_size)
+        # `date` is auto_now_add: spread the snapshots over the last year.
+        step = timedelta(days=365) / max(count, 1)
+        for index, snapshot in enumerate(snapshots):
+            snapshot.date = self.now - step * (count - index)
+        HistoricalPerformance.objects.bulk_update(snapshots, ['date'], batch_size=self.batch_size)
@@ -1,11 +1,24 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.db.models.deletion import Collector
+from django.test.utils import CaptureQueriesContext
+from django.test import TestCase, override_settings
 from django.contrib.auth.models import User
 from rest_framework import status
 from rest_framework.test import APIClient
 from django.urls import reverse
+from historyApi.models import HistoricalPerformance
 from vendorApi.models import Vendor
-from .models import PurchaseOrder
+from .lineitems import missing_line_items, quantity_mismatches
+from .models import PurchaseOrder, PurchaseOrderItem
 from rest_framework.authtoken.models import Token
+from .serializer import PurchaseOrderSerializer, purchase_order_list_serializer
+import gzip
+import json
+import os
+from io import StringIO
+from django.core.management import CommandError, call_command
+from vendorManagement.testing import QueryCountTestCase
 
 
 class PurchaseViewsTestCase(TestCase):
@@ -45,6 +58,43 @@ class PurchaseViewsTestCase(TestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_purchase_orders_list_filters(self):
+        other = PurchaseOrder.objects.create(**{
+            **self.po_data, 'po_number': 'QO456', 'status': 'completed', 'quality_rating': 4.5,
+            'order_date': '2023-02-01T12:00:00Z', 'delivery_date': '2023-02-10T12:00:00Z'})
+        PurchaseOrder.objects.filter(pk=self.po.pk).update(acknowledgment_date=None)
+
+        def ids(**params):
+            response = self.client.get(reverse('purchase_orders'), params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return [row['id'] for row in response.data['results']]
+
+        both = [self.po.id, other.id]
+        self.assertEqual(ids(vendor=self.vendor.id), both)
+        self.assertEqual(ids(status='completed'), [other.id])
+        self.assertEqual(ids(status='Pending,completed'), both)
+        self.assertEqual(ids(order_date_from='2023-01-15', order_date_to='2023-03-01'), [other.id])
+        self.assertEqual(ids(order_date_to='2023-02-01T12:00:00Z'), [self.po.id])
+        self.assertEqual(ids(delivery_date_from='2023-01-10T12:00:00Z',
+                             delivery_date_to='2023-01-11'), [self.po.id])
+        self.assertEqual(ids(acknowledged='true'), [other.id])
+        self.assertEqual(ids(acknowledged='false'), [self.po.id])
+        self.assertEqual(ids(min_quality_rating=4, max_quality_rating=4.5), [other.id])
+        self.assertEqual(ids(max_quality_rating=4), [])
+        self.assertEqual(ids(po_number='PO1'), [self.po.id])
+        self.assertEqual(ids(po_number='po1'), [])
+        self.assertEqual(ids(po_number='PO1%'), [])
+        self.assertEqual(ids(status='completed', po_number='PO'), [])
+        self.assertEqual(ids(page_size=1, min_quality_rating=0, status='completed'), [other.id])
+
+        self.assertEqual(ids(status='', po_number=''), both)
+        for name, value in [('acknowledged', 'maybe'), ('order_date_from', 'yesterday'),
+                            ('delivery_date_to', '2023-13-01'), ('min_quality_rating', 'high'),
+                            ('max_quality_rating', 'nan')]:
+            response = self.client.get(reverse('purchase_orders'), {name: value})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, name)
+            self.assertIn(name, response.data)
+
     def test_purchase_order_create(self):
         url = reverse('purchase_order_create')
         response = self.client.post(url, data=self.po_data)
@@ -80,3 +130,518 @@ class PurchaseViewsTestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         with self.assertRaises(PurchaseOrder.DoesNotExist):
             PurchaseOrder.objects.get(pk=self.po.id)
+
+    def export(self, query=''):
+        response = self.client.get(reverse('purchase_orders_export') + query)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, b''.join(response.streaming_content)
+
+    def test_purchase_orders_export_ndjson(self):
+        response, body = self.export()
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual(rows, [PurchaseOrderSerializer(self.po).data])
+
+    def test_purchase_orders_export_csv_gzip(self):
+        response, body = self.export('?output=csv&gzip=true')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        lines = gzip.decompress(body).decode().splitlines()
+        self.assertEqual(lines[0].split(',')[:2], ['id', 'po_number'])
+        self.assertEqual(len(lines), 2)
+
+    def test_purchase_orders_export_filters(self):
+        _, body = self.export(f'?vendor={self.vendor.id + 1}')
+        self.assertEqual(body, b'')
+        response = self.client.get(reverse('purchase_orders_export') + '?vendor=abc')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def bulk_row(self, po_number, **kwargs):
+        row = {
+            'po_number': po_number,
+            'vendor': self.vendor.id,
+            'order_date': '2023-01-01T12:00:00Z',
+            'delivery_date': '2023-01-10T12:00:00Z',
+            'items': [{'item_name': 'Item1', 'quantity': 5}],
+            'quantity': 5,
+            'status': 'completed',
+            'quality_rating': 4.0,
+            'issue_date': '2023-01-05T12:00:00Z',
+        }
+        row.update(kwargs)
+        return row
+
+    def test_purchase_order_bulk_create(self):
+        rows = [self.bulk_row(f'BULK{i}') for i in range(20)]
+        # Token, vendor check, po_number check, INSERT, line items INSERT,
+        # vendor counters UPDATE (plus savepoints) and the vendor's history
+        # snapshot, independent of the number of rows.
+        with self.assertNumQueries(11):
+            response = self.client.post(
+                reverse('purchase_order_bulk_create'), rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 20)
+        self.assertEqual(PurchaseOrder.objects.filter(po_number__startswith='BULK').count(), 20)
+
+        self.vendor.refresh_from_db()
+        self.assertEqual(self.vendor.total_po_count, 21)
+        self.assertEqual(self.vendor.completed_po_count, 20)
+        self.assertEqual(self.vendor.quality_rating_avg, 4.0)
+
+    def test_purchase_order_bulk_create_row_errors(self):
+        rows = [
+            self.bulk_row('BULK1'),
+            self.bulk_row('PO123'),
+            self.bulk_row('BULK1'),
+            self.bulk_row('BULK2', vendor=self.vendor.id + 100),
+            self.bulk_row('BULK3', quantity='many'),
+        ]
+        response = self.client.post(
+            reverse('purchase_order_bulk_create'), rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2, 3, 4])
+        self.assertIn('po_number', response.data['errors'][0]['errors'])
+        self.assertIn('vendor', response.data['errors'][2]['errors'])
+        self.assertIn('quantity', response.data['errors'][3]['errors'])
+
+    def test_purchase_order_bulk_create_ndjson(self):
+        body = '\n'.join(json.dumps(self.bulk_row(f'NDJSON{i}')) for i in range(3))
+        response = self.client.post(
+            reverse('purchase_order_bulk_create'), body,
+            content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 3)
+
+        response = self.client.post(
+            reverse('purchase_order_bulk_create'), '{"po_number":',
+            content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_acknowledge_purchase_orders(self):
+        rows = [self.bulk_row(f'ACK{i}', acknowledgment_date='2023-01-05T12:00:00Z')
+                for i in range(10)]
+        response = self.client.post(
+            reverse('purchase_order_bulk_create'), rows, format='json')
+        ids = response.data['ids']
+        self.vendor.refresh_from_db()
+        self.assertEqual(self.vendor.response_time_count, 11)
+
+        # Independent of the number of POs: row lock, UPDATE, vendor counters
+        # UPDATE, vendor fetch and its history snapshot (the token is cached).
+        with self.assertNumQueries(8):
+            response = self.client.post(
+                reverse('acknowledge_purchase_orders'),
+                {'ids': ids + [0]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'acknowledged': 10, 'not_found': [0]})
+
+        acknowledged = PurchaseOrder.objects.filter(pk__in=ids)
+        self.assertFalse(acknowledged.filter(
+            acknowledgment_date='2023-01-05T12:00:00Z').exists())
+        self.vendor.refresh_from_db()
+        self.assertEqual(self.vendor.response_time_count, 11)
+        self.assertAlmostEqual(self.vendor.average_response_time,
+                               self.vendor.calculate_performance_metrics()['average_response_time'])
+
+    def test_acknowledge_purchase_orders_invalid(self):
+        response = self.client.post(
+            reverse('acknowledge_purchase_orders'), {'ids': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_benchmark_queries_command(self):
+        out = StringIO()
+        call_command('benchmark_queries', '--seed-vendors', '1', '--orders-per-vendor', '20',
+                     '--history-per-vendor', '2', '--repeat', '1', stdout=out)
+        self.assertIn('vendor metrics (single aggregate)', out.getvalue())
+        self.assertEqual(PurchaseOrder.objects.filter(po_number__startswith='BENCH').count(), 20)
+
+        out = StringIO()
+        call_command('benchmark_serializers', '--rows', '10', '--repeat', '1', stdout=out)
+        self.assertIn('rows/sec', out.getvalue())
+
+    def test_generate_data_command(self):
+        call_command('generate_data', '--vendors', '2', '--orders-per-vendor', '30',
+                     '--history-per-vendor', '3', '--prefix', 'SYN', stdout=StringIO())
+        vendors = Vendor.objects.filter(vendor_code__startswith='SYN')
+        self.assertEqual(vendors.count(), 2)
+        orders = PurchaseOrder.objects.filter(vendor__in=vendors)
+        self.assertEqual(orders.count(), 60)
+        for order in orders:
+            self.assertEqual(order.quantity, sum(item['quantity'] for item in order.items))
+        for vendor in vendors:
+            metrics = vendor.calculate_performance_metrics()
+            self.assertAlmostEqual(vendor.fulfillment_rate, metrics['fulfillment_rate'])
+            self.assertAlmostEqual(vendor.quality_rating_avg, metrics['quality_rating_avg'])
+
+    def test_benchmark_endpoints_command(self):
+        output = f'{self.id()}.json'
+        self.addCleanup(lambda: os.path.exists(output) and os.remove(output))
+        out = StringIO()
+        call_command('benchmark_endpoints', '--requests', '2', '--warmup', '0',
+                     '--host', 'testserver', '--output', output, stdout=out)
+        self.assertIn('update_performance_metrics', out.getvalue())
+        with open(output) as file:
+            results = json.load(file)['results']
+        self.assertEqual(results['vendor_detail']['queries'], 1)
+        self.assertFalse(PurchaseOrder.objects.filter(po_number__startswith='EPBENCH').exists())
+
+        # Every endpoint issuing more queries than the baseline is a regression.
+        for result in results.values():
+            result['queries'] -= 1
+        with open(output, 'w') as file:
+            json.dump({'results': results}, file)
+        with self.assertRaisesMessage(CommandError, 'Regressions: vendors'):
+            call_command('benchmark_endpoints', '--requests', '1', '--warmup', '0',
+                         '--host', 'testserver', '--endpoint', 'vendors', '--baseline', output, stdout=StringIO())
+
+    def test_admin_changelist_queries_do_not_grow_with_rows(self):
+        self.client.force_login(User.objects.create_superuser(
+            username='admin', password='adminpassword'))
+        url = reverse('admin:purchaseApi_purchaseorder_changelist')
+        with CaptureQueriesContext(connection) as few:
+            response = self.client.get(url, {'status': 'Pending'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        PurchaseOrder.objects.bulk_create([
+            PurchaseOrder(**{**self.po_data, 'po_number': f'ADMIN{i}'}) for i in range(10)])
+        Vendor.objects.bulk_create([
+            Vendor(name=f'Admin Vendor {i}', vendor_code=f'ADMINV{i}') for i in range(10)])
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(url, {'status': 'Pending'})
+        self.assertContains(response, 'ADMIN9')
+        self.assertNotContains(response, 'Admin Vendor')
+        self.assertEqual(len(many), len(few))
+
+        response = self.client.get(url, {'vendor__id__exact': self.vendor.id + 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotContains(response, 'ADMIN9')
+
+    @override_settings(TIME_ZONE='Asia/Kolkata')
+    def test_purchase_order_list_serializer_matches_model_serializer(self):
+        PurchaseOrder.objects.create(
+            po_number='PO124', vendor=self.vendor, order_date='2023-01-01T12:00:00.123456Z',
+            delivery_date='2023-01-10T12:00:00Z', items={'nested': [1, 'two', None]},
+            quantity=1, status='completed', quality_rating=4, issue_date='2023-01-05T12:00:00Z')
+        queryset = PurchaseOrder.objects.order_by('pk')
+        self.assertEqual(
+            json.dumps(purchase_order_list_serializer.to_representation(
+                purchase_order_list_serializer.rows(queryset))),
+            json.dumps(PurchaseOrderSerializer(queryset, many=True).data))
+
+
+    def test_async_views_match_sync_views(self):
+        for sync_name, async_name, args in [
+            ('purchase_orders', 'purchase_orders_async', []),
+            ('purchase_order_detail', 'purchase_order_detail_async', [self.po.id]),
+        ]:
+            expected = self.client.get(reverse(sync_name, args=args), {'vendor': self.vendor.id})
+            response = self.client.get(reverse(async_name, args=args), {'vendor': self.vendor.id})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json().get('results', response.json()),
+                             expected.json().get('results', expected.json()))
+        response = self.client.get(reverse('purchase_order_detail_async', args=[self.po.id + 1]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(RESPONSE_CACHE={'TIMEOUT': 60})
+class ResponseCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.vendor = Vendor.objects.create(name='Cached Vendor', vendor_code='CACHE001')
+        self.other_vendor = Vendor.objects.create(name='Other Vendor', vendor_code='CACHE002')
+        self.po = PurchaseOrder.objects.create(
+            po_number='CACHE-PO1', vendor=self.vendor,
+            order_date='2023-01-01T12:00:00Z', delivery_date='2023-01-10T12:00:00Z',
+            items=[{'item_name': 'Item1', 'quantity': 5}], quantity=5,
+            status='pending', issue_date='2023-01-05T12:00:00Z')
+        self.user = User.objects.create_user(
+            username='testuser', password='testpassword')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_detail_is_cached_with_etag(self):
+        url = reverse('vendor_detail', args=[self.vendor.id])
+        response = self.client.get(url)
+        etag = response['ETag']
+        # Token and response both come from the cache.
+        with self.assertNumQueries(0):
+            cached = self.client.get(url)
+            not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.data, response.data)
+        self.assertEqual(cached['ETag'], etag)
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_purchase_order_write_invalidates_vendor_and_purchase_order(self):
+        vendor_url = reverse('vendor_detail', args=[self.vendor.id])
+        po_url = reverse('purchase_order_detail', args=[self.po.id])
+        vendor_etag = self.client.get(vendor_url)['ETag']
+        po_etag = self.client.get(po_url)['ETag']
+
+        self.po.status = 'completed'
+        self.po.save()
+
+        response = self.client.get(vendor_url, HTTP_IF_NONE_MATCH=vendor_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['completed_po_count'], 1)
+        response = self.client.get(po_url, HTTP_IF_NONE_MATCH=po_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'completed')
+
+    def test_bulk_acknowledge_invalidates_purchase_order(self):
+        url = reverse('purchase_order_detail', args=[self.po.id])
+        PurchaseOrder.objects.filter(pk=self.po.pk).update(acknowledgment_date=None)
+        self.assertIsNone(self.client.get(url).data['acknowledgment_date'])
+        self.client.post(reverse('acknowledge_purchase_orders'),
+                         {'ids': [self.po.id]}, format='json')
+        self.assertIsNotNone(self.client.get(url).data['acknowledgment_date'])
+
+    def test_deletes_invalidate_without_delete_signals(self):
+        # Delete signals would make the collector load every cascaded row.
+        collector = Collector(using='default')
+        self.assertTrue(collector.can_fast_delete(HistoricalPerformance.objects.all()))
+        self.assertTrue(collector.can_fast_delete(PurchaseOrderItem.objects.all()))
+
+        po_url = reverse('purchase_order_detail', args=[self.po.id])
+        other_po = PurchaseOrder.objects.create(
+            po_number='CACHE-PO2', vendor=self.other_vendor,
+            order_date='2023-01-01T12:00:00Z', delivery_date='2023-01-10T12:00:00Z',
+            items=[], quantity=1, status='pending', issue_date='2023-01-05T12:00:00Z')
+        other_po_url = reverse('purchase_order_detail', args=[other_po.id])
+        vendor_url = reverse('vendor_detail', args=[self.vendor.id])
+        history_url = reverse('index')
+        for url in (po_url, other_po_url, vendor_url):
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+        self.assertTrue(self.client.get(history_url, {'vendor': self.vendor.id}).data['results'])
+
+        self.client.delete(other_po_url)
+        self.assertEqual(self.client.get(other_po_url).status_code, status.HTTP_404_NOT_FOUND)
+
+        self.client.delete(vendor_url)
+        self.assertEqual(self.client.get(vendor_url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(po_url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(self.client.get(history_url, {'vendor': self.vendor.id}).data['results'])
+
+    def test_vendor_filtered_list_is_scoped_to_the_vendor(self):
+        url = reverse('purchase_orders')
+        etag = self.client.get(url, {'vendor': self.vendor.id})['ETag']
+        unfiltered_etag = self.client.get(url)['ETag']
+
+        PurchaseOrder.objects.create(
+            po_number='CACHE-PO2', vendor=self.other_vendor,
+            order_date='2023-01-01T12:00:00Z', delivery_date='2023-01-10T12:00:00Z',
+            items=[], quantity=1, status='pending', issue_date='2023-01-05T12:00:00Z')
+
+        response = self.client.get(url, {'vendor': self.vendor.id}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=unfiltered_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+
+
+class LineItemsTestCase(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.vendor = Vendor.objects.create(name='Items Vendor', vendor_code='ITEMS001')
+        self.other_vendor = Vendor.objects.create(name='Other Vendor', vendor_code='ITEMS002')
+        self.po = self.create('IT1', [
+            {'sku': 'SKU-1', 'item_name': 'Bolts', 'quantity': 10, 'unit_price': 0.5},
+            {'sku': 'SKU-2', 'item_name': 'Nuts', 'quantity': '4', 'unit_price': '1.25'},
+        ])
+
+    def create(self, po_number, items, vendor=None, quantity=None):
+        return PurchaseOrder.objects.create(
+            po_number=po_number, vendor=vendor or self.vendor,
+            order_date='2023-01-01T12:00:00Z', delivery_date='2023-01-10T12:00:00Z',
+            items=items, status='pending', issue_date='2023-01-05T12:00:00Z',
+            quantity=sum(int(item['quantity']) for item in items)
+            if quantity is None else quantity)
+
+    def rows(self, purchase_order):
+        return list(purchase_order.line_items.order_by('position').values_list(
+            'position', 'sku', 'description', 'quantity', 'unit_price'))
+
+    def test_save_writes_line_items(self):
+        self.assertEqual(self.rows(self.po), [
+            (0, 'SKU-1', 'Bolts', 10, 0.5), (1, 'SKU-2', 'Nuts', 4, 1.25)])
+
+        self.po.items = ['note', {'sku': 'SKU-3', 'description': 'Washers', 'quantity': 'many'}]
+        self.po.save()
+        self.assertEqual(self.rows(self.po), [(1, 'SKU-3', 'Washers', None, None)])
+
+        # Changes in place are detected too.
+        self.po.items[1]['quantity'] = 3
+        self.po.save()
+        self.assertEqual(self.rows(self.po), [(1, 'SKU-3', 'Washers', 3, None)])
+
+        po = PurchaseOrder.objects.get(pk=self.po.pk)
+        po.status = 'completed'
+        with CaptureQueriesContext(connection) as queries:
+            po.save()
+        self.assertFalse([query for query in queries if 'purchaseorderitem' in query['sql']])
+
+        legacy = self.create('IT2', [], quantity=1)
+        legacy.items = {'item1': 'item1', 'item2': {'sku': 'SKU-4', 'quantity': 2}}
+        legacy.save()
+        self.assertEqual(self.rows(legacy), [
+            (0, '', 'item1', None, None), (1, 'SKU-4', '', 2, None)])
+
+        self.po.delete()
+        self.assertFalse(PurchaseOrderItem.objects.filter(purchase_order_id=self.po.pk).exists())
+
+    def test_object_items(self):
+        # The purchase order payload of dummy-json-for-test.txt.
+        response = self.client.post(reverse('purchase_order_create'), {
+            'vendor': self.vendor.id,
+            'po_number': 'PO004',
+            'order_date': '2023-12-01T14:57:44Z',
+            'delivery_date': '2023-12-02T06:00:00Z',
+            'items': {'item1': 'Item A', 'item2': 'Item B'},
+            'quantity': 6,
+            'status': 'completed',
+            'quality_rating': 5.0,
+            'issue_date': '2023-12-01T14:58:25Z',
+            'acknowledgment_date': '2023-12-03T09:18:21.818358Z',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        po = PurchaseOrder.objects.get(po_number='PO004')
+        self.assertEqual(self.rows(po), [(0, '', 'Item A', None, None), (1, '', 'Item B', None, None)])
+        self.assertFalse(missing_line_items().filter(pk=po.pk).exists())
+        self.assertFalse(quantity_mismatches().filter(pk=po.pk).exists())
+
+        PurchaseOrderItem.objects.filter(purchase_order=po).delete()
+        out = StringIO()
+        call_command('backfill_line_items', '--missing', stdout=out)
+        self.assertIn('Backfilled 1 purchase order(s) with 2 line item(s).', out.getvalue())
+
+    def test_bulk_create_writes_line_items(self):
+        rows = [{
+            'po_number': f'BULKIT{i}', 'vendor': self.vendor.id,
+            'order_date': '2023-01-01T12:00:00Z', 'delivery_date': '2023-01-10T12:00:00Z',
+            'items': [{'sku': f'SKU-B{i}', 'item_name': 'Item', 'quantity': i + 1, 'unit_price': 2}],
+            'quantity': i + 1, 'status': 'pending', 'issue_date': '2023-01-05T12:00:00Z',
+        } for i in range(3)]
+        response = self.client.post(reverse('purchase_order_bulk_create'), rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            list(PurchaseOrderItem.objects.filter(purchase_order_id__in=response.data['ids'])
+                 .order_by('sku').values_list('sku', 'quantity', 'unit_price')),
+            [('SKU-B0', 1, 2.0), ('SKU-B1', 2, 2.0), ('SKU-B2', 3, 2.0)])
+
+    def test_sku_search(self):
+        other = self.create('IT2', [{'sku': 'SKU-1', 'quantity': 1}, {'sku': 'SKU-1', 'quantity': 2}],
+                            vendor=self.other_vendor)
+        self.create('IT3', [{'sku': 'SKU-9', 'quantity': 1}])
+
+        def ids(**params):
+            response = self.client.get(reverse('purchase_orders'), params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return [row['id'] for row in response.data['results']]
+
+        self.assertEqual(ids(sku='SKU-1'), [self.po.id, other.id])
+        self.assertEqual(ids(sku='SKU-1', vendor=self.other_vendor.id), [other.id])
+        self.assertEqual(ids(sku='SKU'), [])
+
+    def test_spend(self):
+        self.create('IT2', [{'sku': 'SKU-2', 'quantity': 100, 'unit_price': 1.0},
+                            {'item_name': 'No SKU', 'quantity': 1, 'unit_price': 1000}],
+                    vendor=self.other_vendor)
+        response = self.client.get(reverse('purchase_order_spend'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [
+            {'sku': 'SKU-2', 'purchase_orders': 2, 'quantity': 104, 'spend': 105.0},
+            {'sku': 'SKU-1', 'purchase_orders': 1, 'quantity': 10, 'spend': 5.0},
+        ])
+
+        response = self.client.get(reverse('purchase_order_spend'),
+                                   {'vendor': self.vendor.id, 'limit': 1})
+        self.assertEqual(response.data['results'], [
+            {'sku': 'SKU-1', 'purchase_orders': 1, 'quantity': 10, 'spend': 5.0}])
+
+        for limit in (0, 1001, 'all'):
+            response = self.client.get(reverse('purchase_order_spend'), {'limit': limit})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('limit', response.data)
+
+    def test_backfill_line_items_command(self):
+        mismatched = self.create('IT2', [{'sku': 'SKU-1', 'quantity': 3}], quantity=5)
+        empty = self.create('IT3', [])
+        PurchaseOrderItem.objects.all().delete()
+
+        out = StringIO()
+        call_command('backfill_line_items', '--check', stdout=out)
+        self.assertIn('0 purchase order(s) whose quantity differs from their line items, '
+                      '3 without line items.', out.getvalue())
+
+        call_command('backfill_line_items', '--batch-size', '2', '--missing', stdout=StringIO())
+        self.assertEqual(self.rows(self.po), [
+            (0, 'SKU-1', 'Bolts', 10, 0.5), (1, 'SKU-2', 'Nuts', 4, 1.25)])
+        out = StringIO()
+        call_command('backfill_line_items', stdout=out)
+        self.assertIn('Backfilled 3 purchase order(s) with 3 line item(s).', out.getvalue())
+
+        out = StringIO()
+        call_command('backfill_line_items', '--check', stdout=out)
+        self.assertIn(f'PO IT2 (#{mismatched.pk}): quantity 5, line items total 3', out.getvalue())
+        self.assertIn('1 purchase order(s) whose quantity differs from their line items, '
+                      '1 without line items.', out.getvalue())
+        self.assertEqual(list(missing_line_items().values_list('pk', flat=True)), [empty.pk])
+        self.assertEqual(list(quantity_mismatches().values_list('pk', flat=True)), [mismatched.pk])
+
+
+class PurchaseOrderQueryCountTest(QueryCountTestCase):
+    """
+    Writes cost: the statement itself, the vendor counters UPDATE, the
+    savepoint pair of the metrics transaction, and the history policy (vendor
+    read, latest snapshot, INSERT), whatever the size of the vendor.
+    """
+
+    def order(self, po_number):
+        return {
+            'po_number': po_number, 'vendor': self.vendor.id,
+            'order_date': '2023-01-01T12:00:00Z', 'delivery_date': '2023-01-10T12:00:00Z',
+            'items': [{'sku': 'SKU-00001', 'item_name': 'Item1', 'quantity': 5, 'unit_price': 1.0}],
+            'quantity': 5, 'status': 'completed', 'quality_rating': 4.0,
+            'issue_date': '2023-01-05T12:00:00Z',
+        }
+
+    def test_reads(self):
+        for size in self.sizes():
+            self.assertQueries(1, 'get', reverse('purchase_orders'))
+            self.assertQueries(1, 'get', reverse('purchase_orders'), {'vendor': self.vendor.id})
+            self.assertQueries(1, 'get', reverse('purchase_orders'), {
+                'vendor': self.vendor.id, 'status': 'completed,pending', 'acknowledged': 'true',
+                'order_date_from': '2020-01-01', 'min_quality_rating': 1, 'po_number': 'PIN'})
+            self.assertQueries(1, 'get', reverse('purchase_order_detail', args=[self.purchase_order.id]))
+            self.assertQueries(1, 'get', reverse('purchase_orders_export'), {'vendor': self.vendor.id})
+            self.assertQueries(1, 'get', reverse('purchase_orders'), {'sku': 'SKU-00001'})
+            self.assertQueries(1, 'get', reverse('purchase_order_spend'), {'vendor': self.vendor.id})
+
+    def test_writes(self):
+        for size in self.sizes():
+            # Plus the po_number uniqueness check, the vendor lookup and the
+            # line items INSERT.
+            response = self.assertQueries(
+                10, 'post', reverse('purchase_order_create'), self.order(f'PIN-{size}'),
+                status_code=status.HTTP_201_CREATED, format='json')
+            url = reverse('purchase_order_detail', args=[response.data['id']])
+            # Plus the purchase order read; the items are unchanged.
+            self.assertQueries(10, 'put', url, {**self.order(f'PIN-{size}'), 'status': 'pending'},
+                               format='json')
+            # Plus the purchase order read and the line items DELETE.
+            self.assertQueries(9, 'delete', url, status_code=status.HTTP_204_NO_CONTENT)
+            self.assertQueries(
+                10, 'post', reverse('purchase_order_bulk_create'),
+                [self.order(f'PIN-{size}-{index}') for index in range(50)],
+                status_code=status.HTTP_201_CREATED, format='json')
+
+    def test_acknowledge(self):
+        for size in self.sizes():
+            self.assertQueries(
+                8, 'post', reverse('acknowledge_purchase_order', args=[self.purchase_order.id]))
+            ids = list(self.vendor.purchaseorder_set.values_list('pk', flat=True)[:100])
+            self.assertQueries(
+                8, 'post', reverse('acknowledge_purchase_orders'), {'ids': ids}, format='json')
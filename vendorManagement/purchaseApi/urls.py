@@ -4,10 +4,22 @@ from . import views
 
 urlpatterns = [
     path('purchase_orders/', views.purchase_orders, name='purchase_orders'),
+    path('purchase_orders/export/', views.purchase_orders_export,
+         name='purchase_orders_export'),
+    path('purchase_orders/spend/', views.purchase_order_spend,
+         name='purchase_order_spend'),
     path('purchase_orders/create/', views.purchase_order_create,
          name='purchase_order_create'),
+    path('purchase_orders/bulk/', views.purchase_order_bulk_create,
+         name='purchase_order_bulk_create'),
+    path('purchase_orders/acknowledge/', views.acknowledge_purchase_orders,
+         name='acknowledge_purchase_orders'),
     path('purchase_orders/<int:po_id>/',
          views.purchase_order_detail, name='purchase_order_detail'),
     path('purchase_orders/<int:po_id>/acknowledge/',
          views.acknowledge_purchase_order, name='acknowledge_purchase_order'),
+    path('async/purchase_orders/', views.purchase_orders_async,
+         name='purchase_orders_async'),
+    path('async/purchase_orders/<int:po_id>/',
+         views.purchase_order_detail_async, name='purchase_order_detail_async'),
 ]
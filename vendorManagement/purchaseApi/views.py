@@ -1,33 +1,129 @@
-from datetime import datetime
+from django.db import IntegrityError, transaction
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework.response import Response
-from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, parser_classes, permission_classes
 from rest_framework import status
 
+from vendorApi.metrics import PURCHASE_ORDER_FIELDS, apply_purchase_order_changes
+from vendorApi.recompute import schedule_recompute
+from vendorManagement.asyncviews import async_api_view
+from vendorManagement.export import export_response
+from vendorManagement.filters import parse_int
+from vendorManagement.pagination import KeysetPagination
+from vendorManagement.parsers import NDJSONParser
+from vendorManagement.replicas import read_from_replica
+from vendorManagement.responsecache import (PURCHASE_ORDERS, cache_response, detail_scope,
+                                            invalidate_purchase_orders, list_scope)
+
+from .filters import filter_purchase_orders
+from .lineitems import sku_spend
 from .models import PurchaseOrder
-from .serializer import PurchaseOrderSerializer
-from rest_framework.authentication import TokenAuthentication
+from .serializer import (PurchaseOrderAcknowledgeSerializer,
+                         PurchaseOrderBulkSerializer, PurchaseOrderSerializer,
+                         purchase_order_list_serializer)
+from vendorManagement.authentication import APIAuthentication
+from rest_framework.parsers import JSONParser
 from rest_framework.permissions import IsAuthenticated
 # Create your views here.
 
+EXPORT_FIELDS = {
+    'id': 'id',
+    'po_number': 'po_number',
+    'order_date': 'order_date',
+    'delivery_date': 'delivery_date',
+    'items': 'items',
+    'quantity': 'quantity',
+    'status': 'status',
+    'quality_rating': 'quality_rating',
+    'issue_date': 'issue_date',
+    'acknowledgment_date': 'acknowledgment_date',
+    'completion_date': 'completion_date',
+    'vendor': 'vendor_id',
+}
+
+# Default and maximum number of SKUs returned by `purchase_order_spend`.
+SPEND_LIMIT = 100
+MAX_SPEND_LIMIT = 1000
+
 
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([APIAuthentication])
 @permission_classes([IsAuthenticated])
+@cache_response(lambda request: [
+    list_scope(PURCHASE_ORDERS, parse_int(request.query_params, 'vendor'))])
+@read_from_replica
 def purchase_orders(request):
     """
     Checks if the user is authenticated and returns a list of Purchase Orders(PO).
 
-    Fetches all POs from the database and converts them to JSON.
-    Returns a JSON response with a list of all POs.
+    Fetches one page of POs ordered by id as `values_list()` rows and
+    converts them to JSON with `purchase_order_list_serializer`.
+    Accepts the filters of `filter_purchase_orders` as query parameters.
+    Returns a JSON response with the POs in `results` and a `next` link
+    carrying the cursor of the following page (see `KeysetPagination`).
+    Responses are cached per vendor filter and support `If-None-Match` (see
+    `vendorManagement.responsecache`). Reads from the replica when one is
+    configured (see `vendorManagement.replicas`).
+    """
+    queryset = filter_purchase_orders(PurchaseOrder.objects.all(), request.query_params)
+    paginator = KeysetPagination()
+    purchaseOrders = paginator.paginate_queryset(
+        purchase_order_list_serializer.rows(queryset), request)
+    return paginator.get_paginated_response(
+        purchase_order_list_serializer.to_representation(purchaseOrders))
+
+
+@api_view(['GET'])
+@authentication_classes([APIAuthentication])
+@permission_classes([IsAuthenticated])
+@read_from_replica
+def purchase_orders_export(request):
+    """
+    Checks if the user is authenticated and streams all matching POs.
+
+    Accepts the same filters as the PO list. Rows are streamed as NDJSON
+    (default) or CSV with `?output=csv`, optionally gzip-compressed with
+    `?gzip=true`, without loading the whole result in memory.
+    """
+    queryset = filter_purchase_orders(
+        PurchaseOrder.objects.order_by('pk'), request.query_params)
+    return export_response(request, queryset, EXPORT_FIELDS, 'purchase_orders')
+
+
+@api_view(['GET'])
+@authentication_classes([APIAuthentication])
+@permission_classes([IsAuthenticated])
+@cache_response(lambda request: [
+    list_scope(PURCHASE_ORDERS, parse_int(request.query_params, 'vendor'))])
+@read_from_replica
+def purchase_order_spend(request):
     """
-    purchaseOrders = PurchaseOrder.objects.all()
-    serializers = PurchaseOrderSerializer(purchaseOrders, many=True)
-    return Response(serializers.data, status=status.HTTP_200_OK)
+    Checks if the user is authenticated and returns the ordered quantity and spend per SKU.
+
+    Query parameters:
+    - The filters of `filter_purchase_orders`, selecting the POs whose line
+      items are aggregated (default: all POs).
+    - limit: Number of SKUs returned, highest spend first (default 100, at
+      most 1000).
+
+    Aggregates the `PurchaseOrderItem` rows in one query (see
+    `purchaseApi.lineitems.sku_spend`). Responses are cached per vendor
+    filter and support `If-None-Match`.
+    """
+    limit = parse_int(request.query_params, 'limit')
+    if limit is None:
+        limit = SPEND_LIMIT
+    if not 0 < limit <= MAX_SPEND_LIMIT:
+        return Response({'limit': [f'Must be between 1 and {MAX_SPEND_LIMIT}.']},
+                        status=status.HTTP_400_BAD_REQUEST)
+    purchase_orders = filter_purchase_orders(PurchaseOrder.objects.all(), request.query_params)
+    return Response({'results': list(sku_spend(purchase_orders)[:limit])},
+                    status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([APIAuthentication])
 @permission_classes([IsAuthenticated])
 def purchase_order_create(request):
     """
@@ -38,15 +134,60 @@ def purchase_order_create(request):
     """
     serializer = PurchaseOrderSerializer(data=request.data)
     if serializer.is_valid():
-        serializer.save()
+        purchaseOrder = serializer.save()
+        schedule_recompute([purchaseOrder.vendor_id])
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     else:
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+@parser_classes([JSONParser, NDJSONParser])
+@authentication_classes([APIAuthentication])
+@permission_classes([IsAuthenticated])
+def purchase_order_bulk_create(request):
+    """
+    Checks if the user is authenticated and creates many POs in one request.
+
+    Takes a JSON array or an NDJSON body (`Content-Type: application/x-ndjson`)
+    of POs. Rows are validated independently; the valid ones are inserted with
+    `bulk_create` in batches and each affected vendor's metrics are updated
+    and its recomputation scheduled once at the end.
+
+    Returns 201 CREATED when every row was created, 207 MULTI-STATUS when
+    some rows were rejected and 400 BAD REQUEST when none were created. The
+    body lists the created ids and the errors of rejected rows by index.
+    """
+    serializer = PurchaseOrderBulkSerializer(data=request.data, many=True)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    errors = [
+        {'index': index, 'errors': row_errors}
+        for index, row_errors in sorted(serializer.row_errors.items())
+    ]
+    if not serializer.validated_data:
+        return Response({'created': 0, 'ids': [], 'errors': errors},
+                        status=status.HTTP_400_BAD_REQUEST)
+    try:
+        purchaseOrders = serializer.save()
+    except IntegrityError:
+        return Response({'detail': 'A purchase order was created concurrently with the same po_number.'},
+                        status=status.HTTP_409_CONFLICT)
+    schedule_recompute({purchaseOrder.vendor_id for purchaseOrder in purchaseOrders})
+
+    data = {
+        'created': len(purchaseOrders),
+        'ids': [purchaseOrder.id for purchaseOrder in purchaseOrders],
+        'errors': errors,
+    }
+    return Response(data, status=status.HTTP_207_MULTI_STATUS if errors else status.HTTP_201_CREATED)
+
+
 @api_view(['GET', 'PUT', 'DELETE'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([APIAuthentication])
 @permission_classes([IsAuthenticated])
+@cache_response(lambda request, po_id: [detail_scope(PURCHASE_ORDERS, po_id)])
 def purchase_order_detail(request, po_id):
     """
     Checks if the user is authenticated and performs CRUD operations on a PO.
@@ -57,6 +198,7 @@ def purchase_order_detail(request, po_id):
     - DELETE: Delete a specific PO.
 
     Returns the serialized PO data in the response for GET and PUT requests.
+    GET responses are cached and support `If-None-Match`.
     Returns a 204 NO CONTENT response on successful DELETE.
     Returns a 404 NOT FOUND response if the PO does not exist.
     """
@@ -72,25 +214,21 @@ def purchase_order_detail(request, po_id):
     elif request.method == 'PUT':
         serializer = PurchaseOrderSerializer(purchaseOrder, data=request.data)
         if serializer.is_valid():
+            previous_vendor_id = purchaseOrder.vendor_id
             serializer.save()
-
-            vendor = purchaseOrder.vendor
-            vendor.update_average_response_time()
-
+            schedule_recompute({previous_vendor_id, purchaseOrder.vendor_id})
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     elif request.method == 'DELETE':
+        vendor_id = purchaseOrder.vendor_id
         purchaseOrder.delete()
-
-        vendor = purchaseOrder.vendor
-        vendor.update_average_response_time()
-
+        schedule_recompute([vendor_id])
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 @api_view(['POST'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([APIAuthentication])
 @permission_classes([IsAuthenticated])
 def acknowledge_purchase_order(request, po_id):
     """
@@ -98,8 +236,8 @@ def acknowledge_purchase_order(request, po_id):
 
     - POST:
         - Acknowledge a purchase order by updating its acknowledgment date.
-        - Update the average response time for the vendor.
-        - Update all performance metrics for the vendor.
+          Saving the purchase order updates the vendor's counters and metrics.
+        - Schedule the vendor's recomputation (see `vendorApi.recompute`).
         - Return a success message in the response.
 
     Parameters:
@@ -110,11 +248,76 @@ def acknowledge_purchase_order(request, po_id):
     """
     purchase_order = get_object_or_404(PurchaseOrder, pk=po_id)
 
-    purchase_order.acknowledgment_date = datetime.now()
+    purchase_order.acknowledgment_date = timezone.now()
     purchase_order.save()
 
-    vendor = purchase_order.vendor
-    vendor.update_average_response_time()
-    vendor.update_performance_metrics()
+    schedule_recompute([purchase_order.vendor_id])
 
     return Response({'message': 'Purchase order acknowledged successfully.'}, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+@authentication_classes([APIAuthentication])
+@permission_classes([IsAuthenticated])
+def acknowledge_purchase_orders(request):
+    """
+    Checks if the user is authenticated and acknowledges many purchase orders at once.
+
+    - POST: Takes `{"ids": [...]}`.
+        - Sets the acknowledgment date of all the POs with a single UPDATE.
+        - Updates the metrics of each affected vendor once and schedules one
+          recomputation per vendor, in the same transaction.
+
+    Returns:
+    - Response: The number of acknowledged POs and the ids that were not found.
+    """
+    serializer = PurchaseOrderAcknowledgeSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    ids = set(serializer.validated_data['ids'])
+
+    now = timezone.now()
+    with transaction.atomic():
+        old_states = list(
+            PurchaseOrder.objects.select_for_update()
+            .filter(pk__in=ids)
+            .values('pk', *PURCHASE_ORDER_FIELDS))
+        found = {state.pop('pk') for state in old_states}
+        PurchaseOrder.objects.filter(pk__in=found).update(acknowledgment_date=now)
+        invalidate_purchase_orders(found, {state['vendor_id'] for state in old_states})
+
+        vendor_ids = apply_purchase_order_changes(
+            (state, {**state, 'acknowledgment_date': now}) for state in old_states)
+        schedule_recompute(vendor_ids)
+
+    return Response({
+        'acknowledged': len(found),
+        'not_found': sorted(ids - found),
+    }, status=status.HTTP_200_OK)
+
+
+@async_api_view
+@read_from_replica
+async def purchase_orders_async(request):
+    """
+    Async version of `purchase_orders` for ASGI deployments (see
+    `vendorManagement.asyncviews`). Not cached.
+    """
+    queryset = filter_purchase_orders(PurchaseOrder.objects.all(), request.query_params)
+    paginator = KeysetPagination()
+    purchaseOrders = await paginator.apaginate_queryset(
+        purchase_order_list_serializer.rows(queryset), request)
+    return paginator.get_paginated_response(
+        purchase_order_list_serializer.to_representation(purchaseOrders))
+
+
+@async_api_view
+async def purchase_order_detail_async(request, po_id):
+    """
+    Async version of `purchase_order_detail`, GET only. Not cached.
+    """
+    try:
+        purchaseOrder = await PurchaseOrder.objects.aget(pk=po_id)
+    except PurchaseOrder.DoesNotExist:
+        return Response(status=status.HTTP_404_NOT_FOUND)
+    return Response(PurchaseOrderSerializer(purchaseOrder).data, status=status.HTTP_200_OK)
@@ -1,5 +1,17 @@
 from django.contrib import admin
+from .metrics import COUNTER_FIELDS, TRACKING_FIELDS
 from .models import Vendor
 # Register your models here.
 
-admin.site.register(Vendor)
+
+@admin.register(Vendor)
+class VendorAdmin(admin.ModelAdmin):
+    """
+    Vendor admin. Counters and metric timestamps are maintained by purchase
+    order writes, so they are read-only here.
+    """
+    list_display = ('name', 'vendor_code', 'on_time_delivery_rate', 'quality_rating_avg',
+                    'average_response_time', 'fulfillment_rate', 'total_po_count')
+    search_fields = ('name', '=vendor_code')
+    readonly_fields = COUNTER_FIELDS + TRACKING_FIELDS
+    show_full_result_count = False
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class VendorapiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'vendorApi'
+
+    def ready(self):
+        # Connects the token and response cache invalidation signals, so
+        # writes outside a request (admin actions, shell, commands) evict too.
+        import vendorManagement.authentication  # noqa: F401
+        import vendorManagement.responsecache  # noqa: F401
@@ -0,0 +1,35 @@
+from .models import Vendor
+
+
+# Metric -> (ordering, counter holding the number of samples of the metric).
+# Rates and ratings rank highest first, response times lowest first; ties are
+# broken by id so that the ordering is unique (see `KeysetPagination`). Each
+# ordering is covered by an index on Vendor.
+METRICS = {
+    'on_time_delivery_rate': (('-on_time_delivery_rate', '-pk'), 'completed_po_count'),
+    'quality_rating_avg': (('-quality_rating_avg', '-pk'), 'quality_rating_count'),
+    'average_response_time': (('average_response_time', 'pk'), 'response_time_count'),
+    'fulfillment_rate': (('-fulfillment_rate', '-pk'), 'total_po_count'),
+}
+
+DEFAULT_METRIC = 'on_time_delivery_rate'
+
+
+def leaderboard_ordering(metric):
+    return METRICS[metric][0]
+
+
+def leaderboard_queryset(metric, min_orders=None):
+    """
+    Vendors ranked by `metric`, read from the metric columns that purchase
+    order writes keep current (see `vendorApi.metrics`).
+
+    Vendors without samples for the metric (e.g. no rated purchase order for
+    `quality_rating_avg`) are left out rather than ranked with a 0.
+    `min_orders` keeps vendors with at least that many purchase orders.
+    """
+    _, sample_field = METRICS[metric]
+    queryset = Vendor.objects.filter(**{f'{sample_field}__gt': 0})
+    if min_orders:
+        queryset = queryset.filter(total_po_count__gte=min_orders)
+    return queryset
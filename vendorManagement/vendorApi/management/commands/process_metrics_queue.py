@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from historyApi.snapshots import flush_snapshots
+from vendorApi.recompute import process_queue, queue_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker recomputing the metrics of vendors queued by purchase order "
+        "writes (VENDOR_METRICS_RECOMPUTE = 'queue')."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Number of vendors claimed at a time.')
+        parser.add_argument(
+            '--interval', type=float, default=1.0,
+            help='Seconds to sleep when the queue is empty.')
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Drain the queue once and exit instead of polling.')
+        parser.add_argument(
+            '--status', action='store_true',
+            help='Print the queue depth and lag and exit.')
+
+    def handle(self, *args, **options):
+        if options['status']:
+            stats = queue_stats()
+            self.stdout.write(
+                f"depth={stats['depth']} lag_seconds={stats['lag_seconds']:.1f}")
+            return
+
+        total = 0
+        try:
+            while True:
+                processed = process_queue(batch_size=options['batch_size'])
+                # Snapshots buffered by the 'batch' policy are only flushed
+                # at the end of requests otherwise.
+                flush_snapshots()
+                total += processed
+                if processed:
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f'Recomputed {total} vendor(s).'))
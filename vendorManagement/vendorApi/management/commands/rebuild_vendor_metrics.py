@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from vendorApi.metrics import (COUNTER_FIELDS, aggregate_counters,
+                               metrics_from_counters)
+from vendorApi.models import Vendor
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the incremental vendor counters from a full scan of the "
+        "purchase orders and report vendors whose stored counters drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--vendor', type=int, action='append', dest='vendors',
+            help='Only rebuild the given vendor id (may be repeated).')
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Only compare the stored counters with the full scan, do not write.')
+
+    def handle(self, *args, **options):
+        vendors = Vendor.objects.order_by('pk')
+        if options['vendors']:
+            vendors = vendors.filter(pk__in=options['vendors'])
+
+        checked = drifted = 0
+        for stored in vendors.values('pk', *COUNTER_FIELDS).iterator():
+            vendor_id = stored.pop('pk')
+            with transaction.atomic():
+                counters = aggregate_counters(
+                    Vendor(pk=vendor_id).purchaseorder_set.all())
+                checked += 1
+                diff = {
+                    field: (stored[field], counters[field])
+                    for field in COUNTER_FIELDS
+                    if abs(stored[field] - counters[field]) > 1e-6
+                }
+                if diff:
+                    drifted += 1
+                    details = ', '.join(
+                        f'{field}: {old} -> {new}' for field, (old, new) in diff.items())
+                    self.stdout.write(f'Vendor {vendor_id} drifted ({details})')
+                if not options['check']:
+                    Vendor.objects.filter(pk=vendor_id).update(
+                        **counters, **metrics_from_counters(counters))
+
+        action = 'Checked' if options['check'] else 'Rebuilt'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} {checked} vendor(s), {drifted} with drifted counters.'))
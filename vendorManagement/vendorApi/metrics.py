@@ -0,0 +1,256 @@
+from django.db.models import (Case, Count, DurationField, ExpressionWrapper, F,
+                              FloatField, Q, Sum, Value, When)
+from django.db.models.functions import Cast
+from django.db.models.lookups import GreaterThan
+from django.utils import timezone
+
+
+COMPLETED = 'completed'
+
+# Running totals stored on Vendor and maintained on every PurchaseOrder write.
+COUNTER_FIELDS = (
+    'total_po_count',
+    'completed_po_count',
+    'on_time_po_count',
+    'fulfilled_po_count',
+    'quality_rating_sum',
+    'quality_rating_count',
+    'response_time_sum',
+    'response_time_count',
+)
+
+METRIC_FIELDS = (
+    'on_time_delivery_rate',
+    'quality_rating_avg',
+    'average_response_time',
+    'fulfillment_rate',
+)
+
+# Timestamps maintained alongside the counters.
+TRACKING_FIELDS = (
+    'metrics_updated_at',
+    'purchase_orders_changed_at',
+)
+
+# PurchaseOrder fields that a purchase order's contribution depends on.
+PURCHASE_ORDER_FIELDS = (
+    'vendor_id',
+    'status',
+    'delivery_date',
+    'quality_rating',
+    'issue_date',
+    'acknowledgment_date',
+    'completion_date',
+)
+
+
+def response_time_expression():
+    """
+    Response time of a purchase order (acknowledgment minus issue date),
+    evaluated by the database as a duration.
+    """
+    return ExpressionWrapper(
+        F('acknowledgment_date') - F('issue_date'),
+        output_field=DurationField(),
+    )
+
+
+def aggregate_counters(purchase_orders):
+    """
+    Compute the vendor counters for a purchase order queryset in a single
+    aggregate query.
+
+    Every counter is a conditional aggregate, so the database scans the
+    orders once and returns a single row. Response times are summed as
+    durations in SQL; no PurchaseOrder instances are created.
+
+    Parameters:
+    - purchase_orders: Queryset of the purchase orders to aggregate (usually `vendor.purchaseorder_set`).
+
+    Returns:
+    - dict keyed by `COUNTER_FIELDS`.
+    """
+    completed = Q(status=COMPLETED)
+    rated = completed & Q(quality_rating__isnull=False)
+    acknowledged = Q(acknowledgment_date__isnull=False)
+    totals = purchase_orders.aggregate(
+        total_po_count=Count('pk'),
+        completed_po_count=Count('pk', filter=completed),
+        on_time_po_count=Count(
+            'pk', filter=completed & Q(delivery_date__lte=F('completion_date'))),
+        fulfilled_po_count=Count('pk', filter=completed & acknowledged),
+        quality_rating_sum=Sum('quality_rating', filter=rated),
+        quality_rating_count=Count('pk', filter=rated),
+        response_time_sum=Sum(response_time_expression(), filter=acknowledged),
+        response_time_count=Count('pk', filter=acknowledged),
+    )
+
+    if totals['quality_rating_sum'] is None:
+        totals['quality_rating_sum'] = 0.0
+    if totals['response_time_sum'] is None:
+        totals['response_time_sum'] = 0.0
+    else:
+        totals['response_time_sum'] = totals['response_time_sum'].total_seconds()
+    return totals
+
+
+def metrics_from_counters(counters):
+    """
+    Derive the four performance metrics from a dict of counters.
+
+    Returns:
+    - dict with `on_time_delivery_rate`, `quality_rating_avg`,
+      `average_response_time` (seconds) and `fulfillment_rate`.
+    """
+    metrics = dict.fromkeys(METRIC_FIELDS, 0.0)
+    if counters['completed_po_count']:
+        metrics['on_time_delivery_rate'] = (
+            counters['on_time_po_count'] / counters['completed_po_count']) * 100
+    if counters['quality_rating_count']:
+        metrics['quality_rating_avg'] = (
+            counters['quality_rating_sum'] / counters['quality_rating_count'])
+    if counters['response_time_count']:
+        metrics['average_response_time'] = (
+            counters['response_time_sum'] / counters['response_time_count'])
+    if counters['total_po_count']:
+        metrics['fulfillment_rate'] = (
+            counters['fulfilled_po_count'] / counters['total_po_count']) * 100
+    return metrics
+
+
+def aggregate_performance_metrics(purchase_orders):
+    """
+    Compute all vendor performance metrics in a single aggregate query.
+
+    Returns:
+    - dict with `on_time_delivery_rate`, `quality_rating_avg`,
+      `average_response_time` (seconds) and `fulfillment_rate`.
+    """
+    return metrics_from_counters(aggregate_counters(purchase_orders))
+
+
+def purchase_order_counters(state):
+    """
+    Counters contributed by a single purchase order.
+
+    A completed order is on time when it was due by its completion date.
+    The contribution depends only on stored fields, never on the current
+    time, so removing a state subtracts exactly what adding it counted.
+
+    Parameters:
+    - state: dict of `PURCHASE_ORDER_FIELDS` values, or None for an order
+      that does not exist (before creation or after deletion).
+
+    Returns:
+    - dict keyed by `COUNTER_FIELDS`.
+    """
+    counters = dict.fromkeys(COUNTER_FIELDS, 0)
+    if state is None:
+        return counters
+
+    completed = state['status'] == COMPLETED
+    acknowledged = state['acknowledgment_date'] is not None
+    counters['total_po_count'] = 1
+    if completed:
+        counters['completed_po_count'] = 1
+        completion_date = state['completion_date']
+        counters['on_time_po_count'] = int(
+            completion_date is not None and state['delivery_date'] <= completion_date)
+        counters['fulfilled_po_count'] = int(acknowledged)
+        if state['quality_rating'] is not None:
+            counters['quality_rating_sum'] = state['quality_rating']
+            counters['quality_rating_count'] = 1
+    if acknowledged:
+        counters['response_time_sum'] = (
+            state['acknowledgment_date'] - state['issue_date']).total_seconds()
+        counters['response_time_count'] = 1
+    return counters
+
+
+def _rate(numerator, denominator, scale=1):
+    return Case(
+        When(GreaterThan(denominator, 0),
+             then=Cast(numerator, FloatField()) * scale / denominator),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def metric_expressions(counters):
+    """
+    SQL expressions computing the four metrics from counter expressions.
+
+    Parameters:
+    - counters: dict mapping each of `COUNTER_FIELDS` to an expression.
+    """
+    return {
+        'on_time_delivery_rate': _rate(
+            counters['on_time_po_count'], counters['completed_po_count'], 100),
+        'quality_rating_avg': _rate(
+            counters['quality_rating_sum'], counters['quality_rating_count']),
+        'average_response_time': _rate(
+            counters['response_time_sum'], counters['response_time_count']),
+        'fulfillment_rate': _rate(
+            counters['fulfilled_po_count'], counters['total_po_count'], 100),
+    }
+
+
+def apply_counter_delta(vendor_id, delta):
+    """
+    Add `delta` to a vendor's counters and refresh its metrics.
+
+    Issues a single UPDATE that increments the counters and recomputes the
+    rates from the incremented values, so concurrent writers never lose an
+    update and the cost does not depend on the number of purchase orders.
+    """
+    if vendor_id is None or not any(delta.values()):
+        return
+    from vendorManagement.responsecache import invalidate_vendors
+
+    from .models import Vendor
+    from .performance import invalidate_vendor_performance
+
+    counters = {field: F(field) + delta[field] for field in COUNTER_FIELDS}
+    updates = {field: counters[field]
+               for field in COUNTER_FIELDS if delta[field]}
+    updates.update(metric_expressions(counters))
+    updates['purchase_orders_changed_at'] = timezone.now()
+    Vendor.objects.filter(pk=vendor_id).update(**updates)
+    invalidate_vendor_performance(vendor_id)
+    invalidate_vendors([vendor_id])
+
+
+def apply_purchase_order_changes(changes):
+    """
+    Update vendor counters for many purchase order changes at once.
+
+    Parameters:
+    - changes: Iterable of `(old_state, new_state)` pairs. Either state may be
+      None (creation or deletion).
+
+    The contributions are summed per vendor, so each affected vendor is
+    updated with one UPDATE regardless of how many orders changed.
+
+    Returns:
+    - The ids of the vendors whose counters changed.
+    """
+    deltas = {}
+    for old_state, new_state in changes:
+        for state, sign in ((old_state, -1), (new_state, 1)):
+            if state is None:
+                continue
+            delta = deltas.setdefault(
+                state['vendor_id'], dict.fromkeys(COUNTER_FIELDS, 0))
+            for field, value in purchase_order_counters(state).items():
+                delta[field] += sign * value
+    for vendor_id, delta in deltas.items():
+        apply_counter_delta(vendor_id, delta)
+    return [vendor_id for vendor_id, delta in deltas.items() if any(delta.values())]
+
+
+def apply_purchase_order_change(old_state, new_state):
+    """
+    Update vendor counters for a purchase order going from `old_state` to
+    `new_state`. Either state may be None (creation or deletion).
+    """
+    apply_purchase_order_changes([(old_state, new_state)])
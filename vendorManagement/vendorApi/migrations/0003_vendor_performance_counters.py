@@ -0,0 +1,109 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:17
+
+from django.db import migrations, models
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.utils import timezone
+
+
+# Counters and metrics as defined when this migration was written; kept
+# here rather than imported from vendorApi.metrics, so later changes to the
+# application code do not change this migration.
+def aggregate_counters(purchase_orders, now):
+    completed = Q(status='completed')
+    rated = completed & Q(quality_rating__isnull=False)
+    acknowledged = Q(acknowledgment_date__isnull=False)
+    response_time = ExpressionWrapper(
+        F('acknowledgment_date') - F('issue_date'), output_field=DurationField())
+    counters = purchase_orders.aggregate(
+        total_po_count=Count('pk'),
+        completed_po_count=Count('pk', filter=completed),
+        on_time_po_count=Count('pk', filter=completed & Q(delivery_date__lte=now)),
+        fulfilled_po_count=Count('pk', filter=completed & acknowledged),
+        quality_rating_sum=Sum('quality_rating', filter=rated),
+        quality_rating_count=Count('pk', filter=rated),
+        response_time_sum=Sum(response_time, filter=acknowledged),
+        response_time_count=Count('pk', filter=acknowledged),
+    )
+    counters['quality_rating_sum'] = counters['quality_rating_sum'] or 0.0
+    response_time_sum = counters['response_time_sum']
+    counters['response_time_sum'] = response_time_sum.total_seconds() if response_time_sum else 0.0
+    return counters
+
+
+def metrics_from_counters(counters):
+    def ratio(numerator, denominator, scale=1):
+        return numerator / denominator * scale if denominator else 0.0
+
+    return {
+        'on_time_delivery_rate': ratio(
+            counters['on_time_po_count'], counters['completed_po_count'], 100),
+        'quality_rating_avg': ratio(
+            counters['quality_rating_sum'], counters['quality_rating_count']),
+        'average_response_time': ratio(
+            counters['response_time_sum'], counters['response_time_count']),
+        'fulfillment_rate': ratio(
+            counters['fulfilled_po_count'], counters['total_po_count'], 100),
+    }
+
+
+def backfill_counters(apps, schema_editor):
+    Vendor = apps.get_model('vendorApi', 'Vendor')
+    PurchaseOrder = apps.get_model('purchaseApi', 'PurchaseOrder')
+    now = timezone.now()
+    for vendor_id in Vendor.objects.values_list('pk', flat=True).iterator():
+        counters = aggregate_counters(
+            PurchaseOrder.objects.filter(vendor_id=vendor_id), now)
+        Vendor.objects.filter(pk=vendor_id).update(
+            **counters, **metrics_from_counters(counters))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendorApi', '0002_alter_vendor_average_response_time_and_more'),
+        ('purchaseApi', '0005_alter_purchaseorder_acknowledgment_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vendor',
+            name='completed_po_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='vendor',
+            name='fulfilled_po_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='vendor',
+            name='on_time_po_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='vendor',
+            name='quality_rating_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='vendor',
+            name='quality_rating_sum',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='vendor',
+            name='response_time_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='vendor',
+            name='response_time_sum',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='vendor',
+            name='total_po_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
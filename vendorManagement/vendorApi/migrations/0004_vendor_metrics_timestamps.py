@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendorApi', '0003_vendor_performance_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vendor',
+            name='metrics_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='vendor',
+            name='purchase_orders_changed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendorApi', '0004_vendor_metrics_timestamps'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingVendorRecompute',
+            fields=[
+                ('vendor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='vendorApi.vendor')),
+                ('requested_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:50
+
+from django.db import migrations, models
+
+from vendorManagement.migrationops import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run in a transaction (PostgreSQL).
+    atomic = False
+
+    dependencies = [
+        ('vendorApi', '0005_pending_vendor_recompute'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='vendor',
+            index=models.Index(fields=['on_time_delivery_rate', 'id'], name='vendor_on_time_rank_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='vendor',
+            index=models.Index(fields=['quality_rating_avg', 'id'], name='vendor_quality_rank_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='vendor',
+            index=models.Index(fields=['average_response_time', 'id'], name='vendor_response_rank_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='vendor',
+            index=models.Index(fields=['fulfillment_rate', 'id'], name='vendor_fulfillment_rank_idx'),
+        ),
+    ]
@@ -1,6 +1,11 @@
 from django.db import models, transaction
-from django.db.models import Avg
 from django.utils import timezone
+from vendorManagement.responsecache import (invalidate_history, invalidate_purchase_orders,
+                                             invalidate_vendors)
+
+from .metrics import (COUNTER_FIELDS, TRACKING_FIELDS, aggregate_counters,
+                      aggregate_performance_metrics, metrics_from_counters)
+from .performance import invalidate_vendor_performance
 
 
 # Create your models here.
@@ -19,6 +24,13 @@ class Vendor(models.Model):
         - quality_rating_avg: Average quality rating of completed purchase orders.
         - average_response_time: Average response time from acknowledgment to issue date.
         - fulfillment_rate: Percentage of successfully completed purchase orders.
+
+        Counters (maintained incrementally by PurchaseOrder writes, see `vendorApi.metrics`):
+        - total_po_count, completed_po_count, on_time_po_count, fulfilled_po_count
+        - quality_rating_sum, quality_rating_count: Ratings of completed purchase orders.
+        - response_time_sum, response_time_count: Response times (seconds) of acknowledged purchase orders.
+        - metrics_updated_at: When the metrics were last rebuilt from a full scan.
+        - purchase_orders_changed_at: When a purchase order write last changed the counters.
         """
 
     name = models.CharField(max_length=255)
@@ -29,32 +41,51 @@ class Vendor(models.Model):
     quality_rating_avg = models.FloatField(default=0.0)
     average_response_time = models.FloatField(default=0.0)
     fulfillment_rate = models.FloatField(default=0.0)
+    total_po_count = models.IntegerField(default=0)
+    completed_po_count = models.IntegerField(default=0)
+    on_time_po_count = models.IntegerField(default=0)
+    fulfilled_po_count = models.IntegerField(default=0)
+    quality_rating_sum = models.FloatField(default=0.0)
+    quality_rating_count = models.IntegerField(default=0)
+    response_time_sum = models.FloatField(default=0.0)
+    response_time_count = models.IntegerField(default=0)
+    metrics_updated_at = models.DateTimeField(null=True, blank=True)
+    purchase_orders_changed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        # Orderings of the leaderboard (see `vendorApi.leaderboard`): the top
+        # k vendors by a metric are read from the index without sorting.
+        indexes = [
+            models.Index(fields=['on_time_delivery_rate', 'id'], name='vendor_on_time_rank_idx'),
+            models.Index(fields=['quality_rating_avg', 'id'], name='vendor_quality_rank_idx'),
+            models.Index(fields=['average_response_time', 'id'], name='vendor_response_rank_idx'),
+            models.Index(fields=['fulfillment_rate', 'id'], name='vendor_fulfillment_rank_idx'),
+        ]
+
+    def calculate_performance_metrics(self):
+        """
+        Calculate all performance metrics for the vendor without saving them.
+
+        Runs a single aggregate query over the vendor's purchase orders
+        (see `vendorApi.metrics.aggregate_performance_metrics`).
+
+        Result:
+        - Returns a dict keyed by the metric field names.
+        """
+        return aggregate_performance_metrics(self.purchaseorder_set.all())
 
     def update_on_time_delivery_rate(self):
         """
         Update the on-time delivery rate for the vendor.
 
-        Calculates the percentage of on-time deliveries based on completed purchase orders.
-
-        Steps:
-        1. Retrieve completed purchase orders.
-        2. Filter on-time deliveries based on the delivery date being on or before the current time.
-        3. Calculate the on-time delivery rate as the percentage of on-time deliveries to total completed purchase orders.
+        Calculates the percentage of completed purchase orders delivered on or
+        before the current time.
 
         Result:
         - Updates the `on_time_delivery_rate` attribute of the vendor.
         """
-        completed_pos = self.purchaseorder_set.filter(status='completed')
-        on_time_delivery_pos = completed_pos.filter(
-            delivery_date__lte=timezone.now())
-        total_completed_pos = completed_pos.count()
-
-        if total_completed_pos > 0:
-            on_time_delivery_count = on_time_delivery_pos.count()
-            self.on_time_delivery_rate = (
-                on_time_delivery_count / total_completed_pos) * 100
-        else:
-            self.on_time_delivery_rate = 0.0
+        self.on_time_delivery_rate = self.calculate_performance_metrics()[
+            'on_time_delivery_rate']
 
     def update_quality_rating_avg(self):
         """
@@ -62,50 +93,24 @@ class Vendor(models.Model):
 
         Calculates the average quality rating of completed purchase orders.
 
-        Steps:
-        1. Retrieve completed purchase orders with a non-null quality rating.
-        2. Calculate the average quality rating using the `aggregate` function.
-
         Result:
         - Updates the `quality_rating_avg` attribute of the vendor.
         """
-        completed_pos = self.purchaseorder_set.filter(
-            status='completed', quality_rating__isnull=False)
-        total_completed_pos = completed_pos.count()
-
-        if total_completed_pos > 0:
-            self.quality_rating_avg = completed_pos.aggregate(
-                Avg('quality_rating'))['quality_rating__avg']
-        else:
-            self.quality_rating_avg = 0.0
+        self.quality_rating_avg = self.calculate_performance_metrics()[
+            'quality_rating_avg']
 
     def update_average_response_time(self):
         """
         Update the average response time for the vendor.
 
-        Calculates the average response time from acknowledgment to issue date.
-
-        Steps:
-        1. Retrieve acknowledged purchase orders.
-        2. Calculate the response time for each acknowledged purchase order.
-        3. Calculate the average response time based on all acknowledged purchase orders.
+        Calculates the average response time (in seconds) from issue date to
+        acknowledgment. The durations are averaged by the database.
 
         Result:
         - Updates the `average_response_time` attribute of the vendor.
         """
-        acknowledged_pos = self.purchaseorder_set.filter(
-            acknowledgment_date__isnull=False)
-        total_acknowledged_pos = acknowledged_pos.count()
-
-        if total_acknowledged_pos > 0:
-            response_times = [
-                (po.acknowledgment_date - po.issue_date).total_seconds()
-                for po in acknowledged_pos if po.issue_date and po.acknowledgment_date
-            ]
-            self.average_response_time = sum(
-                response_times) / total_acknowledged_pos
-        else:
-            self.average_response_time = 0.0
+        self.average_response_time = self.calculate_performance_metrics()[
+            'average_response_time']
 
     def update_fulfillment_rate(self):
         """
@@ -113,78 +118,117 @@ class Vendor(models.Model):
 
         Calculates the percentage of successfully completed purchase orders.
 
-        Steps:
-        1. Retrieve total purchase orders for the vendor.
-        2. Filter successfully completed purchase orders.
-        3. Calculate the fulfillment rate as the percentage of successful orders to total purchase orders.
-
         Result:
         - Updates the `fulfillment_rate` attribute of the vendor.
         """
-        total_pos = self.purchaseorder_set.count()
-
-        if total_pos > 0:
-            successful_pos = self.purchaseorder_set.filter(
-                status='completed', acknowledgment_date__isnull=False)
-            successful_pos_count = successful_pos.count()
-            self.fulfillment_rate = (successful_pos_count / total_pos) * 100
-        else:
-            self.fulfillment_rate = 0.0
+        self.fulfillment_rate = self.calculate_performance_metrics()[
+            'fulfillment_rate']
 
     def save(self, *args, **kwargs):
         """
-        Save the vendor instance and create a historical performance record.
+        Save the vendor instance and record a historical performance snapshot.
 
-        Overrides the default save method to create a historical performance record after saving.
+        Overrides the default save method to record a historical performance snapshot after saving.
 
         Steps:
-        1. Save the vendor instance.
-        2. Create a historical performance record with the current performance metrics.
+        1. Save the vendor instance. Updates of an existing vendor leave the
+           counters and tracking timestamps untouched unless they are listed in
+           `update_fields`, so a stale instance never overwrites increments
+           made by PurchaseOrder writes.
+        2. Record the current performance metrics according to the snapshot
+           policy, which skips unchanged metrics by default.
 
         Result:
-        - Vendor instance is saved, and a historical performance record is created.
+        - Vendor instance is saved, and a historical performance snapshot is recorded.
         """
-        from historyApi.models import HistoricalPerformance
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in COUNTER_FIELDS + TRACKING_FIELDS
+            ]
         try:
             super().save(*args, **kwargs)  # Save the Vendor instance first
-
-            # Create a historical performance record with a timestamp
-            historical_performance = HistoricalPerformance(
-                vendor=self,
-                on_time_delivery_rate=self.on_time_delivery_rate,
-                quality_rating_avg=self.quality_rating_avg,
-                average_response_time=self.average_response_time,
-                fulfillment_rate=self.fulfillment_rate,
-            )
-            historical_performance.save()
+            self.record_historical_performance()
 
         except Exception as e:
             print(f"Error saving vendor: {e}")
 
+    def delete(self, *args, **kwargs):
+        """
+        Delete the vendor with its purchase orders and history, and invalidate
+        their cached responses once (see `vendorManagement.responsecache`).
+        """
+        pk = self.pk
+        purchase_order_ids = list(self.purchaseorder_set.values_list('pk', flat=True))
+        result = super().delete(*args, **kwargs)
+        invalidate_vendors([pk])
+        invalidate_purchase_orders(purchase_order_ids, [pk])
+        invalidate_history([pk])
+        return result
+
+    def record_historical_performance(self):
+        """
+        Record the current performance metrics in the history according to
+        the `HISTORY_SNAPSHOTS` policy (see `historyApi.snapshots`).
+        """
+        from historyApi.snapshots import record_snapshot
+
+        return record_snapshot(self)
+
     @transaction.atomic()
-    def update_performance_metrics(self):
+    def update_performance_metrics(self, record_history=True):
         """
-        Update all performance metrics for the vendor in a transaction.
+        Rebuild the counters and performance metrics for the vendor in a transaction.
 
-        Calls individual methods to update on-time delivery rate, quality rating, response time, and fulfillment rate.
+        Recomputes the counters from all purchase orders with one aggregate
+        query, derives the on-time delivery rate, quality rating, response
+        time and fulfillment rate from them, then stores them on the vendor.
 
-        Steps:
-        1. Update on-time delivery rate.
-        2. Update average quality rating.
-        3. Update average response time.
-        4. Update fulfillment rate.
-        5. Save the vendor instance.
+        Parameters:
+        - record_history: Whether to record a historical performance snapshot.
 
         Result:
-        - All performance metrics are updated, and changes are saved in a transaction.
+        - Counters and performance metrics are rebuilt, and changes are saved in a transaction.
+        """
+        values = aggregate_counters(self.purchaseorder_set.all())
+        values.update(metrics_from_counters(values))
+        values['metrics_updated_at'] = timezone.now()
+        for field, value in values.items():
+            setattr(self, field, value)
+
+        Vendor.objects.filter(pk=self.pk).update(**values)
+        invalidate_vendor_performance(self.pk)
+        invalidate_vendors([self.pk])
+        if record_history:
+            self.record_historical_performance()
+
+    def counters(self):
         """
+        Return the stored counters as a dict keyed by `COUNTER_FIELDS`.
+        """
+        return {field: getattr(self, field) for field in COUNTER_FIELDS}
 
-        self.update_on_time_delivery_rate()
-        self.update_quality_rating_avg()
-        self.update_average_response_time()
-        self.update_fulfillment_rate()
+    def __str__(self):
+        return self.name
 
-        self.save()
+
+class PendingVendorRecompute(models.Model):
+    """
+    Marker queueing a vendor for metric recomputation by the
+    `process_metrics_queue` worker.
+
+    There is at most one marker per vendor: repeated requests for the same
+    vendor coalesce into the existing marker, which keeps the time of the
+    earliest request so the queue lag can be measured.
+
+    Attributes:
+    - vendor: Vendor to recompute.
+    - requested_at: When the vendor was first marked dirty.
+    """
+    vendor = models.OneToOneField(
+        Vendor, on_delete=models.CASCADE, primary_key=True)
+    requested_at = models.DateTimeField(default=timezone.now, db_index=True)
 
     def __str__(self):
-        return self.name
+        return f"Recompute vendor #{self.vendor_id}"
@@ -0,0 +1,72 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+
+# Freshness policies for the vendor performance endpoint.
+STORED = 'stored'        # Serve the stored metrics, never recompute on read.
+MAX_AGE = 'max_age'      # Recompute when the last full rebuild is older than MAX_AGE seconds.
+ON_CHANGE = 'on_change'  # Recompute when purchase orders changed since the last rebuild.
+
+DEFAULTS = {
+    'FRESHNESS': STORED,
+    'MAX_AGE': 300,
+    'CACHE_TIMEOUT': 0,
+}
+
+
+def performance_settings():
+    """
+    Return the `VENDOR_PERFORMANCE` settings merged with the defaults.
+    """
+    return {**DEFAULTS, **getattr(settings, 'VENDOR_PERFORMANCE', {})}
+
+
+def vendor_performance_cache_key(vendor_id):
+    return f'vendor-performance:{vendor_id}'
+
+
+def invalidate_vendor_performance(vendor_id):
+    """
+    Drop the cached performance payload of a vendor.
+    """
+    if performance_settings()['CACHE_TIMEOUT']:
+        cache.delete(vendor_performance_cache_key(vendor_id))
+
+
+def needs_recompute(vendor, now=None):
+    """
+    Whether the stored metrics of `vendor` are stale under the configured
+    freshness policy.
+    """
+    config = performance_settings()
+    policy = config['FRESHNESS']
+    if policy == STORED:
+        return False
+    if policy == MAX_AGE:
+        if vendor.metrics_updated_at is None:
+            return True
+        if now is None:
+            now = timezone.now()
+        return vendor.metrics_updated_at < now - timedelta(seconds=config['MAX_AGE'])
+    if policy == ON_CHANGE:
+        if vendor.purchase_orders_changed_at is None:
+            return False
+        return (vendor.metrics_updated_at is None
+                or vendor.metrics_updated_at < vendor.purchase_orders_changed_at)
+    raise ValueError(f"Unknown VENDOR_PERFORMANCE['FRESHNESS'] policy: {policy!r}")
+
+
+def performance_data(vendor):
+    """
+    Performance payload returned by the vendor performance endpoint.
+    """
+    return {
+        'vendor': vendor.id,
+        "on_time_delivery": vendor.on_time_delivery_rate,
+        "quality_rating": vendor.quality_rating_avg,
+        "average_response_time": vendor.average_response_time,
+        "fulfillment_rate": vendor.fulfillment_rate,
+    }
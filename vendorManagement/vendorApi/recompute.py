@@ -0,0 +1,98 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from .models import PendingVendorRecompute, Vendor
+
+
+INLINE = 'inline'
+QUEUE = 'queue'
+
+
+def recompute_mode():
+    """
+    Return `VENDOR_METRICS_RECOMPUTE`: 'inline' or 'queue'.
+    """
+    return getattr(settings, 'VENDOR_METRICS_RECOMPUTE', INLINE)
+
+
+def enqueue_vendors(vendor_ids):
+    """
+    Mark vendors dirty with one INSERT. Vendors that already have a marker
+    are skipped, so repeated requests coalesce.
+    """
+    markers = [PendingVendorRecompute(vendor_id=vendor_id) for vendor_id in set(vendor_ids)]
+    PendingVendorRecompute.objects.bulk_create(markers, ignore_conflicts=True)
+
+
+def schedule_recompute(vendor_ids):
+    """
+    Request the recomputation of vendors after their purchase orders changed.
+
+    The counters and rates are already current (they are maintained on every
+    purchase order write). In 'inline' mode a historical performance snapshot
+    is recorded right away. In 'queue' mode the vendors are marked dirty and
+    the `process_metrics_queue` worker rebuilds their metrics from a full
+    scan and records the snapshot outside the request.
+    """
+    vendor_ids = [vendor_id for vendor_id in vendor_ids if vendor_id is not None]
+    if not vendor_ids:
+        return
+    if recompute_mode() == QUEUE:
+        enqueue_vendors(vendor_ids)
+        return
+    for vendor in Vendor.objects.filter(pk__in=vendor_ids):
+        vendor.record_historical_performance()
+
+
+def process_queue(batch_size=100):
+    """
+    Recompute up to `batch_size` queued vendors, oldest request first.
+
+    Markers are claimed and deleted in a short transaction, with
+    `SELECT ... FOR UPDATE SKIP LOCKED` where the database supports it, so
+    several workers can run side by side and purchase order writes queuing
+    the same vendors never wait on a recompute. Each vendor is then
+    recomputed in its own transaction. A vendor marked dirty again while it
+    is being processed is queued again; if a recompute fails, the vendors
+    not recomputed yet are queued again before the error is raised.
+
+    Returns:
+    - The number of vendors recomputed.
+    """
+    with transaction.atomic():
+        vendor_ids = list(
+            PendingVendorRecompute.objects
+            .select_for_update(skip_locked=True)
+            .order_by('requested_at')
+            .values_list('vendor_id', flat=True)[:batch_size])
+        if not vendor_ids:
+            return 0
+        PendingVendorRecompute.objects.filter(vendor_id__in=vendor_ids).delete()
+
+    vendors = list(Vendor.objects.filter(pk__in=vendor_ids))
+    for position, vendor in enumerate(vendors):
+        try:
+            with transaction.atomic():
+                vendor.update_performance_metrics()
+        except Exception:
+            enqueue_vendors([vendor.pk for vendor in vendors[position:]])
+            raise
+    return len(vendor_ids)
+
+
+def queue_stats(now=None):
+    """
+    Queue depth and lag (age of the oldest pending request, in seconds).
+    """
+    if now is None:
+        now = timezone.now()
+    stats = PendingVendorRecompute.objects.aggregate(
+        depth=Count('pk'), oldest=Min('requested_at'))
+    lag = (now - stats['oldest']).total_seconds() if stats['oldest'] else 0.0
+    return {
+        'depth': stats['depth'],
+        'oldest_requested_at': stats['oldest'],
+        'lag_seconds': lag,
+    }
@@ -1,8 +1,27 @@
 from rest_framework import serializers
+from vendorManagement.fastserializer import FastListSerializer
+from vendorManagement.instrumentation import TimedSerializerMixin
+from .metrics import COUNTER_FIELDS, TRACKING_FIELDS
 from .models import Vendor
 
 
-class VendorSerializer(serializers.ModelSerializer):
+class VendorSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Vendor
         fields = '__all__'
+        read_only_fields = COUNTER_FIELDS + TRACKING_FIELDS
+
+
+# Read-only list serialization from `values_list()` rows, same output as
+# `VendorSerializer(many=True)`.
+vendor_list_serializer = FastListSerializer(VendorSerializer)
+
+
+class VendorLeaderboardSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Vendor
+        fields = ('id', 'name', 'vendor_code', 'on_time_delivery_rate', 'quality_rating_avg',
+                  'average_response_time', 'fulfillment_rate', 'total_po_count')
+
+
+vendor_leaderboard_serializer = FastListSerializer(VendorLeaderboardSerializer)
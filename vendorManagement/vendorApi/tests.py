@@ -1,12 +1,34 @@
-from django.test import TestCase
+import math
+import os
+import time
+from types import SimpleNamespace
+from unittest import mock, skipUnless
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.test import AsyncClient, SimpleTestCase, TestCase, override_settings
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework.authtoken.models import Token
-from django.contrib.auth.models import User
+from django.contrib.auth.models import User, update_last_login
 from rest_framework.test import APIClient
 from rest_framework import status
+from rest_framework.serializers import BaseSerializer
 from .models import Vendor
+from .serializer import VendorSerializer
 from purchaseApi.models import PurchaseOrder
 from django.utils import timezone
+from django.core.management import call_command
+from io import StringIO
+from .metrics import aggregate_counters
+from .models import PendingVendorRecompute
+from .recompute import process_queue, queue_stats, schedule_recompute
+from historyApi.models import HistoricalPerformance
+from vendorManagement.authentication import local_cache, token_cache_key
+from vendorManagement.database import REPLICA, database_settings, databases, replica_settings
+from vendorManagement.instrumentation import registry
+from vendorManagement.replicas import ReplicaRouter, replica_alias, replica_reads
+from vendorManagement.testing import QueryCountTestCase
+from purchaseApi.synthetic import SyntheticData
 
 
 class VendorTests(TestCase):
@@ -32,6 +54,37 @@ class VendorTests(TestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_get_vendors_paginated(self):
+        for i in range(5):
+            Vendor.objects.create(name=f'Vendor {i}', vendor_code=f'PAGE{i}')
+        url = reverse('vendors') + '?page_size=2'
+        seen = []
+        # Token lookup on the first request only (it is cached afterwards)
+        # and one page query, however deep the page.
+        queries = 2
+        while url:
+            with self.assertNumQueries(queries):
+                response = self.client.get(url)
+            queries = 1
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 2)
+            seen.extend(vendor['id'] for vendor in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(seen, list(Vendor.objects.order_by('pk').values_list('pk', flat=True)))
+
+    def test_get_vendors_matches_vendor_serializer(self):
+        Vendor.objects.create(**self.vendor_data)
+        vendor = Vendor.objects.get()
+        vendor.update_performance_metrics()
+        response = self.client.get(reverse('vendors'))
+        self.assertEqual(
+            response.data['results'],
+            VendorSerializer(Vendor.objects.order_by('pk'), many=True).data)
+
+    def test_get_vendors_invalid_cursor(self):
+        response = self.client.get(reverse('vendors') + '?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_create_vendor(self):
         url = reverse('vendors_create')
         response = self.client.post(url, self.vendor_data, format='json')
@@ -154,3 +207,806 @@ class VendorModelTest(TestCase):
         self.assertEqual(self.vendor.quality_rating_avg, 4.0)
         self.assertEqual(self.vendor.average_response_time, 0.0)
         self.assertEqual(self.vendor.fulfillment_rate, 50.0)
+
+    def test_calculate_performance_metrics_single_query(self):
+        issue_date = timezone.now() - timezone.timedelta(hours=4)
+        PurchaseOrder.objects.filter(pk=self.purchase_order_completed.pk).update(
+            issue_date=issue_date,
+            acknowledgment_date=issue_date + timezone.timedelta(hours=1))
+        PurchaseOrder.objects.filter(pk=self.purchase_order_pending.pk).update(
+            issue_date=issue_date,
+            acknowledgment_date=issue_date + timezone.timedelta(hours=3))
+
+        with self.assertNumQueries(1):
+            metrics = self.vendor.calculate_performance_metrics()
+
+        self.assertEqual(metrics, {
+            'on_time_delivery_rate': 100.0,
+            'quality_rating_avg': 4.0,
+            'average_response_time': 7200.0,
+            'fulfillment_rate': 50.0,
+        })
+
+
+class VendorCounterTest(TestCase):
+
+    def setUp(self):
+        self.vendor = Vendor.objects.create(name='Test Vendor', vendor_code='CNT001')
+        self.other_vendor = Vendor.objects.create(name='Other Vendor', vendor_code='CNT002')
+        self.issue_date = timezone.now() - timezone.timedelta(days=10)
+
+    def create_po(self, po_number, **kwargs):
+        data = {
+            'vendor': self.vendor,
+            'po_number': po_number,
+            'order_date': self.issue_date,
+            'delivery_date': self.issue_date + timezone.timedelta(days=2),
+            'items': {'item1': 'item1'},
+            'quantity': 1,
+            'status': 'pending',
+            'issue_date': self.issue_date,
+            'acknowledgment_date': self.issue_date + timezone.timedelta(hours=2),
+        }
+        data.update(kwargs)
+        return PurchaseOrder.objects.create(**data)
+
+    def assertCountersMatchScan(self, vendor):
+        vendor.refresh_from_db()
+        expected = aggregate_counters(vendor.purchaseorder_set.all())
+        for field, value in expected.items():
+            self.assertAlmostEqual(getattr(vendor, field), value, msg=field)
+        return vendor
+
+    def test_counters_follow_purchase_order_writes(self):
+        po = self.create_po('CNT-PO1')
+        self.create_po('CNT-PO2', status='completed', quality_rating=3.0)
+        self.assertCountersMatchScan(self.vendor)
+
+        po.status = 'completed'
+        po.quality_rating = 5.0
+        po.save()
+        vendor = self.assertCountersMatchScan(self.vendor)
+        self.assertEqual(vendor.fulfillment_rate, 100.0)
+        self.assertEqual(vendor.quality_rating_avg, 4.0)
+        self.assertEqual(vendor.average_response_time, 7200.0)
+
+        po = PurchaseOrder.objects.get(pk=po.pk)
+        po.vendor = self.other_vendor
+        po.save()
+        self.assertCountersMatchScan(self.vendor)
+        self.assertCountersMatchScan(self.other_vendor)
+
+        po.delete()
+        self.assertCountersMatchScan(self.other_vendor)
+        self.assertEqual(self.other_vendor.total_po_count, 0)
+
+    def test_on_time_count_is_stable_after_delivery_date(self):
+        now = timezone.now()
+        po = self.create_po('CNT-LATE', status='completed',
+                            delivery_date=now + timezone.timedelta(days=1))
+        self.assertIsNotNone(po.completion_date)
+        vendor = self.assertCountersMatchScan(self.vendor)
+        self.assertEqual((vendor.completed_po_count, vendor.on_time_po_count), (1, 0))
+
+        later = now + timezone.timedelta(days=2)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            po = PurchaseOrder.objects.get(pk=po.pk)
+            po.quality_rating = 4.0
+            po.save()
+            self.assertEqual(PurchaseOrder.objects.get(pk=po.pk).completion_date, po.completion_date)
+            vendor = self.assertCountersMatchScan(self.vendor)
+            self.assertEqual(vendor.on_time_po_count, 0)
+
+            po.delete()
+            vendor = self.assertCountersMatchScan(self.vendor)
+            self.assertEqual((vendor.completed_po_count, vendor.on_time_po_count), (0, 0))
+            out = StringIO()
+            call_command('rebuild_vendor_metrics', '--check', stdout=out)
+            self.assertIn('0 with drifted counters', out.getvalue())
+
+    def test_purchase_order_write_does_not_scan(self):
+        for i in range(5):
+            self.create_po(f'CNT-SCAN{i}')
+        po = PurchaseOrder.objects.get(po_number='CNT-SCAN0')
+        po.status = 'completed'
+        # SAVEPOINT, UPDATE purchase order, UPDATE vendor counters, RELEASE.
+        with self.assertNumQueries(4):
+            po.save()
+
+    def test_vendor_save_keeps_counters(self):
+        stale = Vendor.objects.get(pk=self.vendor.pk)
+        self.create_po('CNT-STALE')
+        stale.name = 'Renamed Vendor'
+        stale.save()
+        vendor = self.assertCountersMatchScan(self.vendor)
+        self.assertEqual(vendor.total_po_count, 1)
+
+    def test_rebuild_vendor_metrics_command(self):
+        self.create_po('CNT-CMD', status='completed', quality_rating=4.0)
+        Vendor.objects.filter(pk=self.vendor.pk).update(
+            total_po_count=7, quality_rating_avg=1.0)
+
+        out = StringIO()
+        call_command('rebuild_vendor_metrics', '--check', stdout=out)
+        self.assertIn(f'Vendor {self.vendor.pk} drifted', out.getvalue())
+        self.vendor.refresh_from_db()
+        self.assertEqual(self.vendor.total_po_count, 7)
+
+        call_command('rebuild_vendor_metrics', stdout=StringIO())
+        vendor = self.assertCountersMatchScan(self.vendor)
+        self.assertEqual(vendor.quality_rating_avg, 4.0)
+
+
+class VendorPerformanceReadTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser', password='testpassword')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.vendor = Vendor.objects.create(name='Test Vendor', vendor_code='PERF001')
+        now = timezone.now()
+        PurchaseOrder.objects.create(
+            vendor=self.vendor, po_number='PERF-PO1', order_date=now,
+            delivery_date=now - timezone.timedelta(days=1), items={'item1': 'item1'},
+            quantity=1, status='completed', quality_rating=4.0, issue_date=now,
+            acknowledgment_date=now)
+        self.url = reverse('vendor_performance', args=[self.vendor.id])
+
+    def test_stored_read_does_not_write(self):
+        history_count = HistoricalPerformance.objects.count()
+        # Token lookup and vendor lookup only.
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['quality_rating'], 4.0)
+        self.assertEqual(response.data['fulfillment_rate'], 100.0)
+        self.assertEqual(HistoricalPerformance.objects.count(), history_count)
+
+    def test_unknown_vendor(self):
+        response = self.client.get(reverse('vendor_performance', args=[0]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(VENDOR_PERFORMANCE={'FRESHNESS': 'on_change'})
+    def test_on_change_rebuilds_once(self):
+        self.client.get(self.url)
+        self.vendor.refresh_from_db()
+        self.assertIsNotNone(self.vendor.metrics_updated_at)
+        history_count = HistoricalPerformance.objects.count()
+
+        # Vendor lookup only, the token is cached.
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+        self.assertEqual(HistoricalPerformance.objects.count(), history_count)
+
+    @override_settings(VENDOR_PERFORMANCE={'FRESHNESS': 'max_age', 'MAX_AGE': 60})
+    def test_max_age_rebuilds_stale_metrics(self):
+        stale = timezone.now() - timezone.timedelta(minutes=5)
+        Vendor.objects.filter(pk=self.vendor.pk).update(
+            metrics_updated_at=stale, quality_rating_avg=1.0)
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['quality_rating'], 4.0)
+        self.vendor.refresh_from_db()
+        self.assertGreater(self.vendor.metrics_updated_at, stale)
+
+    @override_settings(VENDOR_PERFORMANCE={'CACHE_TIMEOUT': 60})
+    def test_cached_read_is_invalidated_by_purchase_order_writes(self):
+        self.client.get(self.url)
+        # No queries, the token and the payload come from the cache.
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+        po = PurchaseOrder.objects.get(po_number='PERF-PO1')
+        po.quality_rating = 2.0
+        po.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['quality_rating'], 2.0)
+
+
+@override_settings(VENDOR_METRICS_RECOMPUTE='queue')
+class MetricsQueueTest(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='admin', password='testpassword', is_staff=True)
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.vendor = Vendor.objects.create(name='Test Vendor', vendor_code='QUEUE001')
+        now = timezone.now()
+        self.po = PurchaseOrder.objects.create(
+            vendor=self.vendor, po_number='QUEUE-PO1', order_date=now,
+            delivery_date=now, items={'item1': 'item1'}, quantity=1,
+            status='pending', issue_date=now)
+
+    def test_acknowledge_enqueues_and_coalesces(self):
+        history_count = HistoricalPerformance.objects.count()
+        url = reverse('acknowledge_purchase_order', args=[self.po.id])
+        self.client.post(url)
+        self.client.post(url)
+        schedule_recompute([self.vendor.id])
+
+        self.assertEqual(PendingVendorRecompute.objects.count(), 1)
+        self.assertEqual(HistoricalPerformance.objects.count(), history_count)
+        self.assertEqual(queue_stats()['depth'], 1)
+
+        response = self.client.get(reverse('metrics_queue'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['depth'], 1)
+        self.assertGreaterEqual(response.data['lag_seconds'], 0)
+
+        call_command('process_metrics_queue', '--once', stdout=StringIO())
+        self.assertEqual(PendingVendorRecompute.objects.count(), 0)
+        self.vendor.refresh_from_db()
+        self.assertIsNotNone(self.vendor.metrics_updated_at)
+        self.assertEqual(process_queue(), 0)
+
+    @override_settings(HISTORY_SNAPSHOTS={'POLICY': 'batch', 'BATCH_SIZE': 500})
+    def test_worker_flushes_batch_snapshots(self):
+        history_count = HistoricalPerformance.objects.count()
+        schedule_recompute([self.vendor.id])
+        call_command('process_metrics_queue', '--once', stdout=StringIO())
+        self.assertEqual(HistoricalPerformance.objects.count(), history_count + 1)
+
+    def test_failed_recompute_is_queued_again(self):
+        other = Vendor.objects.create(name='Other Vendor', vendor_code='QUEUE002')
+        schedule_recompute([self.vendor.id, other.id])
+        with mock.patch.object(Vendor, 'update_performance_metrics', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                process_queue()
+        self.assertEqual(
+            set(PendingVendorRecompute.objects.values_list('vendor_id', flat=True)),
+            {self.vendor.id, other.id})
+        self.assertEqual(process_queue(), 2)
+        self.assertEqual(queue_stats()['depth'], 0)
+
+    def test_metrics_queue_requires_admin(self):
+        self.user.is_staff = False
+        self.user.save()
+        response = self.client.get(reverse('metrics_queue'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class CachedTokenAuthenticationTest(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser', password='testpassword')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.url = reverse('vendors')
+
+    def test_token_is_resolved_once(self):
+        self.client.get(self.url)
+        # Page query only.
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_shared_cache_is_used_after_local_expiry(self):
+        self.client.get(self.url)
+        local_cache.clear()
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_deleted_token_is_rejected(self):
+        self.client.get(self.url)
+        self.token.delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_login_keeps_cached_token(self):
+        self.client.get(self.url)
+        cache_key = token_cache_key(self.token.key)
+        # The UPDATE only: no token lookup or eviction.
+        with self.assertNumQueries(1):
+            update_last_login(None, self.user)
+        self.assertIsNotNone(cache.get(cache_key))
+
+    def assertEvictedOnCommit(self, write):
+        self.client.get(self.url)
+        cache_key = token_cache_key(self.token.key)
+        cached = cache.get(cache_key)
+        self.assertIsNotNone(cached)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            write()
+            # Cached again by a concurrent request that read the committed rows.
+            cache.set(cache_key, cached)
+        self.assertEqual(len(callbacks), 1)
+        self.assertIsNone(cache.get(cache_key))
+        local_cache.clear()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_token_is_evicted_on_commit(self):
+        self.assertEvictedOnCommit(self.token.delete)
+
+    def test_deactivated_user_is_evicted_on_commit(self):
+        def deactivate():
+            self.user.is_active = False
+            self.user.save()
+        self.assertEvictedOnCommit(deactivate)
+
+
+@override_settings(API_AUTHENTICATION='jwt')
+class JWTAuthenticationTest(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser', password='testpassword', is_staff=True)
+        response = self.client.post(
+            reverse('login'), {'username': 'testuser', 'password': 'testpassword'},
+            format='json')
+        self.tokens = response.data
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + self.tokens['access'])
+
+    def test_login_issues_jwt(self):
+        self.assertIn('refresh', self.tokens)
+        self.assertFalse(Token.objects.filter(user=self.user).exists())
+
+    def test_requests_are_verified_without_the_database(self):
+        # Page query only.
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('vendors'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(reverse('metrics_queue'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_invalid_token_is_rejected(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + self.tokens['access'] + 'x')
+        response = self.client.get(reverse('vendors'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh(self):
+        response = self.client.post(
+            reverse('token_refresh'), {'refresh': self.tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + response.data['access'])
+        self.assertEqual(self.client.get(reverse('vendors')).status_code, status.HTTP_200_OK)
+
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.post(
+            reverse('token_refresh'), {'refresh': self.tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_signup_issues_jwt(self):
+        response = self.client.post(reverse('signup'), {
+            'username': 'newuser', 'password': 'newpassword', 'email': 'new@example.com'},
+            format='json')
+        self.assertEqual(set(response.data), {'access', 'refresh'})
+
+
+class RequestMetricsTest(TestCase):
+
+    def setUp(self):
+        registry.reset()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='admin', password='testpassword', is_staff=True)
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        Vendor.objects.create(name='Test Vendor', vendor_code='METRICS001')
+
+    def test_requests_are_recorded_per_view(self):
+        response = self.client.get(reverse('vendors'))
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.client.get(reverse('vendors'))
+
+        response = self.client.get(reverse('request_metrics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        stats = response.data['vendors']
+        self.assertEqual(stats['count'], 2)
+        # Token and page on the first request, page only on the second.
+        self.assertEqual(stats['queries_sum'], 3)
+        self.assertGreater(stats['serializer_seconds_sum'], 0)
+        self.assertLessEqual(stats['latency_seconds']['p50'], stats['latency_seconds']['p99'])
+
+        response = self.client.get(reverse('request_metrics'), {'output': 'prometheus'})
+        self.assertContains(
+            response, 'http_request_duration_seconds_count{view="vendors"} 2')
+        self.assertContains(response, 'http_request_db_queries_total{view="vendors"} 3')
+
+    def test_serializer_time_of_detail_views(self):
+        vendor = Vendor.objects.get()
+        self.client.get(reverse('vendor_detail', args=[vendor.id]))
+        stats = self.client.get(reverse('request_metrics')).data['vendor_detail']
+        self.assertGreater(stats['serializer_seconds_sum'], 0)
+        # DRF's own serializers are left as they are.
+        self.assertEqual(BaseSerializer.data.fget.__module__, 'rest_framework.serializers')
+
+    def test_request_metrics_requires_admin(self):
+        self.user.is_staff = False
+        self.user.save()
+        response = self.client.get(reverse('request_metrics'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(REQUEST_METRICS={'SLOW_REQUEST_MS': 0})
+    def test_slow_requests_are_logged_with_their_queries(self):
+        with self.assertLogs('vendorManagement.instrumentation', 'WARNING') as logs:
+            self.client.get(reverse('vendors'))
+        self.assertIn('vendorApi_vendor', logs.output[0])
+
+
+class VendorLeaderboardTest(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser', password='testpassword')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.url = reverse('vendor_leaderboard')
+
+    def create_vendor(self, code, total, completed, on_time, response_time=0.0):
+        vendor = Vendor.objects.create(name=code, contact_details='Contact',
+                                       address='Address', vendor_code=code)
+        Vendor.objects.filter(pk=vendor.pk).update(
+            total_po_count=total, completed_po_count=completed, on_time_po_count=on_time,
+            on_time_delivery_rate=on_time / completed * 100 if completed else 0.0,
+            response_time_count=1 if response_time else 0, average_response_time=response_time)
+        return vendor
+
+    def codes(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [vendor['vendor_code'] for vendor in response.data['results']]
+
+    def test_ranking(self):
+        self.create_vendor('HALF', 10, 10, 5, response_time=60)
+        self.create_vendor('BEST', 4, 4, 4, response_time=600)
+        self.create_vendor('UNRATED', 3, 0, 0)
+        self.create_vendor('WORST', 20, 10, 1, response_time=30)
+
+        self.assertEqual(self.codes(self.client.get(self.url)), ['BEST', 'HALF', 'WORST'])
+        self.assertEqual(self.codes(self.client.get(self.url, {'min_orders': 5})), ['HALF', 'WORST'])
+        response = self.client.get(self.url, {'metric': 'average_response_time'})
+        self.assertEqual(self.codes(response), ['WORST', 'HALF', 'BEST'])
+        self.assertEqual(set(response.data['results'][0]), {
+            'id', 'name', 'vendor_code', 'on_time_delivery_rate', 'quality_rating_avg',
+            'average_response_time', 'fulfillment_rate', 'total_po_count'})
+
+    def test_pagination_is_stable_across_ties(self):
+        for index in range(7):
+            self.create_vendor(f'TIE{index}', 2, 2, 2 if index % 2 else 1)
+        codes, url = [], self.url + '?page_size=2'
+        while url:
+            response = self.client.get(url)
+            codes.extend(self.codes(response))
+            url = response.data['next']
+        self.assertEqual(codes, ['TIE5', 'TIE3', 'TIE1', 'TIE6', 'TIE4', 'TIE2', 'TIE0'])
+
+    def test_invalid_parameters(self):
+        response = self.client.get(self.url, {'metric': 'name'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('metric', response.data)
+        response = self.client.get(self.url, {'min_orders': 'many'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncViewsTest(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser', password='testpassword')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.vendor, = SyntheticData('ASYNC').generate(1, 5, 1)
+
+    def test_async_views_match_sync_views(self):
+        for sync_name, async_name, args in [
+            ('vendors', 'vendors_async', []),
+            ('vendor_leaderboard', 'vendor_leaderboard_async', []),
+            ('vendor_detail', 'vendor_detail_async', [self.vendor.id]),
+            ('vendor_performance', 'vendor_performance_async', [self.vendor.id]),
+        ]:
+            expected = self.client.get(reverse(sync_name, args=args))
+            response = self.client.get(reverse(async_name, args=args))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response['Content-Type'], 'application/json')
+            self.assertEqual(response.json().get('results', response.json()),
+                             expected.json().get('results', expected.json()))
+
+    def test_async_views_errors(self):
+        response = self.client.get(reverse('vendor_detail_async', args=[self.vendor.id + 1]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(reverse('vendors_async'), {'cursor': 'invalid'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(reverse('vendor_leaderboard_async'), {'min_orders': 'many'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.delete(reverse('vendor_detail_async', args=[self.vendor.id]))
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+        self.assertTrue(Vendor.objects.filter(pk=self.vendor.id).exists())
+
+        self.client.credentials()
+        response = self.client.get(reverse('vendors_async'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response['WWW-Authenticate'], 'Token')
+        self.client.credentials(HTTP_AUTHORIZATION='Token invalid')
+        response = self.client.get(reverse('vendors_async'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_asgi_request_is_instrumented(self):
+        response = await AsyncClient().get(
+            reverse('vendors_async'), headers={'Authorization': 'Token ' + self.token.key})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Token lookup and page, run by the async ORM in a thread.
+        self.assertIn('desc="2 queries"', response['Server-Timing'])
+
+
+class DatabaseSettingsTest(SimpleTestCase):
+
+    def test_defaults_match_development(self):
+        database = database_settings({})
+        self.assertEqual(database['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual((database['HOST'], database['PORT']), ('localhost', '5432'))
+        self.assertEqual(database['CONN_MAX_AGE'], 0)
+        self.assertFalse(database['CONN_HEALTH_CHECKS'])
+        self.assertNotIn('DISABLE_SERVER_SIDE_CURSORS', database)
+        self.assertNotIn('OPTIONS', database)
+
+    def test_production_profile(self):
+        environ = {
+            'DATABASE_PROFILE': 'production', 'DATABASE_NAME': 'vendors',
+            'DATABASE_USER': 'app', 'DATABASE_PASSWORD': 'secret', 'DATABASE_HOST': 'pgbouncer',
+            'DATABASE_PORT': '6432', 'DATABASE_POOLER': 'pgbouncer',
+            'DATABASE_CONNECT_TIMEOUT': '5', 'DATABASE_SSLMODE': 'require',
+        }
+        database = database_settings(environ)
+        self.assertEqual(
+            [database[key] for key in ('NAME', 'USER', 'PASSWORD', 'HOST', 'PORT')],
+            ['vendors', 'app', 'secret', 'pgbouncer', '6432'])
+        self.assertEqual(database['CONN_MAX_AGE'], 60)
+        self.assertTrue(database['CONN_HEALTH_CHECKS'])
+        self.assertTrue(database['DISABLE_SERVER_SIDE_CURSORS'])
+        self.assertEqual(database['OPTIONS'], {'connect_timeout': '5', 'sslmode': 'require'})
+
+        database = database_settings({**environ, 'DATABASE_CONN_MAX_AGE': 'none',
+                                      'DATABASE_CONN_HEALTH_CHECKS': 'false'})
+        self.assertIsNone(database['CONN_MAX_AGE'])
+        self.assertFalse(database['CONN_HEALTH_CHECKS'])
+
+    def test_invalid_values(self):
+        for name, value in [('DATABASE_PROFILE', 'staging'), ('DATABASE_CONN_MAX_AGE', '-1'),
+                            ('DATABASE_CONN_MAX_AGE', 'forever'), ('DATABASE_POOLER', 'pgpool'),
+                            ('DATABASE_CONN_HEALTH_CHECKS', 'maybe')]:
+            with self.subTest(name=name, value=value), self.assertRaisesMessage(
+                    ImproperlyConfigured, name):
+                database_settings({name: value})
+
+    def test_replica(self):
+        self.assertEqual(list(databases({})), ['default'])
+        self.assertIsNone(replica_settings({}, database_settings({})))
+
+        environ = {'DATABASE_PROFILE': 'production', 'DATABASE_SSLMODE': 'require',
+                   'DATABASE_REPLICA_HOST': 'replica.internal', 'DATABASE_REPLICA_USER': 'reader'}
+        aliases = databases(environ)
+        self.assertEqual(list(aliases), ['default', REPLICA])
+        replica = aliases[REPLICA]
+        self.assertEqual((replica['HOST'], replica['USER'], replica['NAME']),
+                         ('replica.internal', 'reader', 'your-db-name'))
+        self.assertEqual(replica['CONN_MAX_AGE'], 60)
+        self.assertEqual(replica['OPTIONS'], {'sslmode': 'require'})
+        self.assertIsNot(replica['OPTIONS'], aliases['default']['OPTIONS'])
+        self.assertEqual(replica['TEST'], {'MIRROR': 'default'})
+
+        replica = replica_settings(
+            {'DATABASE_REPLICA_NAME': 'replica.sqlite3'},
+            database_settings({'DATABASE_ENGINE': 'django.db.backends.sqlite3'}))
+        self.assertEqual(replica['NAME'], 'replica.sqlite3')
+        self.assertNotIn('TEST', replica)
+
+    def test_mirrored_replica_reads_from_the_primary(self):
+        primary = database_settings({})
+        replica = replica_settings({'DATABASE_REPLICA_HOST': 'replica.internal'}, primary)
+
+        def alias_with(replica):
+            connections = {'default': SimpleNamespace(settings_dict=primary),
+                           REPLICA: SimpleNamespace(settings_dict=replica)}
+            with mock.patch('vendorManagement.replicas.connections', connections):
+                return replica_alias()
+
+        self.assertEqual(alias_with(replica), REPLICA)
+        # What the test runner does to a TEST MIRROR.
+        self.assertIsNone(alias_with({**replica, 'HOST': primary['HOST']}))
+        # A separate SQLite replica is not a mirror.
+        sqlite = database_settings({'DATABASE_ENGINE': 'django.db.backends.sqlite3'})
+        self.assertEqual(alias_with(replica_settings({'DATABASE_REPLICA_NAME': 'replica.sqlite3'}, sqlite)),
+                         REPLICA)
+
+
+# A replica with a test database of its own (not a TEST MIRROR).
+SEPARATE_REPLICA = (REPLICA in settings.DATABASES
+                    and not settings.DATABASES[REPLICA].get('TEST', {}).get('MIRROR'))
+
+
+@skipUnless(SEPARATE_REPLICA,
+            'Set DATABASE_REPLICA_NAME to a second SQLite database to run the replica tests')
+class ReadReplicaTest(TestCase):
+    """
+    Run with two SQLite databases, the other tests expect reads to see the
+    rows they just wrote:
+
+        DATABASE_ENGINE=django.db.backends.sqlite3 DATABASE_NAME=primary.sqlite3 \\
+        DATABASE_REPLICA_NAME=replica.sqlite3 python manage.py test vendorApi.tests.ReadReplicaTest
+    """
+    # The test runner sets up the databases of skipped tests too.
+    databases = {'default', REPLICA} if SEPARATE_REPLICA else {'default'}
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='vendor', password='testpassword')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.vendor = Vendor.objects.create(
+            name='Primary', contact_details='-', address='-', vendor_code='PRIMARY')
+        self.purchase_order = PurchaseOrder.objects.create(
+            po_number='PO1', vendor=self.vendor, order_date=timezone.now(),
+            delivery_date=timezone.now(), items=[], quantity=1, status='pending',
+            issue_date=timezone.now())
+        # Rows only the replica has, as if the primary's were not replicated yet.
+        self.replica_vendor, = Vendor.objects.using(REPLICA).bulk_create([Vendor(
+            name='Replica', contact_details='-', address='-', vendor_code='REPLICA')])
+        HistoricalPerformance.objects.using(REPLICA).bulk_create([
+            HistoricalPerformance(vendor=self.replica_vendor, on_time_delivery_rate=0.5)])
+
+    def vendor_names(self, client=None):
+        response = (client or self.client).get(reverse('vendors'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [vendor['name'] for vendor in response.data['results']]
+
+    def test_reads_go_to_the_replica(self):
+        self.assertEqual(self.vendor_names(), ['Replica'])
+        response = self.client.get(reverse('vendors_async'))
+        self.assertEqual([vendor['name'] for vendor in response.json()['results']], ['Replica'])
+        response = self.client.get(reverse('purchase_orders'))
+        self.assertEqual(response.data['results'], [])
+        # Detail endpoints read from the primary.
+        response = self.client.get(reverse('vendor_detail', args=[self.vendor.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['name'], 'Primary')
+
+        response = self.client.get(reverse('historical_performance_export'))
+        rows = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(rows), 1)
+        self.assertIn(f'"vendor": {self.replica_vendor.id}', rows[0])
+
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Vendor))
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Vendor), REPLICA)
+            self.assertEqual(router.db_for_write(Vendor, instance=self.replica_vendor), 'default')
+
+    def test_writer_reads_its_own_writes(self):
+        response = self.client.post(
+            reverse('acknowledge_purchase_order', args=[self.purchase_order.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(reverse('purchase_orders'))
+        self.assertEqual([po['id'] for po in response.data['results']], [self.purchase_order.id])
+        self.assertIsNotNone(response.data['results'][0]['acknowledgment_date'])
+        self.assertEqual(self.vendor_names(), ['Primary'])
+
+        other = APIClient()
+        other_user = User.objects.create_user(username='other', password='testpassword')
+        other.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.create(user=other_user).key)
+        self.assertEqual(self.vendor_names(other), ['Replica'])
+
+        with override_settings(READ_REPLICA={'STICKY_SECONDS': 0}):
+            cache.clear()
+            self.client.post(reverse('acknowledge_purchase_order', args=[self.purchase_order.id]))
+            self.assertEqual(self.vendor_names(), ['Replica'])
+
+
+class VendorQueryCountTest(QueryCountTestCase):
+
+    def test_reads(self):
+        for size in self.sizes():
+            self.assertQueries(1, 'get', reverse('vendors'))
+            self.assertQueries(1, 'get', reverse('vendor_detail', args=[self.vendor.id]))
+            self.assertQueries(1, 'get', reverse('vendor_performance', args=[self.vendor.id]))
+            self.assertQueries(1, 'get', reverse('vendor_leaderboard'), {'min_orders': 2})
+            self.assertQueries(1, 'get', reverse('metrics_queue'))
+            self.assertQueries(1, 'get', reverse('vendors_async'))
+            self.assertQueries(1, 'get', reverse('vendor_detail_async', args=[self.vendor.id]))
+            self.assertQueries(1, 'get', reverse('vendor_performance_async', args=[self.vendor.id]))
+            self.assertQueries(1, 'get', reverse('vendor_leaderboard_async'), {'min_orders': 2})
+
+    def test_writes(self):
+        for size in self.sizes():
+            data = {'name': 'Pinned', 'contact_details': 'Contact', 'address': 'Address',
+                    'vendor_code': f'PIN-{size}'}
+            # Uniqueness check, INSERT, and the history policy (latest
+            # snapshot, INSERT).
+            response = self.assertQueries(4, 'post', reverse('vendors_create'), data,
+                                          status_code=status.HTTP_201_CREATED, format='json')
+            # Read, uniqueness check, UPDATE, and the history policy (latest
+            # snapshot, INSERT).
+            self.assertQueries(5, 'put', reverse('vendor_detail', args=[self.vendor.id]),
+                               {**data, 'vendor_code': self.vendor.vendor_code}, format='json')
+            # Read, the purchase order ids to invalidate, their ids again for
+            # the collector, and a DELETE per related table.
+            self.assertQueries(6, 'delete', reverse('vendor_detail', args=[response.data['id']]),
+                               status_code=status.HTTP_204_NO_CONTENT)
+
+    def test_delete_cascade(self):
+        for size in self.sizes():
+            orders = self.large_orders if size == 'large' else self.small_orders
+            vendor, = SyntheticData(f'PIND{size}').generate(1, orders, 2)
+            # Read, the purchase order ids to invalidate, their ids again for
+            # the collector, and a DELETE per related table: no model has
+            # delete signals, so nothing else is loaded (see
+            # `vendorManagement.responsecache`). The collector deletes
+            # purchase orders 100 ids per statement, and their line items in
+            # one statement.
+            self.assertQueries(7 + math.ceil(orders / 100), 'delete', reverse('vendor_detail', args=[vendor.id]),
+                               status_code=status.HTTP_204_NO_CONTENT)
+
+
+def budget_scale():
+    return float(os.environ.get('PERFORMANCE_BUDGET_SCALE', 1))
+
+
+@skipUnless(os.environ.get('PERFORMANCE_TESTS'),
+            'Set PERFORMANCE_TESTS=1 to run the metric engine timing budgets.')
+class MetricEngineTimingTest(TestCase):
+    """
+    Timing budgets of the metric engine for a vendor with 100k purchase
+    orders. Budgets are the best of three runs, in seconds, measured on
+    SQLite with headroom; scale them with PERFORMANCE_BUDGET_SCALE on slower
+    machines.
+    """
+    orders = 100000
+    budgets = {
+        'rebuild': 3.0,
+        'purchase_order_save': 0.05,
+        'acknowledge': 0.1,
+        'performance': 0.05,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.vendor, = SyntheticData('PERF', batch_size=5000).generate(1, cls.orders, 0)
+        cls.purchase_order = cls.vendor.purchaseorder_set.order_by('pk').first()
+        cls.user = User.objects.create_user(username='perf', password='perfpassword')
+        cls.token = Token.objects.create(user=cls.user)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+
+    def assertWithinBudget(self, name, run):
+        timings = []
+        for _ in range(3):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+        budget = self.budgets[name] * budget_scale()
+        self.assertLessEqual(min(timings), budget,
+                             f'{name} took {min(timings):.3f}s, budget {budget:.3f}s')
+
+    def test_full_rebuild(self):
+        self.assertWithinBudget(
+            'rebuild', lambda: self.vendor.update_performance_metrics(record_history=False))
+
+    def test_incremental_updates(self):
+        self.assertWithinBudget('purchase_order_save', self.purchase_order.save)
+        url = reverse('acknowledge_purchase_order', args=[self.purchase_order.id])
+        self.assertWithinBudget('acknowledge', lambda: self.client.post(url))
+
+    def test_performance_read(self):
+        url = reverse('vendor_performance', args=[self.vendor.id])
+        self.assertWithinBudget('performance', lambda: self.client.get(url))
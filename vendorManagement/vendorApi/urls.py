@@ -4,8 +4,17 @@ from . import views
 urlpatterns = [
     path('vendors/', views.vendors, name='vendors'),
     path('vendors/create', views.vendor_create, name='vendors_create'),
+    path('vendors/leaderboard/', views.vendor_leaderboard, name='vendor_leaderboard'),
+    path('vendors/metrics_queue/', views.metrics_queue, name='metrics_queue'),
     path('vendors/<int:vendor_id>/',
          views.vendor_detail, name='vendor_detail'),
     path('vendors/<int:vendor_id>/performance/',
          views.vendor_performance, name='vendor_performance'),
+    path('async/vendors/', views.vendors_async, name='vendors_async'),
+    path('async/vendors/leaderboard/', views.vendor_leaderboard_async,
+         name='vendor_leaderboard_async'),
+    path('async/vendors/<int:vendor_id>/',
+         views.vendor_detail_async, name='vendor_detail_async'),
+    path('async/vendors/<int:vendor_id>/performance/',
+         views.vendor_performance_async, name='vendor_performance_async'),
 ]
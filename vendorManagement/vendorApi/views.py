@@ -1,33 +1,87 @@
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
 from django.shortcuts import render
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework import status
 
 
+from vendorManagement.asyncviews import async_api_view
+from vendorManagement.filters import parse_int
+from vendorManagement.pagination import KeysetPagination
+from vendorManagement.replicas import read_from_replica
+from vendorManagement.responsecache import VENDORS, cache_response, detail_scope, list_scope
+
+from .leaderboard import DEFAULT_METRIC, METRICS, leaderboard_ordering, leaderboard_queryset
 from .models import Vendor
-from .serializer import VendorSerializer
-from rest_framework.authentication import TokenAuthentication
-from rest_framework.permissions import IsAuthenticated
+from .performance import (needs_recompute, performance_data,
+                          performance_settings, vendor_performance_cache_key)
+from .recompute import QUEUE, enqueue_vendors, queue_stats, recompute_mode
+from .serializer import VendorSerializer, vendor_leaderboard_serializer, vendor_list_serializer
+from vendorManagement.authentication import APIAuthentication
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 # Create your views here.
 
 
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([APIAuthentication])
 @permission_classes([IsAuthenticated])
+@cache_response(lambda request: [list_scope(VENDORS)])
+@read_from_replica
 def vendors(request):
     """
     Checks if the user is authenticated and returns a list of vendors.
 
-    Fetches all vendors from the database and converts them to JSON.
-    Returns a JSON response with a list of all vendors.
+    Fetches one page of vendors ordered by id as `values_list()` rows and
+    converts them to JSON with `vendor_list_serializer`.
+    Returns a JSON response with the vendors in `results` and a `next` link
+    carrying the cursor of the following page (see `KeysetPagination`).
+    Responses are cached and support `If-None-Match` (see
+    `vendorManagement.responsecache`). Reads from the replica when one is
+    configured (see `vendorManagement.replicas`).
+    """
+    paginator = KeysetPagination()
+    vendors = paginator.paginate_queryset(
+        vendor_list_serializer.rows(Vendor.objects.all()), request)
+    return paginator.get_paginated_response(
+        vendor_list_serializer.to_representation(vendors))
+
+
+@api_view(['GET'])
+@authentication_classes([APIAuthentication])
+@permission_classes([IsAuthenticated])
+@cache_response(lambda request: [list_scope(VENDORS)])
+@read_from_replica
+def vendor_leaderboard(request):
+    """
+    Checks if the user is authenticated and returns the vendors ranked by a performance metric.
+
+    Query parameters:
+    - metric: `on_time_delivery_rate` (default), `quality_rating_avg`,
+      `fulfillment_rate` (highest first) or `average_response_time` (lowest first).
+    - min_orders: Only rank vendors with at least this many purchase orders.
+    - page_size, cursor: Top-k and following pages (see `KeysetPagination`).
+
+    The ranking is read from the stored metric columns through their
+    indexes (see `vendorApi.leaderboard`), so a page costs the same whatever
+    the number of vendors. Vendors without samples for the metric are not
+    ranked. Responses are cached and support `If-None-Match`.
     """
-    vendors = Vendor.objects.all()
-    serializer = VendorSerializer(vendors, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    metric = request.query_params.get('metric', DEFAULT_METRIC)
+    if metric not in METRICS:
+        return Response({'metric': [f'Must be one of: {", ".join(METRICS)}.']},
+                        status=status.HTTP_400_BAD_REQUEST)
+    min_orders = parse_int(request.query_params, 'min_orders')
+
+    paginator = KeysetPagination(ordering=leaderboard_ordering(metric))
+    vendors = paginator.paginate_queryset(
+        vendor_leaderboard_serializer.rows(leaderboard_queryset(metric, min_orders)), request)
+    return paginator.get_paginated_response(
+        vendor_leaderboard_serializer.to_representation(vendors))
 
 
 @api_view(['POST'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([APIAuthentication])
 @permission_classes([IsAuthenticated])
 def vendor_create(request):
     """
@@ -46,8 +100,9 @@ def vendor_create(request):
 
 
 @api_view(['GET', 'PUT', 'DELETE'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([APIAuthentication])
 @permission_classes([IsAuthenticated])
+@cache_response(lambda request, vendor_id: [detail_scope(VENDORS, vendor_id)])
 def vendor_detail(request, vendor_id):
     """
     Checks if the user is authenticated and performs CRUD operations on a vendor.
@@ -58,6 +113,7 @@ def vendor_detail(request, vendor_id):
     - DELETE: Delete a specific vendor.
 
     Returns the serialized vendor data in the response for GET and PUT requests.
+    GET responses are cached and support `If-None-Match`.
     Returns a 204 NO CONTENT response on successful DELETE.
     Returns a 404 NOT FOUND response if the vendor does not exist.
     """
@@ -83,7 +139,7 @@ def vendor_detail(request, vendor_id):
 
 
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([APIAuthentication])
 @permission_classes([IsAuthenticated])
 def vendor_performance(request, vendor_id):
     """
@@ -92,22 +148,125 @@ def vendor_performance(request, vendor_id):
     - GET: Retrieve performance metrics such as on-time delivery rate, quality rating,
     average response time, and fulfillment rate for a specific vendor.
 
+    The metrics are served from the vendor row (kept current by purchase order
+    writes) or from the cache, so a read does not write. They are only rebuilt
+    when the `VENDOR_PERFORMANCE['FRESHNESS']` policy considers them stale,
+    inline or by the metrics queue worker depending on `VENDOR_METRICS_RECOMPUTE`.
+
     Returns a JSON response with the performance metrics.
     Returns a 404 NOT FOUND response if the vendor does not exist.
     """
+    config = performance_settings()
+    cache_key = vendor_performance_cache_key(vendor_id)
+    if config['CACHE_TIMEOUT']:
+        data = cache.get(cache_key)
+        if data is not None:
+            return Response(data)
+
     try:
         vendor = Vendor.objects.get(pk=vendor_id)
     except Vendor.DoesNotExist:
         return Response(status=status.HTTP_404_NOT_FOUND)
 
-    vendor.update_performance_metrics()
+    if needs_recompute(vendor):
+        if recompute_mode() == QUEUE:
+            enqueue_vendors([vendor.pk])
+        else:
+            vendor.update_performance_metrics(record_history=False)
+
+    data = performance_data(vendor)
+    if config['CACHE_TIMEOUT']:
+        cache.set(cache_key, data, config['CACHE_TIMEOUT'])
+
+    return Response(data)
+
+
+@api_view(['GET'])
+@authentication_classes([APIAuthentication])
+@permission_classes([IsAdminUser])
+def metrics_queue(request):
+    """
+    Checks if the user is an admin and returns the state of the metrics recompute queue.
+
+    Returns the number of vendors waiting for recomputation (`depth`), the
+    time of the oldest pending request and the queue lag in seconds.
+    """
+    return Response(queue_stats(), status=status.HTTP_200_OK)
+
+
+@async_api_view
+@read_from_replica
+async def vendors_async(request):
+    """
+    Async version of `vendors` for ASGI deployments (see
+    `vendorManagement.asyncviews`). Not cached.
+    """
+    paginator = KeysetPagination()
+    vendors = await paginator.apaginate_queryset(
+        vendor_list_serializer.rows(Vendor.objects.all()), request)
+    return paginator.get_paginated_response(
+        vendor_list_serializer.to_representation(vendors))
+
+
+@async_api_view
+@read_from_replica
+async def vendor_leaderboard_async(request):
+    """
+    Async version of `vendor_leaderboard`. Not cached.
+    """
+    metric = request.query_params.get('metric', DEFAULT_METRIC)
+    if metric not in METRICS:
+        return Response({'metric': [f'Must be one of: {", ".join(METRICS)}.']},
+                        status=status.HTTP_400_BAD_REQUEST)
+    min_orders = parse_int(request.query_params, 'min_orders')
+
+    paginator = KeysetPagination(ordering=leaderboard_ordering(metric))
+    vendors = await paginator.apaginate_queryset(
+        vendor_leaderboard_serializer.rows(leaderboard_queryset(metric, min_orders)), request)
+    return paginator.get_paginated_response(
+        vendor_leaderboard_serializer.to_representation(vendors))
+
+
+@async_api_view
+async def vendor_detail_async(request, vendor_id):
+    """
+    Async version of `vendor_detail`, GET only. Not cached.
+    """
+    try:
+        vendor = await Vendor.objects.aget(pk=vendor_id)
+    except Vendor.DoesNotExist:
+        return Response(status=status.HTTP_404_NOT_FOUND)
+    return Response(VendorSerializer(vendor).data, status=status.HTTP_200_OK)
+
+
+@async_api_view
+async def vendor_performance_async(request, vendor_id):
+    """
+    Async version of `vendor_performance`.
+
+    Reads use the async cache and ORM APIs. A stale vendor is rebuilt or
+    queued like in the sync view; that write runs in a thread.
+    """
+    config = performance_settings()
+    cache_key = vendor_performance_cache_key(vendor_id)
+    if config['CACHE_TIMEOUT']:
+        data = await cache.aget(cache_key)
+        if data is not None:
+            return Response(data)
+
+    try:
+        vendor = await Vendor.objects.aget(pk=vendor_id)
+    except Vendor.DoesNotExist:
+        return Response(status=status.HTTP_404_NOT_FOUND)
+
+    if needs_recompute(vendor):
+        if recompute_mode() == QUEUE:
+            await sync_to_async(enqueue_vendors)([vendor.pk])
+        else:
+            await sync_to_async(vendor.update_performance_metrics)(record_history=False)
 
-    data = {
-        'vendor': vendor.id,
-        "on_time_delivery": vendor.on_time_delivery_rate,
-        "quality_rating": vendor.quality_rating_avg,
-        "average_response_time": vendor.average_response_time,
-        "fulfillment_rate": vendor.fulfillment_rate,
-    }
+    data = performance_data(vendor)
+    if config['CACHE_TIMEOUT']:
+        await cache.aset(cache_key, data, config['CACHE_TIMEOUT'])
 
     return Response(data)
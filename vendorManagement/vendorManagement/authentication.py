@@ -0,0 +1,278 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from rest_framework.authentication import (BaseAuthentication, TokenAuthentication,
+                                           get_authorization_header)
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+
+TOKEN = 'token'
+JWT = 'jwt'
+
+
+DEFAULTS = {
+    'CACHE': 'default',
+    'TIMEOUT': 300,
+    'LOCAL_TIMEOUT': 5,
+    'LOCAL_MAX_SIZE': 10000,
+}
+
+
+def token_cache_settings():
+    """
+    Return the `TOKEN_AUTH_CACHE` settings merged with the defaults.
+    """
+    return {**DEFAULTS, **getattr(settings, 'TOKEN_AUTH_CACHE', {})}
+
+
+class LocalLRUCache:
+    """
+    Thread-safe in-process LRU cache whose entries expire after a TTL.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout, max_size):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + timeout, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > max_size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+local_cache = LocalLRUCache()
+
+
+def token_cache_key(key):
+    return 'auth-token:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+def evict_token(cache_key):
+    local_cache.delete(cache_key)
+    caches[token_cache_settings()['CACHE']].delete(cache_key)
+
+
+def invalidate_token(key):
+    """
+    Drop a token from the local and shared caches.
+
+    The entry is evicted right away and again when the current transaction
+    commits: until then, a concurrent request still reads the active user or
+    token from the database and may cache it again.
+    """
+    cache_key = token_cache_key(key)
+    evict_token(cache_key)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: evict_token(cache_key))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that caches resolved tokens.
+
+    Lookups go through a local LRU cache (`LOCAL_TIMEOUT`, `LOCAL_MAX_SIZE`),
+    then the shared Django cache named by `CACHE` (`TIMEOUT`), and only then
+    the database. Deleting a token or saving its user (for example to
+    deactivate it) invalidates the cached entries; other processes may keep
+    accepting the token for up to `LOCAL_TIMEOUT` seconds.
+
+    Drop-in replacement for `rest_framework.authentication.TokenAuthentication`.
+    """
+
+    def authenticate_credentials(self, key):
+        config = token_cache_settings()
+        cache_key = token_cache_key(key)
+        cached = local_cache.get(cache_key)
+        if cached is None:
+            shared = caches[config['CACHE']]
+            cached = shared.get(cache_key)
+            if cached is None:
+                cached = super().authenticate_credentials(key)
+                shared.set(cache_key, cached, config['TIMEOUT'])
+            local_cache.set(cache_key, cached, config['LOCAL_TIMEOUT'],
+                            config['LOCAL_MAX_SIZE'])
+        return cached
+
+    async def aauthenticate(self, request):
+        """
+        Async `authenticate`, for views running in the event loop.
+        """
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) == 1:
+            raise AuthenticationFailed('Invalid token header. No credentials provided.')
+        elif len(auth) > 2:
+            raise AuthenticationFailed('Invalid token header. Token string should not contain spaces.')
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            raise AuthenticationFailed('Invalid token header. Token string should not contain invalid characters.')
+        return await self.aauthenticate_credentials(key)
+
+    async def aauthenticate_credentials(self, key):
+        """
+        Async `authenticate_credentials`: same caches, with the async cache
+        and ORM APIs.
+        """
+        config = token_cache_settings()
+        cache_key = token_cache_key(key)
+        cached = local_cache.get(cache_key)
+        if cached is None:
+            shared = caches[config['CACHE']]
+            cached = await shared.aget(cache_key)
+            if cached is None:
+                try:
+                    token = await self.get_model().objects.select_related('user').aget(key=key)
+                except self.get_model().DoesNotExist:
+                    raise AuthenticationFailed('Invalid token.')
+                if not token.user.is_active:
+                    raise AuthenticationFailed('User inactive or deleted.')
+                cached = (token.user, token)
+                await shared.aset(cache_key, cached, config['TIMEOUT'])
+            local_cache.set(cache_key, cached, config['LOCAL_TIMEOUT'],
+                            config['LOCAL_MAX_SIZE'])
+        return cached
+
+
+def authentication_mode():
+    """
+    Return `API_AUTHENTICATION`: 'token' or 'jwt'.
+    """
+    return getattr(settings, 'API_AUTHENTICATION', TOKEN)
+
+
+BACKENDS = {
+    TOKEN: CachedTokenAuthentication,
+    JWT: JWTStatelessUserAuthentication,
+}
+
+
+class APIAuthentication(BaseAuthentication):
+    """
+    Authenticates API requests with the backend selected by
+    `API_AUTHENTICATION`.
+
+    - 'token': `CachedTokenAuthentication` (`Authorization: Token <key>`).
+    - 'jwt': `JWTStatelessUserAuthentication` (`Authorization: Bearer <access>`).
+      The signature and expiry are checked without touching the database and
+      `request.user` is a `TokenUser` built from the token claims, so a
+      deactivated user keeps access until the access token expires (see
+      `refresh_jwt`).
+    """
+
+    def backend(self):
+        mode = authentication_mode()
+        try:
+            return BACKENDS[mode]()
+        except KeyError:
+            raise ValueError(f'Unknown API_AUTHENTICATION: {mode!r}')
+
+    def authenticate(self, request):
+        return self.backend().authenticate(request)
+
+    async def aauthenticate(self, request):
+        """
+        Async `authenticate`. JWT verification does not touch the database
+        and runs as is.
+        """
+        backend = self.backend()
+        if hasattr(backend, 'aauthenticate'):
+            return await backend.aauthenticate(request)
+        return backend.authenticate(request)
+
+    def authenticate_header(self, request):
+        return self.backend().authenticate_header(request)
+
+
+def add_user_claims(token, user):
+    """
+    Add the `username` and `is_staff` claims, so stateless views and
+    permission checks (`IsAdminUser`) work from the token alone.
+    """
+    token['username'] = user.get_username()
+    token['is_staff'] = user.is_staff
+    return token
+
+
+def issue_jwt(user):
+    """
+    Return an access/refresh token pair for `user`.
+    """
+    refresh = add_user_claims(RefreshToken.for_user(user), user)
+    return {'refresh': str(refresh), 'access': str(refresh.access_token)}
+
+
+def refresh_jwt(raw_refresh):
+    """
+    Return a new access token for a refresh token.
+
+    Unlike access tokens, refreshes look the user up (one query), so a
+    deactivated user gets no new access token and staff changes reach the
+    claims within `ACCESS_TOKEN_LIFETIME`.
+    """
+    try:
+        refresh = RefreshToken(raw_refresh)
+    except TokenError as exc:
+        raise AuthenticationFailed(exc.args[0])
+    user = get_user_model().objects.filter(
+        **{jwt_settings.USER_ID_FIELD: refresh[jwt_settings.USER_ID_CLAIM]},
+        is_active=True).first()
+    if user is None:
+        raise AuthenticationFailed('User is inactive or does not exist.')
+    return {'access': str(add_user_claims(AccessToken.for_user(user), user))}
+
+
+def token_deleted(sender, instance, **kwargs):
+    invalidate_token(instance.key)
+
+
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        return
+    # Every login saves `last_login` alone (`update_last_login`), which the
+    # cached tokens do not depend on.
+    if update_fields is not None and update_fields <= {'last_login'}:
+        return
+    for key in Token.objects.filter(user=instance).values_list('key', flat=True):
+        invalidate_token(key)
+
+
+post_delete.connect(token_deleted, sender=Token,
+                    dispatch_uid='vendorManagement.authentication.token_deleted')
+post_save.connect(user_saved, sender=get_user_model(),
+                  dispatch_uid='vendorManagement.authentication.user_saved')
@@ -0,0 +1,144 @@
+import copy
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS
+
+
+DEVELOPMENT = 'development'
+PRODUCTION = 'production'
+
+# Connection defaults of each DATABASE_PROFILE. Development closes the
+# connection after every request (runserver starts a thread per request, so
+# persistent connections would pile up); production keeps it open for
+# CONN_MAX_AGE seconds and checks it before reusing it in a new request.
+PROFILES = {
+    DEVELOPMENT: {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False},
+    PRODUCTION: {'CONN_MAX_AGE': 60, 'CONN_HEALTH_CHECKS': True},
+}
+
+# Alias of the read replica (see vendorManagement.replicas).
+REPLICA = 'replica'
+
+# DATABASE_POOLER values: no pooler, or PgBouncer in transaction pooling mode.
+POOLERS = ('', 'pgbouncer')
+
+TRUE_VALUES = ('1', 'true', 'yes')
+FALSE_VALUES = ('0', 'false', 'no')
+
+
+def env_bool(environ, name, default):
+    value = environ.get(name, '').lower()
+    if not value:
+        return default
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ImproperlyConfigured(f'{name} must be one of: true, false.')
+
+
+def env_choice(environ, name, choices, default):
+    value = environ.get(name, default)
+    if value not in choices:
+        raise ImproperlyConfigured(f'{name} must be one of: {", ".join(choices)}.')
+    return value
+
+
+def env_conn_max_age(environ, default):
+    value = environ.get('DATABASE_CONN_MAX_AGE', '')
+    if not value:
+        return default
+    if value.lower() == 'none':
+        return None
+    try:
+        max_age = int(value)
+    except ValueError:
+        max_age = -1
+    if max_age < 0:
+        raise ImproperlyConfigured(
+            'DATABASE_CONN_MAX_AGE must be a number of seconds or "none" (unlimited).')
+    return max_age
+
+
+def database_settings(environ):
+    """
+    `DATABASES['default']` from environment variables.
+
+    - DATABASE_PROFILE: `development` (default) or `production`, the
+      defaults of the connection settings below (see `PROFILES`).
+    - DATABASE_ENGINE: Django backend (default: PostgreSQL).
+    - DATABASE_NAME, DATABASE_USER, DATABASE_PASSWORD, DATABASE_HOST,
+      DATABASE_PORT: Connection parameters (with PgBouncer, those of PgBouncer).
+    - DATABASE_CONN_MAX_AGE: Seconds a connection is reused across requests,
+      0 to close it after each request, `none` to keep it forever.
+    - DATABASE_CONN_HEALTH_CHECKS: Check a reused connection at the start of
+      a request and reconnect when the server closed it.
+    - DATABASE_POOLER: `pgbouncer` when connecting through PgBouncer in
+      transaction pooling mode, which cannot keep server-side cursors open
+      across transactions; they are disabled, so streamed exports fetch
+      their rows client-side.
+    - DATABASE_CONNECT_TIMEOUT, DATABASE_SSLMODE: libpq connection options.
+
+    Raises ImproperlyConfigured for invalid values.
+    """
+    profile = env_choice(environ, 'DATABASE_PROFILE', tuple(PROFILES), DEVELOPMENT)
+    defaults = PROFILES[profile]
+    database = {
+        'ENGINE': environ.get('DATABASE_ENGINE', 'django.db.backends.postgresql'),
+        'NAME': environ.get('DATABASE_NAME', 'your-db-name'),
+        'USER': environ.get('DATABASE_USER', 'your-username'),
+        'PASSWORD': environ.get('DATABASE_PASSWORD', 'your-password'),
+        'HOST': environ.get('DATABASE_HOST', 'localhost'),
+        'PORT': environ.get('DATABASE_PORT', '5432'),
+        'CONN_MAX_AGE': env_conn_max_age(environ, defaults['CONN_MAX_AGE']),
+        'CONN_HEALTH_CHECKS': env_bool(
+            environ, 'DATABASE_CONN_HEALTH_CHECKS', defaults['CONN_HEALTH_CHECKS']),
+    }
+    if env_choice(environ, 'DATABASE_POOLER', POOLERS, '') == 'pgbouncer':
+        database['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+    options = {}
+    if environ.get('DATABASE_CONNECT_TIMEOUT'):
+        options['connect_timeout'] = environ['DATABASE_CONNECT_TIMEOUT']
+    if environ.get('DATABASE_SSLMODE'):
+        options['sslmode'] = environ['DATABASE_SSLMODE']
+    if options:
+        database['OPTIONS'] = options
+    return database
+
+
+def replica_settings(environ, primary):
+    """
+    `DATABASES['replica']` from environment variables, or None when neither
+    DATABASE_REPLICA_HOST nor DATABASE_REPLICA_NAME is set.
+
+    The replica uses the engine and connection settings of `primary`;
+    DATABASE_REPLICA_NAME, DATABASE_REPLICA_USER, DATABASE_REPLICA_PASSWORD,
+    DATABASE_REPLICA_HOST and DATABASE_REPLICA_PORT override its connection
+    parameters. A SQLite replica is a separate file and gets a test database
+    of its own; other replicas are read-only, so tests use the primary's
+    test database for them (TEST MIRROR) and read from the primary (see
+    `vendorManagement.replicas.mirrors_primary`).
+    """
+    if not environ.get('DATABASE_REPLICA_HOST') and not environ.get('DATABASE_REPLICA_NAME'):
+        return None
+    replica = copy.deepcopy(primary)
+    for key in ('NAME', 'USER', 'PASSWORD', 'HOST', 'PORT'):
+        if environ.get(f'DATABASE_REPLICA_{key}'):
+            replica[key] = environ[f'DATABASE_REPLICA_{key}']
+    if replica['ENGINE'] != 'django.db.backends.sqlite3':
+        replica['TEST'] = {'MIRROR': DEFAULT_DB_ALIAS}
+    return replica
+
+
+def databases(environ):
+    """
+    `DATABASES`: the primary (`database_settings`) and, when configured,
+    the read replica (`replica_settings`).
+    """
+    primary = database_settings(environ)
+    aliases = {DEFAULT_DB_ALIAS: primary}
+    replica = replica_settings(environ, primary)
+    if replica is not None:
+        aliases[REPLICA] = replica
+    return aliases
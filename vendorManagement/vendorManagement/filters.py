@@ -0,0 +1,87 @@
+import math
+from datetime import datetime, time
+
+from django.utils import dateparse, timezone
+from rest_framework.exceptions import ValidationError
+
+
+TRUE_VALUES = ('1', 'true', 'yes')
+FALSE_VALUES = ('0', 'false', 'no')
+
+
+def parse_int(params, name):
+    """
+    Read an optional integer query parameter, raising a 400 error when it is invalid.
+    """
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValidationError({name: 'A valid integer is required.'})
+
+
+def parse_float(params, name):
+    """
+    Read an optional number query parameter, raising a 400 error when it is invalid.
+    """
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        parsed = float(value)
+    except ValueError:
+        parsed = None
+    if parsed is None or not math.isfinite(parsed):
+        raise ValidationError({name: 'A valid number is required.'})
+    return parsed
+
+
+def parse_bool(params, name):
+    """
+    Read an optional boolean query parameter (`true`/`false`, `yes`/`no`,
+    `1`/`0`), raising a 400 error when it is invalid.
+    """
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    value = value.lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ValidationError({name: 'Must be one of: true, false.'})
+
+
+def parse_list(params, name):
+    """
+    Read an optional comma-separated query parameter, which may also be
+    repeated (`?status=pending,completed` or `?status=pending&status=completed`).
+    """
+    values = [value.strip() for param in params.getlist(name) for value in param.split(',')]
+    return [value for value in values if value] or None
+
+
+def parse_datetime(params, name):
+    """
+    Read an optional ISO 8601 date or datetime query parameter, raising a 400
+    error when it is invalid. Dates are read as midnight and naive values as
+    the current time zone.
+    """
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        parsed = dateparse.parse_datetime(value)
+        if parsed is None:
+            day = dateparse.parse_date(value)
+            if day is not None:
+                parsed = datetime.combine(day, time.min)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({name: 'A valid ISO 8601 date or datetime is required.'})
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
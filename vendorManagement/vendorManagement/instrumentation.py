@@ -0,0 +1,300 @@
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'SLOW_REQUEST_MS': 500,
+    'TOP_QUERIES': 5,
+    'WINDOW': 1000,
+}
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def request_metrics_settings():
+    """
+    Return the `REQUEST_METRICS` settings merged with the defaults.
+    """
+    return {**DEFAULTS, **getattr(settings, 'REQUEST_METRICS', {})}
+
+
+class RequestRecord:
+    """
+    Measurements of one request.
+    """
+
+    def __init__(self):
+        self.queries = []
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # Called by `record_query` for the queries of the request.
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.db_time += duration
+            self.queries.append((duration, sql))
+
+    def top_queries(self, count):
+        return sorted(self.queries, key=lambda query: query[0], reverse=True)[:count]
+
+
+current_record = contextvars.ContextVar('request_metrics_record', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper recording queries in the current request's
+    record. It is installed on every connection instead of per request,
+    because under ASGI the queries run on other threads (with their own
+    connections) than the middleware; the context variable follows them.
+    """
+    record = current_record.get()
+    if record is None:
+        return execute(sql, params, many, context)
+    return record(execute, sql, params, many, context)
+
+
+def install_query_recorder(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+connection_created.connect(install_query_recorder,
+                           dispatch_uid='vendorManagement.instrumentation.install_query_recorder')
+
+
+class timed_serialization:
+    """
+    Context manager adding the time spent inside it to the serializer time
+    of the current request. Nested sections are only counted once.
+    """
+
+    def __enter__(self):
+        self.record = current_record.get()
+        if self.record is not None:
+            self.record.serializer_depth += 1
+            self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        if self.record is not None:
+            self.record.serializer_depth -= 1
+            if not self.record.serializer_depth:
+                self.record.serializer_time += time.perf_counter() - self.start
+
+
+class TimedSerializerMixin:
+    """
+    Serializer mixin timing `serializer.data` (DRF serializers compute their
+    output there) as serializer time of the current request. Goes first in
+    the bases of the serializers the views render; `FastListSerializer`
+    times itself.
+    """
+
+    @property
+    def data(self):
+        with timed_serialization():
+            return super().data
+
+
+def percentile(sorted_values, quantile):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(quantile * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class EndpointStats:
+    """
+    Per-endpoint aggregates. Totals cover every request since the process
+    started; latency percentiles cover the last `WINDOW` requests.
+    """
+
+    def __init__(self, window):
+        self.count = 0
+        self.latency_sum = 0.0
+        self.queries_sum = 0
+        self.max_queries = 0
+        self.db_time_sum = 0.0
+        self.serializer_time_sum = 0.0
+        self.latencies = deque(maxlen=window)
+
+    def add(self, latency, record):
+        self.count += 1
+        self.latency_sum += latency
+        self.queries_sum += len(record.queries)
+        self.max_queries = max(self.max_queries, len(record.queries))
+        self.db_time_sum += record.db_time
+        self.serializer_time_sum += record.serializer_time
+        self.latencies.append(latency)
+
+    def summary(self):
+        latencies = sorted(self.latencies)
+        return {
+            'count': self.count,
+            'latency_seconds': {
+                f'p{int(quantile * 100)}': percentile(latencies, quantile)
+                for quantile in QUANTILES
+            },
+            'latency_seconds_sum': self.latency_sum,
+            'queries_sum': self.queries_sum,
+            'queries_per_request': self.queries_sum / self.count,
+            'max_queries': self.max_queries,
+            'db_seconds_sum': self.db_time_sum,
+            'serializer_seconds_sum': self.serializer_time_sum,
+        }
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+
+    def add(self, endpoint, latency, record, window):
+        with self.lock:
+            stats = self.endpoints.get(endpoint)
+            if stats is None:
+                stats = self.endpoints[endpoint] = EndpointStats(window)
+            stats.add(latency, record)
+
+    def snapshot(self):
+        with self.lock:
+            return {endpoint: stats.summary()
+                    for endpoint, stats in sorted(self.endpoints.items())}
+
+    def reset(self):
+        with self.lock:
+            self.endpoints.clear()
+
+
+registry = MetricsRegistry()
+
+
+def endpoint_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unresolved>'
+    return match.view_name or match.route
+
+
+class RequestMetricsMiddleware:
+    """
+    Records the latency, SQL query count, database time and serializer time
+    of every request, aggregated per view name in `registry` (see the
+    `request_metrics` endpoint). Adds a `Server-Timing` header, and logs
+    requests slower than `SLOW_REQUEST_MS` with their slowest queries.
+
+    Streaming responses are measured until the response is returned, not
+    until the body has been sent. Supports both sync and async requests, so
+    async views are not moved to a thread under ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        config = request_metrics_settings()
+        if not config['ENABLED']:
+            return self.get_response(request)
+
+        for connection in connections.all():
+            install_query_recorder(connection)
+        record = RequestRecord()
+        token = current_record.set(record)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_record.reset(token)
+        return self.record(request, response, record, time.perf_counter() - start, config)
+
+    async def __acall__(self, request):
+        config = request_metrics_settings()
+        if not config['ENABLED']:
+            return await self.get_response(request)
+
+        for connection in connections.all():
+            install_query_recorder(connection)
+        record = RequestRecord()
+        token = current_record.set(record)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_record.reset(token)
+        return self.record(request, response, record, time.perf_counter() - start, config)
+
+    def record(self, request, response, record, latency, config):
+        endpoint = endpoint_name(request)
+        registry.add(endpoint, latency, record, config['WINDOW'])
+        response['Server-Timing'] = ', '.join([
+            f'total;dur={latency * 1000:.1f}',
+            f'db;dur={record.db_time * 1000:.1f};desc="{len(record.queries)} queries"',
+            f'serializer;dur={record.serializer_time * 1000:.1f}',
+        ])
+        if latency * 1000 >= config['SLOW_REQUEST_MS']:
+            logger.warning(
+                'Slow request: %s %s (%s) took %.0f ms, %d queries in %.0f ms, '
+                'serializers %.0f ms. Slowest queries:\n%s',
+                request.method, request.path, endpoint, latency * 1000,
+                len(record.queries), record.db_time * 1000, record.serializer_time * 1000,
+                '\n'.join(f'  {duration * 1000:.1f} ms: {sql}'
+                          for duration, sql in record.top_queries(config['TOP_QUERIES'])))
+        return response
+
+
+def prometheus_text(snapshot):
+    """
+    Render a `registry.snapshot()` in the Prometheus text exposition format.
+    """
+    def labels(endpoint, **extra):
+        pairs = {'view': endpoint, **extra}
+        return '{' + ','.join(f'{key}="{value}"' for key, value in pairs.items()) + '}'
+
+    lines = [
+        '# HELP http_request_duration_seconds Request latency per view.',
+        '# TYPE http_request_duration_seconds summary',
+    ]
+    for endpoint, stats in snapshot.items():
+        for quantile in QUANTILES:
+            value = stats['latency_seconds'][f'p{int(quantile * 100)}']
+            lines.append(f'http_request_duration_seconds{labels(endpoint, quantile=quantile)} {value}')
+        lines.append(f'http_request_duration_seconds_sum{labels(endpoint)} {stats["latency_seconds_sum"]}')
+        lines.append(f'http_request_duration_seconds_count{labels(endpoint)} {stats["count"]}')
+    counters = (
+        ('http_request_db_queries_total', 'SQL queries per view.',
+         lambda stats: stats['queries_sum']),
+        ('http_request_db_seconds_total', 'Database time per view.',
+         lambda stats: stats['db_seconds_sum']),
+        ('http_request_serializer_seconds_total', 'Serializer time per view.',
+         lambda stats: stats['serializer_seconds_sum']),
+    )
+    for name, help_text, value in counters:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} counter')
+        for endpoint, stats in snapshot.items():
+            lines.append(f'{name}{labels(endpoint)} {value(stats)}')
+    return '\n'.join(lines) + '\n'
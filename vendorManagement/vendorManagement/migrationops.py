@@ -0,0 +1,31 @@
+from django.db.migrations.operations import AddIndex
+
+
+class AddIndexConcurrently(AddIndex):
+    """
+    `AddIndex` building the index with `CREATE INDEX CONCURRENTLY` on
+    PostgreSQL, so the table stays writable during the build, and with a
+    plain `CREATE INDEX` on other databases (SQLite in development and tests).
+
+    On PostgreSQL it runs `django.contrib.postgres.operations.AddIndexConcurrently`,
+    which cannot run in a transaction: set `atomic = False` on the migration.
+    """
+
+    def postgres_operation(self):
+        # Imported here: django.contrib.postgres needs psycopg.
+        from django.contrib.postgres.operations import AddIndexConcurrently
+        return AddIndexConcurrently(self.model_name, self.index)
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            self.postgres_operation().database_forwards(
+                app_label, schema_editor, from_state, to_state)
+        else:
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            self.postgres_operation().database_backwards(
+                app_label, schema_editor, from_state, to_state)
+        else:
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
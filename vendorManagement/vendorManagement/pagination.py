@@ -0,0 +1,165 @@
+import base64
+import json
+from functools import cached_property, reduce
+from operator import or_
+
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Model, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over a stable ordering.
+
+    Each page is fetched with a `WHERE (ordering) > (last row)` condition and a
+    `LIMIT`, so a deep page costs the same as the first one. The cursor is an
+    opaque token encoding the ordering values of the last row of the previous
+    page. The ordering must be unique (end it with `pk`) and its fields must
+    not be nullable. Rows may be model instances, `values()` dicts or named
+    `values_list()` rows holding the ordering fields.
+
+    Query parameters:
+    - cursor: Token from the `next` link of the previous page.
+    - page_size: Number of results per page, capped at `max_page_size`.
+
+    The page size defaults to `REST_FRAMEWORK['PAGE_SIZE']`.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, ordering=('pk',), page_size=None):
+        self.ordering = tuple(ordering)
+        self.page_size = page_size or api_settings.PAGE_SIZE or 100
+
+    def get_page_size(self, request):
+        value = request.query_params.get(self.page_size_query_param)
+        if value is None:
+            return self.page_size
+        try:
+            page_size = int(value)
+        except ValueError:
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.page_queryset(queryset, request)
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request):
+        """
+        Async `paginate_queryset`, fetching the page with async iteration.
+        """
+        queryset = self.page_queryset(queryset, request)
+        return self.set_page([row async for row in queryset])
+
+    def page_queryset(self, queryset, request):
+        """
+        Queryset of the requested page plus one row, telling whether there is
+        a next page.
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.pk_name = queryset.model._meta.pk.attname
+        self.current_page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded:
+            queryset = queryset.filter(
+                self.keyset_filter(self.decode_cursor(encoded, queryset.model)))
+        return queryset[:self.current_page_size + 1]
+
+    def set_page(self, results):
+        self.has_next = len(results) > self.current_page_size
+        self.page = results[:self.current_page_size]
+        return self.page
+
+    def keyset_filter(self, values):
+        """
+        Q object selecting the rows after `values` in the ordering.
+        """
+        conditions = []
+        for index, field in enumerate(self.ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            equal = {
+                other.lstrip('-'): value
+                for other, value in zip(self.ordering[:index], values)
+            }
+            conditions.append(Q(**equal, **{f'{name}__{lookup}': values[index]}))
+        return reduce(or_, conditions)
+
+    def position(self, row):
+        values = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            if name == 'pk' and not isinstance(row, Model):
+                name = self.pk_name
+            values.append(row[name] if isinstance(row, dict) else getattr(row, name))
+        return values
+
+    def encode_cursor(self, row):
+        payload = json.dumps(self.position(row), cls=DjangoJSONEncoder)
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, encoded, model):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            if len(values) != len(self.ordering):
+                raise ValueError
+            fields = [
+                model._meta.pk if field.lstrip('-') == 'pk'
+                else model._meta.get_field(field.lstrip('-'))
+                for field in self.ordering
+            ]
+            return [field.to_python(value) for field, value in zip(fields, values)]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for admin changelists of large tables.
+
+    For an unfiltered queryset on PostgreSQL the count is the planner's row
+    estimate (`pg_class.reltuples`) instead of a `COUNT(*)` scan of the
+    table. Filtered querysets, other databases and tables that were never
+    analyzed are counted exactly.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                    [queryset.model._meta.db_table])
+                row = cursor.fetchone()
+            if row is not None and row[0] > 0:
+                return int(row[0])
+        return super().count
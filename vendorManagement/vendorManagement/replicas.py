@@ -0,0 +1,214 @@
+import contextvars
+import functools
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+DEFAULTS = {
+    'ALIAS': 'replica',
+    'STICKY_SECONDS': 5,
+    'CACHE': 'default',
+}
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Alias of the database reads go to, set while a read-only view runs (see
+# `read_from_replica`). None leaves reads on the primary.
+read_alias = contextvars.ContextVar('read_alias', default=None)
+
+
+def read_replica_settings():
+    """
+    Return the `READ_REPLICA` settings merged with the defaults.
+    """
+    return {**DEFAULTS, **getattr(settings, 'READ_REPLICA', {})}
+
+
+def mirrors_primary(alias):
+    """
+    Whether `alias` is a TEST MIRROR of the primary on the primary's own
+    database. The test runner points a mirror at the primary's test database
+    (by NAME); its separate connection would not see the rows of a test's
+    uncommitted transaction, so reads stay on the primary instead.
+    """
+    replica = connections[alias].settings_dict
+    primary = connections[DEFAULT_DB_ALIAS].settings_dict
+    return (replica.get('TEST', {}).get('MIRROR') == DEFAULT_DB_ALIAS
+            and all(replica[key] == primary[key] for key in ('ENGINE', 'HOST', 'PORT', 'NAME')))
+
+
+def replica_alias():
+    """
+    Alias of the replica, or None when it is not configured in `DATABASES`
+    or mirrors the primary's database (see `mirrors_primary`).
+    """
+    alias = read_replica_settings()['ALIAS']
+    if alias not in connections or mirrors_primary(alias):
+        return None
+    return alias
+
+
+def sticky_key(user):
+    return f'replica-sticky:{user.pk}'
+
+
+def is_authenticated(user):
+    return user is not None and user.is_authenticated
+
+
+def pin_to_primary(user):
+    """
+    Send the reads of `user` to the primary for `STICKY_SECONDS`.
+    """
+    config = read_replica_settings()
+    if is_authenticated(user) and config['STICKY_SECONDS']:
+        caches[config['CACHE']].set(sticky_key(user), True, config['STICKY_SECONDS'])
+
+
+async def apin_to_primary(user):
+    config = read_replica_settings()
+    if is_authenticated(user) and config['STICKY_SECONDS']:
+        await caches[config['CACHE']].aset(sticky_key(user), True, config['STICKY_SECONDS'])
+
+
+def is_pinned(user):
+    config = read_replica_settings()
+    return is_authenticated(user) and bool(caches[config['CACHE']].get(sticky_key(user)))
+
+
+async def ais_pinned(user):
+    config = read_replica_settings()
+    return is_authenticated(user) and bool(await caches[config['CACHE']].aget(sticky_key(user)))
+
+
+@contextmanager
+def reading_from(alias):
+    token = read_alias.set(alias)
+    try:
+        yield
+    finally:
+        read_alias.reset(token)
+
+
+def replica_reads():
+    """
+    Route the reads of the block to the replica, e.g. for a reporting
+    script. Without a replica, reads stay on the primary.
+
+        with replica_reads():
+            rows = list(sku_spend())
+    """
+    return reading_from(replica_alias())
+
+
+def streamed_from(alias, content):
+    """
+    Iterate a streaming response body with reads routed to `alias`: the
+    queries of streamed exports run after the view has returned.
+    """
+    iterator = iter(content)
+    while True:
+        with reading_from(alias):
+            chunk = next(iterator, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def route_response(alias, response):
+    if response.streaming:
+        response.streaming_content = streamed_from(alias, response.streaming_content)
+    return response
+
+
+def read_from_replica(view):
+    """
+    Route the reads of a read-only function-based view to the replica.
+
+    Goes below the DRF decorators (and `cache_response`, so cached responses
+    skip the check), or below `async_api_view` for async views. Reads stay on
+    the primary when no replica is configured, for unsafe methods, and for a
+    client pinned to the primary after a write (see
+    `ReplicaStickinessMiddleware`), so it reads its own writes. Writes always
+    go to the primary (see `ReplicaRouter`).
+    """
+    if iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            alias = replica_alias()
+            if (alias is None or request.method not in SAFE_METHODS
+                    or await ais_pinned(request.user)):
+                return await view(request, *args, **kwargs)
+            with reading_from(alias):
+                response = await view(request, *args, **kwargs)
+            return route_response(alias, response)
+        return async_wrapper
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        alias = replica_alias()
+        if alias is None or request.method not in SAFE_METHODS or is_pinned(request.user):
+            return view(request, *args, **kwargs)
+        with reading_from(alias):
+            response = view(request, *args, **kwargs)
+        return route_response(alias, response)
+    return wrapper
+
+
+class ReplicaRouter:
+    """
+    Database router sending reads to `read_alias` (the replica inside
+    `read_from_replica` views and `replica_reads` blocks) and everything
+    else to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        # Not the database of the `instance` hint: an instance read from the
+        # replica is saved to the primary.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary.
+        return True
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Pins the reads of an authenticated client to the primary for
+    `READ_REPLICA['STICKY_SECONDS']` after each of its unsafe requests, so
+    a vendor sees its own writes (e.g. an acknowledgment) while the replica
+    catches up. Other clients may read stale rows for the replication lag.
+
+    The pin is kept in the `READ_REPLICA['CACHE']` cache, which must be
+    shared by all processes. The user is the one DRF authenticated, set on
+    the request once the view has run. Supports both sync and async requests.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS and replica_alias() is not None:
+            pin_to_primary(getattr(request, 'user', None))
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if request.method not in SAFE_METHODS and replica_alias() is not None:
+            await apin_to_primary(getattr(request, 'user', None))
+        return response
@@ -0,0 +1,186 @@
+import functools
+import hashlib
+import json
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+
+DEFAULTS = {
+    'CACHE': 'default',
+    'TIMEOUT': 0,
+}
+
+# Resource names. A scope is a resource name, optionally narrowed to one
+# object (`vendors:3`) or to the rows of one vendor (`purchase_orders:vendor:3`).
+VENDORS = 'vendors'
+PURCHASE_ORDERS = 'purchase_orders'
+HISTORY = 'history'
+
+
+def response_cache_settings():
+    """
+    Return the `RESPONSE_CACHE` settings merged with the defaults.
+    """
+    return {**DEFAULTS, **getattr(settings, 'RESPONSE_CACHE', {})}
+
+
+def detail_scope(name, pk):
+    return f'{name}:{pk}'
+
+
+def list_scope(name, vendor_id=None):
+    """
+    Scope of a list, narrowed to one vendor when the list is filtered by vendor.
+    """
+    if vendor_id is None:
+        return name
+    return f'{name}:vendor:{vendor_id}'
+
+
+def version_key(scope):
+    return f'response-version:{scope}'
+
+
+def scope_versions(cache, scopes):
+    """
+    Current version of each scope. A scope without a version (never written,
+    or evicted) gets a new random one, so it can never match a stale entry.
+    """
+    keys = [version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, uuid.uuid4().hex, None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(scopes):
+    config = response_cache_settings()
+    if not config['TIMEOUT']:
+        return
+    caches[config['CACHE']].set_many(
+        {version_key(scope): uuid.uuid4().hex for scope in scopes}, None)
+
+
+def invalidate(scopes):
+    """
+    Invalidate every cached response of `scopes`.
+
+    The versions are bumped right away and again when the current transaction
+    commits, so a response built from a snapshot read before the commit
+    cannot stay cached under the new version.
+    """
+    scopes = set(scopes)
+    if not scopes or not response_cache_settings()['TIMEOUT']:
+        return
+    bump_versions(scopes)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: bump_versions(scopes))
+
+
+def invalidate_vendors(vendor_ids):
+    vendor_ids = [vendor_id for vendor_id in vendor_ids if vendor_id is not None]
+    invalidate([VENDORS] + [detail_scope(VENDORS, vendor_id) for vendor_id in vendor_ids])
+
+
+def invalidate_purchase_orders(purchase_order_ids, vendor_ids):
+    invalidate(
+        [PURCHASE_ORDERS]
+        + [detail_scope(PURCHASE_ORDERS, pk) for pk in purchase_order_ids]
+        + [list_scope(PURCHASE_ORDERS, vendor_id)
+           for vendor_id in vendor_ids if vendor_id is not None])
+
+
+def invalidate_history(vendor_ids):
+    invalidate([HISTORY] + [list_scope(HISTORY, vendor_id)
+                            for vendor_id in vendor_ids if vendor_id is not None])
+
+
+def vendor_changed(sender, instance, **kwargs):
+    invalidate_vendors([instance.pk])
+
+
+def purchase_order_changed(sender, instance, **kwargs):
+    vendor_ids = {instance.vendor_id}
+    # State loaded from the database, before this write (see PurchaseOrder.save).
+    stored = getattr(instance, '_metric_state', None)
+    if stored is not None:
+        vendor_ids.add(stored['vendor_id'])
+    invalidate_purchase_orders([instance.pk], vendor_ids)
+
+
+def historical_performance_changed(sender, instance, **kwargs):
+    invalidate_history([instance.vendor_id])
+
+
+def response_digest(request, scopes, versions):
+    payload = json.dumps([
+        request.build_absolute_uri(), request.accepted_media_type, scopes, versions])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def cache_response(get_scopes):
+    """
+    Cache the GET responses of a function-based view.
+
+    Responses are cached by URL under the current versions of their scopes
+    and carry an ETag derived from them; a request whose `If-None-Match`
+    matches gets a 304 without reaching the view, the database or the
+    serializer. Writes invalidate scopes by bumping their versions, from the
+    `post_save` signals or explicitly after deletes and bulk writes (see
+    `invalidate`).
+
+    Disabled unless `RESPONSE_CACHE['TIMEOUT']` is set. Versions live in the
+    `RESPONSE_CACHE['CACHE']` cache, which must be shared by all processes.
+
+    Parameters:
+    - get_scopes: Called with the view arguments, returns the scopes the
+      response depends on.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            config = response_cache_settings()
+            if request.method != 'GET' or not config['TIMEOUT']:
+                return view(request, *args, **kwargs)
+
+            cache = caches[config['CACHE']]
+            scopes = get_scopes(request, *args, **kwargs)
+            digest = response_digest(request, scopes, scope_versions(cache, scopes))
+            etag = f'"{digest}"'
+            if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+            if etag in if_none_match or '*' in if_none_match:
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+            cache_key = f'response:{digest}'
+            data = cache.get(cache_key)
+            if data is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                cache.set(cache_key, response.data, config['TIMEOUT'])
+            else:
+                response = Response(data)
+            response['ETag'] = etag
+            return response
+        return wrapper
+    return decorator
+
+
+# Deletes invalidate explicitly (see `Vendor.delete`, `PurchaseOrder.delete`
+# and `compact_history`): a `post_delete` receiver would disable Django's
+# fast-delete path and load every cascaded row to send its signal.
+post_save.connect(vendor_changed, sender='vendorApi.Vendor',
+                  dispatch_uid='vendorManagement.responsecache.vendor_saved')
+post_save.connect(purchase_order_changed, sender='purchaseApi.PurchaseOrder',
+                  dispatch_uid='vendorManagement.responsecache.purchase_order_saved')
+post_save.connect(historical_performance_changed, sender='historyApi.HistoricalPerformance',
+                  dispatch_uid='vendorManagement.responsecache.history_saved')
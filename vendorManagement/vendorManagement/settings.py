@@ -10,8 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
+from datetime import timedelta
 from pathlib import Path
 
+from vendorManagement.database import databases
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -44,6 +48,7 @@ INSTALLED_APPS = [
     'historyApi',
 ]
 MIDDLEWARE = [
+    'vendorManagement.instrumentation.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -51,6 +56,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'vendorManagement.replicas.ReplicaStickinessMiddleware',
 ]
 
 ROOT_URLCONF = 'vendorManagement.urls'
@@ -76,16 +82,137 @@ WSGI_APPLICATION = 'vendorManagement.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
+# Read from DATABASE_* environment variables (see
+# vendorManagement.database.database_settings). DATABASE_PROFILE=production
+# keeps connections open for 60 seconds with health checks instead of
+# opening one per request. Django 4.2 has no connection pool of its own: to
+# share a few server connections between many workers, point DATABASE_HOST /
+# DATABASE_PORT at PgBouncer in transaction mode and set
+# DATABASE_POOLER=pgbouncer. Compare with `manage.py benchmark_connections`.
+# DATABASE_REPLICA_HOST / DATABASE_REPLICA_NAME add a `replica` alias for
+# read-only endpoints (see READ_REPLICA below).
+
+DATABASES = databases(os.environ)
+
+
+# Read replica (vendorManagement.replicas)
+# When DATABASES has an ALIAS entry, ReplicaRouter sends the reads of the list,
+# history, export and reporting endpoints to it; writes and every other read
+# go to the primary. After an unsafe request, a client's reads stay on the
+# primary for STICKY_SECONDS (longer than the replication lag), so it sees its
+# own writes. CACHE must name a cache shared by all processes.
+
+DATABASE_ROUTERS = ['vendorManagement.replicas.ReplicaRouter']
+
+READ_REPLICA = {
+    'ALIAS': 'replica',
+    'STICKY_SECONDS': 5,
+    'CACHE': 'default',
+}
+
+
+# Django REST framework
+# PAGE_SIZE: default page size of the keyset-paginated list endpoints.
+
+REST_FRAMEWORK = {
+    'DEFAULT_PAGINATION_CLASS': 'vendorManagement.pagination.KeysetPagination',
+    'PAGE_SIZE': 100,
+}
+
+
+# Maximum number of purchase orders accepted by the bulk ingestion endpoint.
+
+PURCHASE_ORDER_BULK_MAX_ROWS = 10000
+
+
+# Vendor performance endpoint
+# FRESHNESS: 'stored' serves the stored metrics without writing, 'max_age'
+# rebuilds them when older than MAX_AGE seconds, 'on_change' rebuilds them when
+# purchase orders changed since the last rebuild.
+# CACHE_TIMEOUT: seconds to cache the response payload (0 disables caching).
+
+VENDOR_PERFORMANCE = {
+    'FRESHNESS': 'stored',
+    'MAX_AGE': 300,
+    'CACHE_TIMEOUT': 0,
+}
+
+
+# Vendor metric recomputation after purchase order writes
+# 'inline' records the historical performance snapshot during the request,
+# 'queue' marks the vendor dirty and leaves the full recomputation and the
+# snapshot to the `manage.py process_metrics_queue` worker.
+
+VENDOR_METRICS_RECOMPUTE = 'inline'
+
+
+# Token authentication cache (vendorManagement.authentication)
+# Resolved tokens are kept in a per-process LRU for LOCAL_TIMEOUT seconds and
+# in the CACHE alias of CACHES for TIMEOUT seconds. Deleting a token or saving
+# its user evicts it; other processes may accept a deleted token until their
+# local entry expires.
+
+TOKEN_AUTH_CACHE = {
+    'CACHE': 'default',
+    'TIMEOUT': 300,
+    'LOCAL_TIMEOUT': 5,
+    'LOCAL_MAX_SIZE': 10000,
+}
+
+
+# API authentication
+# 'token' authenticates with DRF Token rows (cached, see TOKEN_AUTH_CACHE).
+# 'jwt' makes login/signup issue access/refresh JWTs, verified by signature
+# only; renew access tokens with POST /token/refresh/, which checks the user
+# is still active. Changes to a user (deactivation, staff flag) therefore
+# apply within ACCESS_TOKEN_LIFETIME.
+
+API_AUTHENTICATION = 'token'
+
+SIMPLE_JWT = {
+    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=5),
+    'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
+}
+
+
+# API response cache (vendorManagement.responsecache)
+# With TIMEOUT > 0, GET responses of the vendor, purchase order and history
+# list/detail views are cached for TIMEOUT seconds under versioned keys and
+# answer If-None-Match with 304. Writes bump the versions. CACHE must name a
+# cache shared by all processes (e.g. Redis or Memcached); with a per-process
+# cache such as locmem, other processes would keep serving stale responses.
+
+RESPONSE_CACHE = {
+    'CACHE': 'default',
+    'TIMEOUT': 0,
+}
+
+
+# Request instrumentation (vendorManagement.instrumentation)
+# RequestMetricsMiddleware records latency, query count, DB time and serializer
+# time per view, served to admins at /metrics/ (JSON, or ?output=prometheus).
+# Requests slower than SLOW_REQUEST_MS are logged with their TOP_QUERIES
+# slowest queries; percentiles cover the last WINDOW requests of each view.
+
+REQUEST_METRICS = {
+    'ENABLED': True,
+    'SLOW_REQUEST_MS': 500,
+    'TOP_QUERIES': 5,
+    'WINDOW': 1000,
+}
+
+
+# Historical performance snapshots
+# POLICY: 'always' inserts a row on every vendor save, 'on_change' only when a
+# metric moved by more than EPSILON since the latest snapshot, 'bucket' keeps
+# at most one row per vendor per BUCKET_SECONDS, 'batch' buffers rows and
+# writes them with bulk_create (BATCH_SIZE at a time or at the end of a request).
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': 'your-db-name',
-        'USER': 'your-username',
-        'PASSWORD': 'your-password',
-        'HOST': 'localhost',
-        'PORT': '5432',
-    }
+HISTORY_SNAPSHOTS = {
+    'POLICY': 'on_change',
+    'EPSILON': 1e-6,
+    'BUCKET_SECONDS': 3600,
+    'BATCH_SIZE': 500,
 }
 
 
@@ -0,0 +1,68 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from purchaseApi.synthetic import SyntheticData
+
+
+class QueryCountTestCase(TestCase):
+    """
+    Pins the number of queries of endpoints for a small and a large fixture,
+    so that a query per row (N+1) or a scan per row fails the tests.
+
+    `self.vendor` starts with `small_orders` purchase orders and
+    `small_history` snapshots. `grow()` adds `large_orders` purchase orders
+    and `large_history` snapshots to it, and `other_vendors` vendors with
+    their own orders, enough to fill more than one page of every list.
+
+    Usage:
+        for size in self.sizes():
+            self.assertQueries(1, 'get', url)
+    """
+    small_orders = 5
+    small_history = 2
+    large_orders = 300
+    large_history = 150
+    other_vendors = 110
+    size = 'small'
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='pinned', password='pinnedpassword', is_staff=True)
+        token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        self.vendor, = SyntheticData('PIN').generate(1, self.small_orders, self.small_history)
+        self.purchase_order = self.vendor.purchaseorder_set.order_by('pk').first()
+        # Resolve the token once, pins count the queries of the view only.
+        self.client.get(reverse('vendors'))
+
+    def grow(self):
+        generator = SyntheticData('PINL', seed=1)
+        generator.create_orders(self.vendor, 0, self.large_orders)
+        generator.create_history(self.vendor, self.large_history)
+        self.vendor.update_performance_metrics(record_history=False)
+        SyntheticData('PINX', seed=2).generate(self.other_vendors, 2, 1)
+
+    def sizes(self):
+        """
+        Yield 'small', then grow the data and yield 'large'.
+        """
+        self.size = 'small'
+        yield self.size
+        self.grow()
+        self.size = 'large'
+        yield self.size
+
+    def assertQueries(self, expected, method, url, data=None, status_code=200, **kwargs):
+        """
+        Issue the request and assert that it ran exactly `expected` queries.
+        """
+        with self.subTest(size=self.size, method=method, url=url), self.assertNumQueries(expected):
+            response = getattr(self.client, method)(url, data, **kwargs)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, status_code, getattr(response, 'data', None))
+        return response
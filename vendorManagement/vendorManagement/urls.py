@@ -14,4 +14,6 @@ urlpatterns = [
     path('api/', include(api_patterns)),
     path('login/', views.login, name='login'),
     path('signup/', views.signup, name='signup'),
+    path('token/refresh/', views.token_refresh, name='token_refresh'),
+    path('metrics/', views.request_metrics, name='request_metrics'),
 ]
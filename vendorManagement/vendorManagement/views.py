@@ -1,11 +1,16 @@
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
+from rest_framework.permissions import IsAdminUser
 
 from rest_framework.authtoken.models import Token
 from django.contrib.auth.models import User
 
+from .authentication import APIAuthentication, JWT, authentication_mode, issue_jwt, refresh_jwt
+from .instrumentation import prometheus_text, registry
 from .serializer import UserSerializer
 
 
@@ -14,8 +19,14 @@ def login(request):
     user = get_object_or_404(User, username=request.data['username'])
     if not user.check_password(request.data['password']):
         return Response({'detail': 'Invalid Credentials'})
-    token, created = Token.objects.get_or_create(user=user)
     serializer = UserSerializer(instance=user)
+    if authentication_mode() == JWT:
+        # JWTs are verified without a user lookup, so inactive users must
+        # never get one.
+        if not user.is_active:
+            return Response({'detail': 'Invalid Credentials'})
+        return Response({**issue_jwt(user), 'user': serializer.data})
+    token, created = Token.objects.get_or_create(user=user)
     return Response({'token': token.key, 'user': serializer.data})
 
 
@@ -27,6 +38,41 @@ def signup(request):
         user = User.objects.get(username=request.data['username'])
         user.set_password(request.data['password'])
         user.save()
+        if authentication_mode() == JWT:
+            return Response(issue_jwt(user))
         token = Token.objects.create(user=user)
         return Response({'token': token.key})
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['POST'])
+def token_refresh(request):
+    refresh = request.data.get('refresh')
+    if not refresh:
+        return Response({'refresh': ['This field is required.']},
+                        status=status.HTTP_400_BAD_REQUEST)
+    try:
+        return Response(refresh_jwt(refresh))
+    except AuthenticationFailed as exc:
+        return Response({'detail': exc.detail}, status=status.HTTP_401_UNAUTHORIZED)
+
+
+@api_view(['GET'])
+@authentication_classes([APIAuthentication])
+@permission_classes([IsAdminUser])
+def request_metrics(request):
+    """
+    Checks if the user is an admin and returns the per-view request metrics
+    recorded by `RequestMetricsMiddleware` in this process.
+
+    For each view: request count, p50/p95/p99 latency, queries per request,
+    database and serializer time. `?output=prometheus` returns them in the
+    Prometheus text format instead of JSON.
+    """
+    output = request.query_params.get('output', 'json')
+    if output not in ('json', 'prometheus'):
+        raise ValidationError({'output': 'Must be one of: json, prometheus.'})
+    snapshot = registry.snapshot()
+    if output == 'prometheus':
+        return HttpResponse(prometheus_text(snapshot), content_type='text/plain; version=0.0.4')
+    return Response(snapshot)